@@ -0,0 +1,49 @@
+"""RSS发布时间解析的性能对比：依次尝试所有格式 与 优先使用该RSS源上次成功的格式
+
+用法（在项目根目录运行）：
+    python scripts/bench_parse_published.py [条目数]
+
+不传feed_key时按TIME_FORMATS的顺序依次尝试（即按源缓存格式之前的行为），
+传入feed_key时同一个源第二篇文章起直接使用上次成功的格式。
+"""
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from sources.config import RSSConfig
+from sources.rss import RSSSource
+
+# 各时间格式的样例，顺序与TIME_FORMATS一致
+SAMPLES = (
+    'Fri, 16 Oct 2026 08:30:00 +0800',
+    'Fri, 16 Oct 2026 08:30:00 GMT',
+    '2026-10-16T08:30:00+08:00',
+    '2026-10-16T08:30:00Z',
+    '2026-10-16 08:30:00',
+)
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    # 不使用条件请求，避免打开默认数据库
+    config = RSSConfig()
+    config.CONDITIONAL_GET = False
+    source = RSSSource(os.path.join(ROOT, 'src', 'config', 'default', 'subscriptions.opml'), config)
+
+    print(f"{'时间格式样例':<36}{'逐个尝试(us)':>14}{'按源缓存(us)':>14}")
+    for published in SAMPLES:
+        entry = SimpleNamespace(published=published)
+        assert source._parse_published_time(entry) == source._parse_published_time(entry, published)
+
+        before = timeit.timeit(lambda: source._parse_published_time(entry), number=entries)
+        after = timeit.timeit(lambda: source._parse_published_time(entry, published), number=entries)
+        print(f"{published:<36}{before / entries * 1e6:>14.1f}{after / entries * 1e6:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""批量保存新闻的性能对比：逐条SELECT+INSERT 与 单次executemany upsert
+
+用法（在项目根目录运行）：
+    python scripts/bench_save_news_batch.py [条数 ...]
+
+默认依次测试1000、10000、100000条，100000条时两种写法合计需要运行一分多钟；
+只想快速对比时可以指定较小的条数，如 python scripts/bench_save_news_batch.py 1000 10000。
+
+每种写法各使用一个新建的临时数据库，新闻正文约2KB；逐条写法的每行输出被丢弃，
+只比较数据库写入本身。
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from services.database import NewsDatabase
+
+
+def make_news(count: int):
+    published = datetime(2026, 10, 16, 8, 0, 0)
+    return [{
+        'id': f'bench-{i}',
+        'manager_name': 'RSS聚合',
+        'source_type': 'rss',
+        'source_name': f'来源{i % 20}',
+        'published': published - timedelta(minutes=i),
+        'title': f'新闻标题 {i}',
+        'subtitle': '副标题',
+        'summary': '',
+        'content': ('正文内容 %d ' % i) * 170,
+        'link': f'https://example.com/news/{i}',
+        'raw_data': {'id': f'bench-{i}'},
+    } for i in range(count)]
+
+
+def save_row_by_row(db: NewsDatabase, news_list) -> int:
+    """原来的逐条写法：每条新闻先SELECT查询是否存在，再分别INSERT到两张表并输出一行"""
+    saved_count = 0
+    fetch_timestamp = datetime.now()
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        for news in news_list:
+            cursor.execute('SELECT id FROM news_items WHERE id = ?', (news['id'],))
+            if cursor.fetchone():
+                print(f"新闻已存在，跳过: {news['title']}")
+                continue
+            row, body_row = db._news_to_row(news, fetch_timestamp)
+            cursor.execute('''
+                INSERT INTO news_items
+                (id, manager_name, source_type, source_name, published, title, subtitle, summary, link,
+                 fetch_timestamp, published_ts, summary_status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', row)
+            cursor.execute('INSERT INTO news_bodies (id, content, raw_data) VALUES (?, ?, ?)', body_row)
+            saved_count += 1
+            print(f"保存新闻: {news['title']}")
+        conn.commit()
+    return saved_count
+
+
+def measure(db_path: str, save, news_list) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = NewsDatabase(db_path)
+        started = time.perf_counter()
+        saved = save(db, news_list)
+        elapsed = time.perf_counter() - started
+    assert saved == len(news_list)
+    return len(news_list) / elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print(f"{'条数':>8}{'逐条(行/秒)':>14}{'executemany(行/秒)':>20}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            news_list = make_news(size)
+            old_rate = measure(os.path.join(tmp_dir, f'old-{size}.db'), save_row_by_row, news_list)
+            new_rate = measure(os.path.join(tmp_dir, f'new-{size}.db'), NewsDatabase.save_news_batch, news_list)
+            print(f"{size:>8}{old_rate:>14.0f}{new_rate:>20.0f}")
+        NewsDatabase.close_all_connections()
+
+
+if __name__ == '__main__':
+    main()
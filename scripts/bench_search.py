@@ -0,0 +1,81 @@
+"""新闻搜索的性能对比：FTS5 trigram索引 与 LIKE扫描
+
+用法（在项目根目录运行）：
+    python scripts/bench_search.py [新闻条数]
+
+在临时数据库中写入随机生成的新闻（正文约2KB，每个关键词约出现在1%的新闻中），
+对同一组关键词分别使用全文索引和LIKE扫描搜索，输出每次搜索的平均耗时并校验两者命中的新闻相同。
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from services.database import NewsDatabase
+
+KEYWORDS = ['演唱会', '唱片公司', 'livehouse', '音乐节 演唱会', 'royalty']
+# 填充正文的常用字
+FILLER = '的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经'
+REPEAT = 5
+
+
+def make_text(rng: random.Random, length: int) -> str:
+    words = [''.join(rng.choices(FILLER, k=rng.randint(2, 6))) for _ in range(length // 4)]
+    for keyword in ' '.join(KEYWORDS).split():
+        if rng.random() < 0.01:
+            words.insert(rng.randrange(len(words) + 1), keyword)
+    return ' '.join(words)
+
+
+def make_news(count: int):
+    rng = random.Random(0)
+    published = datetime(2026, 10, 16, 8, 0, 0)
+    return [{
+        'id': f'bench-{i}',
+        'source_type': 'rss',
+        'source_name': f'来源{i % 20}',
+        'published': published - timedelta(minutes=i),
+        'title': make_text(rng, 30),
+        'subtitle': '',
+        'summary': '',
+        'content': make_text(rng, 700),
+        'link': f'https://example.com/news/{i}',
+    } for i in range(count)]
+
+
+def timed(search, terms) -> (float, set):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        results = search(terms, None, None, None)
+    return (time.perf_counter() - started) / REPEAT * 1000, {news['id'] for news in results}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = NewsDatabase(os.path.join(tmp_dir, 'search.db'))
+            db.save_news_batch(make_news(count))
+
+        print(f"{count}条新闻")
+        print(f"{'关键词':<16}{'命中':>8}{'FTS(ms)':>10}{'LIKE(ms)':>10}")
+        for keyword in KEYWORDS:
+            terms = keyword.split()
+            fts_ms, fts_ids = timed(db._search_with_index, terms)
+            like_ms, like_ids = timed(db._search_with_like, terms)
+            assert fts_ids == like_ids
+            print(f"{keyword:<16}{len(fts_ids):>8}{fts_ms:>10.1f}{like_ms:>10.1f}")
+
+        NewsDatabase.close_all_connections()
+
+
+if __name__ == '__main__':
+    main()
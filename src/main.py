@@ -2,10 +2,15 @@ from sources.rss import RSSSource
 from managers.news_manager import NewsManager
 from services.ai import AISummarizer
 from services.template import HTMLTemplate
-from services.database import NewsDatabase
+from services.database import NewsDatabase, epoch_range
+from services.feed_state import FeedStateStore
+from services.summary_cache import SummaryCache
+from services.llm_metrics import LLMMetricsStore
 from utils.gpt import GPTConfig
 from utils.date_service import DateRangeService
 import os
+import sys
+import csv
 import json
 import argparse
 from dotenv import load_dotenv
@@ -14,7 +19,6 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.utils import formatdate
 from datetime import datetime, date
-import sqlite3
 from typing import Optional
 
 # 加载环境变量
@@ -22,7 +26,11 @@ load_dotenv()
 
 def create_news_manager():
     """创建并配置新闻管理器"""
-    manager = NewsManager()
+    deadline = os.getenv('NEWS_FETCH_DEADLINE')
+    manager = NewsManager(
+        max_concurrency=int(os.getenv('NEWS_MAX_CONCURRENT_SOURCES', '4')),
+        deadline=float(deadline) if deadline else None,
+    )
     
     # 注册RSS来源
     rss_source = RSSSource('src/config/default/subscriptions.opml')
@@ -49,6 +57,10 @@ def fetch_news(args):
     if source_types:
         source_types = [s.strip() for s in source_types.split(',')]
     
+    # 流式模式：边抓取边分块入库
+    if getattr(args, 'stream', False):
+        return fetch_news_stream(args, manager, start_date, end_date, source_types)
+    
     news_list = manager.get_all_news(start_date, end_date, source_types)
     
     if news_list:
@@ -68,42 +80,139 @@ def fetch_news(args):
     else:
         print("\n没有找到任何新闻更新")
     
+    # 新闻入库后再提交来源的抓取状态，避免未保存的新闻在下次抓取时被跳过
+    if getattr(args, 'save_to_db', True):
+        manager.commit_sources_state(source_types)
+    
     return news_list
 
+def fetch_news_stream(args, manager, start_date, end_date, source_types):
+    """流式获取新闻：各来源逐批产出新闻，增量去重后按分块事务写入数据库
+    
+    Args:
+        args: argparse.Namespace 命令行参数
+        manager: NewsManager 新闻管理器
+        start_date: datetime 开始时间
+        end_date: datetime 结束时间
+        source_types: Optional[List[str]] 指定的来源类型列表
+    
+    Returns:
+        int 获取到的新闻数量
+    """
+    news_stream = manager.iter_all_news(start_date, end_date, source_types)
+    
+    # 调试用：逐条追加到临时文件（JSON Lines格式）
+    if getattr(args, 'save_temp', False):
+        news_stream = _tee_to_temp_file(news_stream, 'temp_news.jsonl')
+    
+    fetched_count = 0
+    
+    def count(stream):
+        nonlocal fetched_count
+        for news in stream:
+            fetched_count += 1
+            yield news
+    
+    if getattr(args, 'save_to_db', True):
+        db = NewsDatabase()
+        saved_count = db.save_news_stream(count(news_stream), getattr(args, 'chunk_size', 100))
+        print(f"\n获取到 {fetched_count} 条新闻，已保存 {saved_count} 条新闻到数据库")
+        
+        # 全部入库后再提交来源的抓取状态
+        manager.commit_sources_state(source_types)
+    else:
+        for _ in count(news_stream):
+            pass
+        print(f"\n获取到 {fetched_count} 条新闻")
+    
+    return fetched_count
+
+def _tee_to_temp_file(news_stream, file_path):
+    """将新闻流逐条写入临时文件，同时原样返回新闻
+    
+    Args:
+        news_stream: Iterable[Dict] 新闻数据流
+        file_path: str 临时文件路径
+    """
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for news in news_stream:
+            f.write(json.dumps(news, ensure_ascii=False, default=str) + '\n')
+            yield news
+    print(f"已保存到临时文件 {file_path}（调试用）")
+
 def query_news(args):
-    """查询历史新闻"""
+    """查询历史新闻，结果逐条输出到标准输出，内存占用与结果数量无关"""
     db = NewsDatabase()
     
     if hasattr(args, 'query_date') and args.query_date:
         # 查询指定日期的新闻
         target_date = datetime.strptime(args.query_date, '%Y-%m-%d').date()
-        news_list = db.get_news_by_date(target_date)
-        print(f"\n{target_date} 的新闻 ({len(news_list)} 条):")
+        news_stream = db.iter_news(target_date, target_date, limit=args.limit)
+        title = f"{target_date} 的新闻"
         
     elif hasattr(args, 'query_range') and args.query_range:
         # 查询日期范围的新闻
         start_str, end_str = args.query_range
         start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
         end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
-        news_list = db.get_news_by_date_range(start_date, end_date)
-        print(f"\n{start_date} 到 {end_date} 的新闻 ({len(news_list)} 条):")
+        news_stream = db.iter_news(start_date, end_date, limit=args.limit)
+        title = f"{start_date} 到 {end_date} 的新闻"
         
     elif hasattr(args, 'query_source') and args.query_source:
         # 查询指定来源的新闻
-        news_list = db.get_news_by_source(args.query_source)
-        print(f"\n来源 '{args.query_source}' 的新闻 ({len(news_list)} 条):")
+        news_stream = db.iter_news(source_name=args.query_source, limit=args.limit)
+        title = f"来源 '{args.query_source}' 的新闻"
         
     elif hasattr(args, 'search') and args.search:
-        # 搜索新闻
-        news_list = db.search_news(args.search)
-        print(f"\n包含 '{args.search}' 的新闻 ({len(news_list)} 条):")
+        # 搜索新闻（按相关度排序，需要一次取回全部结果，可用--limit限制数量）
+        start_date = end_date = None
+        if args.date or args.date_range or args.days:
+            start_date, end_date = DateRangeService.parse_args_to_date_range(args)
+            start_date, end_date = start_date.date(), end_date.date()
+        news_stream = iter(db.search_news(args.search, start_date, end_date, limit=args.limit))
+        title = f"包含 '{args.search}' 的新闻"
         
     else:
         print("\n请指定查询条件")
         return
     
-    # 显示新闻列表
-    for news in news_list:
+    _write_news(news_stream, args.format, title)
+
+def _write_news(news_stream, output_format, title):
+    """将新闻流按指定格式写到标准输出
+    
+    jsonl和csv格式的标准输出只包含数据，标题和条数提示输出到标准错误，便于重定向到文件或管道。
+    
+    Args:
+        news_stream: Iterator[Dict] 新闻数据流
+        output_format: str 输出格式，text、jsonl或csv
+        title: str 查询描述
+    
+    Returns:
+        int 输出的新闻数量
+    """
+    count = 0
+    
+    if output_format == 'jsonl':
+        for news in news_stream:
+            sys.stdout.write(json.dumps(news, ensure_ascii=False, default=str) + '\n')
+            count += 1
+        print(f"{title}: 共 {count} 条", file=sys.stderr)
+        return count
+    
+    if output_format == 'csv':
+        writer = None
+        for news in news_stream:
+            if writer is None:
+                writer = csv.DictWriter(sys.stdout, fieldnames=list(news.keys()), extrasaction='ignore')
+                writer.writeheader()
+            writer.writerow(news)
+            count += 1
+        print(f"{title}: 共 {count} 条", file=sys.stderr)
+        return count
+    
+    print(f"\n{title}:")
+    for news in news_stream:
         published = news['published']
         if isinstance(published, str):
             published = datetime.fromisoformat(published.replace('Z', '+00:00'))
@@ -114,14 +223,33 @@ def query_news(args):
         # 使用只显示日期的格式
         published_str = DateRangeService.format_date_only(published)
         print(f"- [{published_str}] {source_name}: {news['title']}")
+        if news.get('snippet'):
+            print(f"  片段: {news['snippet']}")
         if news.get('summary'):
             print(f"  总结: {news['summary']}")
         print(f"  链接: {news['link']}")
         print()
+        count += 1
+    
+    print(f"共 {count} 条")
+    return count
 
-def show_stats():
-    """显示数据库统计信息"""
+def show_stats(rebuild=False):
+    """显示数据库统计信息
+    
+    Args:
+        rebuild: bool 是否先根据新闻数据重新计算统计表并校验一致性
+    """
     db = NewsDatabase()
+    
+    if rebuild:
+        mismatches = db.rebuild_statistics()
+        if mismatches['daily_mismatches'] or mismatches['source_mismatches']:
+            print(f"统计表已重建，修正了 {mismatches['daily_mismatches']} 个日期、"
+                  f"{mismatches['source_mismatches']} 个来源的统计")
+        else:
+            print("统计表已重建，与原统计一致")
+    
     stats = db.get_statistics()
     
     print("\n=== 数据库统计信息 ===")
@@ -138,6 +266,49 @@ def show_stats():
     for date_str, count in stats['recent_date_stats'].items():
         print(f"  {date_str}: {count} 条")
 
+def show_llm_stats(days=None):
+    """显示AI调用指标统计
+    
+    Args:
+        days: Optional[int] 统计最近N天，默认7天
+    """
+    days = days or 7
+    db = NewsDatabase()
+    report = LLMMetricsStore(db.db_path).get_report(days)
+    gpt_config = GPTConfig()
+    
+    def cost(prompt_tokens, completion_tokens):
+        return (prompt_tokens * gpt_config.PROMPT_PRICE + completion_tokens * gpt_config.COMPLETION_PRICE) / 1_000_000
+    
+    total = report['total']
+    print(f"\n=== 最近 {days} 天AI调用统计 ===")
+    print(f"调用次数: {total['calls']}（失败 {total['failed']} 次，重试 {total['retries']} 次），截断总结 {total['truncated']} 条")
+    print(f"token: 输入 {total['prompt_tokens']}，输出 {total['completion_tokens']}，"
+          f"费用约 {cost(total['prompt_tokens'], total['completion_tokens']):.4f}")
+    
+    if report['errors']:
+        print("\n错误类型:")
+        for error_class, count in report['errors'].items():
+            print(f"  {error_class}: {count} 次")
+    
+    print("\n来源消耗（批量请求按条数分摊）:")
+    for row in report['by_source']:
+        print(f"  {row['source_name']}: {row['items']} 条，输入 {row['prompt_tokens']:.0f}，输出 {row['completion_tokens']:.0f}，"
+              f"费用约 {cost(row['prompt_tokens'], row['completion_tokens']):.4f}")
+    
+    print("\n提示词消耗:")
+    for row in report['by_prompt']:
+        print(f"  {row['model']} {row['prompt_hash']} ({row['kind']}): {row['calls']} 次 {row['items']} 条，"
+              f"输入 {row['prompt_tokens']}，输出 {row['completion_tokens']}")
+    
+    print("\n每日延迟:")
+    for day, latency in report['daily_latency'].items():
+        print(f"  {day}: {latency['calls']} 次，p50 {latency['p50_ms']} ms，p95 {latency['p95_ms']} ms")
+
+# AI总结和生成HTML只需要的字段，不读取正文
+SUMMARIZE_COLUMNS = ('id', 'source_name', 'title', 'subtitle')
+DIGEST_COLUMNS = ('id', 'source_name', 'published', 'title', 'summary', 'link')
+
 def summarize_news(start_date=None, end_date=None):
     """AI总结新闻
     
@@ -149,31 +320,12 @@ def summarize_news(start_date=None, end_date=None):
         # 从数据库读取新闻
         db = NewsDatabase()
         
-        # 获取指定时间范围内未总结的新闻
-        with db.get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            if start_date and end_date:
-                # 将datetime转换为日期字符串以匹配数据库格式
-                start_date_str = start_date.strftime('%Y-%m-%d')
-                end_date_str = end_date.strftime('%Y-%m-%d')
-                cursor.execute('''
-                    SELECT * FROM news_items 
-                    WHERE published >= ? AND published <= ? 
-                    AND (summary IS NULL OR summary = '')
-                    ORDER BY published DESC
-                ''', (start_date_str, end_date_str))
-            else:
-                # 如果没有指定时间范围，则处理今天抓取的新闻
-                fetch_date = date.today()
-                cursor.execute('''
-                    SELECT * FROM news_items 
-                    WHERE date(fetch_timestamp) = ? AND (summary IS NULL OR summary = '')
-                    ORDER BY published DESC
-                ''', (fetch_date,))
-            
-            news_list = [dict(row) for row in cursor.fetchall()]
+        # 获取待总结的新闻（包括之前失败、已到重试时间的新闻）
+        if start_date and end_date:
+            news_list = db.get_summary_queue(epoch_range(start_date, end_date), columns=SUMMARIZE_COLUMNS)
+        else:
+            # 如果没有指定时间范围，则处理今天抓取的新闻
+            news_list = db.get_summary_queue(columns=SUMMARIZE_COLUMNS)
         
         if not news_list:
             time_desc = f"{start_date.strftime('%Y-%m-%d')} 到 {end_date.strftime('%Y-%m-%d')}" if start_date and end_date else "今天"
@@ -187,20 +339,25 @@ def summarize_news(start_date=None, end_date=None):
         gpt_config.validate()
         
         # AI总结
-        ai_summarizer = AISummarizer(gpt_config)
+        cache = None
+        if gpt_config.SUMMARY_CACHE:
+            cache = SummaryCache(db.db_path, gpt_config.SUMMARY_CACHE_TTL_DAYS, gpt_config.SUMMARY_CACHE_MAX_ENTRIES)
+        ai_summarizer = AISummarizer(gpt_config, cache)
         summarized_news = ai_summarizer.summarize_news(news_list)
         
-        # 直接更新数据库中的总结
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            for news in summarized_news:
-                if news.get('summary'):
-                    cursor.execute(
-                        'UPDATE news_items SET summary = ? WHERE id = ?',
-                        (news['summary'], news['id'])
-                    )
-            conn.commit()
-        print("已更新数据库中的新闻总结")
+        # 保存总结结果，失败的新闻按退避时间等待下次重试
+        done = db.mark_summaries_done(
+            (news['id'], news['summary']) for news in summarized_news if news.get('summary')
+        )
+        failed = db.mark_summaries_failed(
+            ((news['id'], news.get('summary_error', '')) for news in summarized_news if not news.get('summary')),
+            gpt_config.SUMMARY_MAX_ATTEMPTS,
+            gpt_config.SUMMARY_RETRY_BASE
+        )
+        print(f"已更新数据库中的新闻总结: 成功 {done} 条，等待重试 {failed['retrying']} 条，放弃 {failed['failed']} 条")
+        
+        # 保存本次API调用指标
+        LLMMetricsStore(db.db_path).save_run(ai_summarizer.gpt.metrics.get_calls())
         
         return summarized_news
     except Exception as e:
@@ -218,31 +375,9 @@ def generate_html(start_date=None, end_date=None):
         # 从数据库读取已总结的新闻
         db = NewsDatabase()
         
-        # 获取指定时间范围内已总结的新闻
-        with db.get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            if start_date and end_date:
-                # 将datetime转换为日期字符串以匹配数据库格式
-                start_date_str = start_date.strftime('%Y-%m-%d')
-                end_date_str = end_date.strftime('%Y-%m-%d')
-                cursor.execute('''
-                    SELECT * FROM news_items 
-                    WHERE published >= ? AND published <= ? 
-                    AND summary IS NOT NULL AND summary != ''
-                    ORDER BY published DESC
-                ''', (start_date_str, end_date_str))
-            else:
-                # 如果没有指定时间范围，则处理今天抓取的新闻
-                fetch_date = date.today()
-                cursor.execute('''
-                    SELECT * FROM news_items 
-                    WHERE date(fetch_timestamp) = ? AND summary IS NOT NULL AND summary != ''
-                    ORDER BY published DESC
-                ''', (fetch_date,))
-            
-            news_list = [dict(row) for row in cursor.fetchall()]
+        # 获取指定时间范围内已总结的新闻；没有指定时间范围时处理今天抓取的新闻
+        published_range = epoch_range(start_date, end_date) if start_date and end_date else None
+        news_list = db.get_summarized_news(published_range, columns=DIGEST_COLUMNS)
         
         if not news_list:
             time_desc = f"{start_date.strftime('%Y-%m-%d')} 到 {end_date.strftime('%Y-%m-%d')}" if start_date and end_date else "今天"
@@ -251,8 +386,10 @@ def generate_html(start_date=None, end_date=None):
         
         print(f"\n找到 {len(news_list)} 条已总结的新闻")
         
-        # 将字符串日期转换为datetime对象
+        # 将字符串日期转换为datetime对象；总结失败的新闻使用标题代替总结
         for news in news_list:
+            if not news['summary']:
+                news['summary'] = news['title']
             if isinstance(news['published'], str):
                 news['published'] = datetime.fromisoformat(news['published'].replace('Z', '+00:00'))
         
@@ -431,7 +568,7 @@ def send_email(email_type="normal", error_message="", time_range=""):
 
 def cleanup():
     """清理临时文件"""
-    temp_files = ['temp_news.json', 'temp_summarized_news.json']
+    temp_files = ['temp_news.json', 'temp_news.jsonl', 'temp_summarized_news.json']
     for file in temp_files:
         if os.path.exists(file):
             os.remove(file)
@@ -444,10 +581,18 @@ def cleanup_db(args):
     deleted_count = db.cleanup_old_data(days)
     return deleted_count
 
+def vacuum_db(args):
+    """回收数据库空闲空间"""
+    db = NewsDatabase()
+    return db.vacuum(full=args.full)
+
 def clear_db():
     """清空数据库所有数据"""
     db = NewsDatabase()
     deleted_count = db.clear_all_data()
+    
+    # 同步清空RSS源抓取状态，否则已删除的文章不会被重新抓取
+    FeedStateStore(db.db_path).clear()
     return deleted_count
 
 def show_summary():
@@ -468,8 +613,8 @@ def show_summary():
 def main():
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='新闻处理工具')
-    parser.add_argument('action', choices=['fetch', 'summarize', 'html', 'email', 'all', 'cleanup', 'summary', 'query', 'stats', 'cleanup-db', 'clear-db'],
-                      help='执行的操作：fetch=获取新闻, summarize=AI总结, html=生成HTML, email=发送邮件, all=执行所有步骤, cleanup=清理临时文件, summary=显示来源摘要, query=查询历史新闻, stats=显示统计信息, cleanup-db=清理数据库旧数据, clear-db=清空数据库所有数据')
+    parser.add_argument('action', choices=['fetch', 'summarize', 'html', 'email', 'all', 'cleanup', 'summary', 'query', 'stats', 'llm-stats', 'cleanup-db', 'vacuum-db', 'clear-db'],
+                      help='执行的操作：fetch=获取新闻, summarize=AI总结, html=生成HTML, email=发送邮件, all=执行所有步骤, cleanup=清理临时文件, summary=显示来源摘要, query=查询历史新闻, stats=显示统计信息, llm-stats=显示AI调用指标统计（可配合--days）, cleanup-db=清理数据库旧数据, vacuum-db=回收数据库空闲空间, clear-db=清空数据库所有数据')
     
     # 日期相关参数
     parser.add_argument('--date', type=str, help='指定日期 (YYYY-MM-DD)')
@@ -483,11 +628,19 @@ def main():
     parser.add_argument('--query-date', type=str, help='查询指定日期的新闻 (YYYY-MM-DD)')
     parser.add_argument('--query-range', nargs=2, metavar=('START', 'END'), help='查询日期范围的新闻 (YYYY-MM-DD YYYY-MM-DD)')
     parser.add_argument('--query-source', type=str, help='查询指定来源的新闻')
-    parser.add_argument('--search', type=str, help='搜索包含关键词的新闻')
+    parser.add_argument('--search', type=str, help='搜索包含关键词的新闻（可配合--date/--date-range/--days按抓取日期过滤）')
+    parser.add_argument('--limit', type=int, help='查询结果最多显示的条数')
+    parser.add_argument('--format', choices=['text', 'jsonl', 'csv'], default='text', help='查询结果的输出格式 (默认text)')
     
     # 数据库相关参数
     parser.add_argument('--no-save-db', action='store_true', help='不保存到数据库')
     parser.add_argument('--days-to-keep', type=int, default=90, help='清理数据库时保留的天数 (默认90天)')
+    parser.add_argument('--full', action='store_true', help='vacuum-db时执行完整VACUUM（重写数据库文件并开启增量自动清理）')
+    parser.add_argument('--rebuild', action='store_true', help='stats时根据新闻数据重新计算统计表并校验一致性')
+    
+    # 流式处理参数
+    parser.add_argument('--stream', action='store_true', help='流式获取：逐个来源批次去重并分块写入数据库，内存占用与分块大小相关')
+    parser.add_argument('--chunk-size', type=int, default=100, help='流式获取时每个数据库事务保存的新闻数量 (默认100)')
     
     # 调试相关参数
     parser.add_argument('--save-temp', action='store_true', help='保存临时文件用于调试')
@@ -536,9 +689,13 @@ def main():
     elif args.action == 'query':
         query_news(args)
     elif args.action == 'stats':
-        show_stats()
+        show_stats(rebuild=args.rebuild)
+    elif args.action == 'llm-stats':
+        show_llm_stats(args.days)
     elif args.action == 'cleanup-db':
         cleanup_db(args)
+    elif args.action == 'vacuum-db':
+        vacuum_db(args)
     elif args.action == 'clear-db':
         clear_db()
     elif args.action == 'all':
@@ -561,17 +718,7 @@ def main():
         # 检查指定时间范围内是否有新闻（基于发布时间）
         db = NewsDatabase()
         try:
-            with db.get_connection() as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                # 将datetime转换为日期字符串以匹配数据库格式
-                start_date_str = start_date.strftime('%Y-%m-%d')
-                end_date_str = end_date.strftime('%Y-%m-%d')
-                cursor.execute('''
-                    SELECT COUNT(*) as count FROM news_items 
-                    WHERE published >= ? AND published <= ?
-                ''', (start_date_str, end_date_str))
-                existing_count = cursor.fetchone()['count']
+            existing_count = db.count_news_by_published(epoch_range(start_date, end_date))
         except Exception as e:
             error_msg = f"查询数据库时出错: {str(e)}"
             print(f"\n{error_msg}")
@@ -1,13 +1,26 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Set
 from datetime import datetime
 from sources.base import NewsSource
+import asyncio
 
 class NewsManager:
     """新闻管理器，统一管理所有新闻来源"""
     
-    def __init__(self):
-        """初始化新闻管理器"""
+    def __init__(self, max_concurrency: int = 4, deadline: Optional[float] = None):
+        """初始化新闻管理器
+        
+        Args:
+            max_concurrency: int 同时获取新闻的来源数量上限
+            deadline: Optional[float] 获取所有来源新闻的总时限（秒），超时未完成的来源会被放弃，为None则不限制
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency必须大于等于1")
+        
         self.sources: List[NewsSource] = []
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        # 最近一次获取中超时被放弃或抓取出错的来源，这些来源的抓取状态不会被提交
+        self.abandoned_sources: List[NewsSource] = []
     
     def register_source(self, source: NewsSource) -> None:
         """注册新闻来源
@@ -22,7 +35,7 @@ class NewsManager:
                      start_date: Optional[datetime] = None, 
                      end_date: Optional[datetime] = None,
                      source_types: Optional[List[str]] = None) -> List[Dict]:
-        """获取所有来源的新闻
+        """获取所有来源的新闻，各来源并发执行
         
         Args:
             start_date: Optional[datetime] 开始时间
@@ -32,30 +45,163 @@ class NewsManager:
         Returns:
             List[Dict] 合并后的新闻列表
         """
+        # 不使用asyncio.run：它会等待线程池中超时被放弃的来源执行完毕，使总时限失效
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.aget_all_news(start_date, end_date, source_types))
+        finally:
+            loop.close()
+    
+    async def aget_all_news(self,
+                            start_date: Optional[datetime] = None,
+                            end_date: Optional[datetime] = None,
+                            source_types: Optional[List[str]] = None) -> List[Dict]:
+        """异步获取所有来源的新闻
+        
+        所有来源在全局并发上限内同时获取，单个慢来源不会阻塞其他来源；
+        超过总时限仍未完成的来源会被取消（见NewsSource.cancel）并记录在abandoned_sources中，
+        抓取出错的来源同样记录在abandoned_sources中，已完成来源的新闻正常返回。
+        
+        Args:
+            start_date: Optional[datetime] 开始时间
+            end_date: Optional[datetime] 结束时间
+            source_types: Optional[List[str]] 指定的来源类型列表，为None则包含所有类型
+        
+        Returns:
+            List[Dict] 合并后的新闻列表
+        """
+        NewsSource.reset_http_stats()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.abandoned_sources = []
+        
+        # 如果指定了来源类型，则过滤
+        sources = [
+            source for source in self.sources
+            if not source_types or source.source_type in source_types
+        ]
+        
+        async def fetch_source(source: NewsSource) -> List[Dict]:
+            async with semaphore:
+                try:
+                    print(f"\n获取来源 {source.name} 的新闻...")
+                    news_list = await source.aget_news(start_date, end_date)
+                    print(f"从 {source.name} 获取到 {len(news_list)} 条新闻")
+                    return news_list
+                except Exception as e:
+                    print(f"获取来源 {source.name} 新闻时出错: {str(e)}")
+                    self.abandoned_sources.append(source)
+                    return []
+        
+        for source in sources:
+            source.reset_cancel()
+        
+        tasks = [asyncio.create_task(fetch_source(source)) for source in sources]
         all_news = []
         
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+            
+            for source, task in zip(sources, tasks):
+                if task in pending:
+                    # 在线程中运行的来源无法被强制中断，通过取消标志让它尽快结束
+                    source.cancel()
+                    task.cancel()
+                    self.abandoned_sources.append(source)
+                    print(f"获取来源 {source.name} 新闻超时（{self.deadline}秒），已放弃")
+                    continue
+                all_news.extend(task.result())
+            
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        # 去重（基于ID）
+        unique_news = self._deduplicate_news(all_news)
+        
+        # 按发布时间排序
+        sorted_news = sorted(unique_news, key=lambda x: x['published'], reverse=True)
+        
+        print(f"\n总计获取到 {len(all_news)} 条新闻，去重后 {len(unique_news)} 条")
+        self._print_http_stats()
+        return sorted_news
+    
+    def iter_all_news(self,
+                      start_date: Optional[datetime] = None,
+                      end_date: Optional[datetime] = None,
+                      source_types: Optional[List[str]] = None) -> Iterator[Dict]:
+        """流式获取所有来源的新闻，边获取边去重
+        
+        与get_all_news不同，新闻按来源返回的批次逐条产出，不做整体排序，
+        内存中只保留已出现过的新闻ID，适合直接交给数据库分批写入。
+        中途出错的来源已产出的新闻照常返回，但记录在abandoned_sources中，其抓取状态不会被提交。
+        
+        Args:
+            start_date: Optional[datetime] 开始时间
+            end_date: Optional[datetime] 结束时间
+            source_types: Optional[List[str]] 指定的来源类型列表，为None则包含所有类型
+        
+        Yields:
+            Dict 去重后的新闻
+        """
+        seen_ids: Set[str] = set()
+        total_count = 0
+        unique_count = 0
+        NewsSource.reset_http_stats()
+        self.abandoned_sources = []
+        
         for source in self.sources:
             # 如果指定了来源类型，则过滤
             if source_types and source.source_type not in source_types:
                 continue
-                
+            
+            source_count = 0
             try:
                 print(f"\n获取来源 {source.name} 的新闻...")
-                news_list = source.get_news(start_date, end_date)
-                all_news.extend(news_list)
-                print(f"从 {source.name} 获取到 {len(news_list)} 条新闻")
+                for news_batch in source.iter_news(start_date, end_date):
+                    source_count += len(news_batch)
+                    for news in news_batch:
+                        if self._is_duplicate(news, seen_ids):
+                            continue
+                        unique_count += 1
+                        yield news
+                print(f"从 {source.name} 获取到 {source_count} 条新闻")
             except Exception as e:
                 print(f"获取来源 {source.name} 新闻时出错: {str(e)}")
-                continue
+                self.abandoned_sources.append(source)
+            finally:
+                total_count += source_count
         
-        # 去重（基于ID）
-        unique_news = self._deduplicate_news(all_news)
+        print(f"\n总计获取到 {total_count} 条新闻，去重后 {unique_count} 条")
+        self._print_http_stats()
+    
+    def _print_http_stats(self) -> None:
+        """输出本次运行共享HTTP客户端的连接复用情况"""
+        http_stats = NewsSource.get_http_stats()
+        if http_stats['requests']:
+            print(f"HTTP请求 {http_stats['requests']} 次，新建连接 {http_stats['new_connections']} 个，"
+                  f"连接复用率 {http_stats['reuse_rate']:.0%}")
+    
+    def commit_sources_state(self, source_types: Optional[List[str]] = None) -> None:
+        """新闻保存成功后，提交各来源的抓取状态
         
-        # 按发布时间排序
-        sorted_news = sorted(unique_news, key=lambda x: x['published'], reverse=True)
+        超时被放弃的来源没有返回新闻，但其后台线程可能已经暂存了状态（如增量抓取水位）；
+        抓取中途出错的来源暂存的状态也可能包含未产出的新闻。这些状态会被丢弃而不是提交，
+        否则未保存的新闻在下次抓取时会被当作已处理而跳过。
         
-        print(f"\n总计获取到 {len(all_news)} 条新闻，去重后 {len(unique_news)} 条")
-        return sorted_news
+        Args:
+            source_types: Optional[List[str]] 指定的来源类型列表，为None则包含所有类型
+        """
+        for source in self.sources:
+            if source_types and source.source_type not in source_types:
+                continue
+            
+            try:
+                if source in self.abandoned_sources:
+                    source.discard_state()
+                    print(f"来源 {source.name} 未完成抓取，不提交抓取状态")
+                    continue
+                source.commit_state()
+            except Exception as e:
+                print(f"提交来源 {source.name} 抓取状态时出错: {str(e)}")
     
     def get_news_by_source_type(self, 
                                 source_type: str,
@@ -109,19 +255,23 @@ class NewsManager:
         Returns:
             List[Dict] 去重后的新闻列表
         """
-        seen_ids = set()
-        unique_news = []
-        
-        for news in news_list:
-            news_id = news.get('id')
-            if news_id and news_id not in seen_ids:
-                seen_ids.add(news_id)
-                unique_news.append(news)
-            elif not news_id:
-                # 如果没有ID，使用标题+链接作为唯一标识
-                unique_key = f"{news.get('title', '')}_{news.get('link', '')}"
-                if unique_key not in seen_ids:
-                    seen_ids.add(unique_key)
-                    unique_news.append(news)
-        
-        return unique_news 
\ No newline at end of file
+        seen_ids: Set[str] = set()
+        return [news for news in news_list if not self._is_duplicate(news, seen_ids)]
+    
+    def _is_duplicate(self, news: Dict, seen_ids: Set[str]) -> bool:
+        """判断新闻是否已出现过，未出现过则记录下来
+        
+        Args:
+            news: Dict 新闻
+            seen_ids: Set[str] 已出现过的新闻标识
+        
+        Returns:
+            bool 是否重复
+        """
+        # 如果没有ID，使用标题+链接作为唯一标识
+        unique_key = news.get('id') or f"{news.get('title', '')}_{news.get('link', '')}"
+        if unique_key in seen_ids:
+            return True
+        
+        seen_ids.add(unique_key)
+        return False
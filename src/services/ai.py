@@ -1,50 +1,269 @@
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+from services.summary_cache import SummaryCache
 from utils.gpt import GPTHelper, GPTConfig
+from utils.gpt.metrics import percentile
 import time
 
+
 class AISummarizer:
     """AI总结服务"""
     
-    def __init__(self, gpt_config: Optional[GPTConfig] = None):
+    def __init__(self, gpt_config: Optional[GPTConfig] = None, cache: Optional[SummaryCache] = None):
         """初始化AI总结服务
         
         Args:
             gpt_config: GPTConfig GPT配置，如果为None则使用默认配置
+            cache: Optional[SummaryCache] 总结缓存，为None时不使用缓存
         """
         self.gpt = GPTHelper(gpt_config)
+        self.cache = cache
+        self.max_in_flight = self.gpt.config.MAX_IN_FLIGHT
+        # 最近一次summarize_news的运行统计
+        self.last_run_stats: Dict = {}
     
     def summarize_news(self, news_list: List[Dict]) -> List[Dict]:
         """总结新闻列表
         
+        先查询总结缓存，命中缓存的新闻和重复的新闻不再调用API。其余新闻按GPT_BATCH_SIZE和GPT_BATCH_TOKEN_BUDGET分批，每批通过一次请求批量总结，
+        批量结果中缺失或不合法的新闻再逐条总结；批量请求本身失败（如限流）时整批记为失败。并发数大于1时使用线程池同时发起请求，
+        同时进行的请求数不超过GPT_MAX_IN_FLIGHT，请求频率由GPTHelper按GPT_RPM/GPT_TPM限流；结果直接写回原新闻字典，并按原顺序输出进度。
+        
         Args:
             news_list: List[Dict] 新闻列表
         
         Returns:
-            List[Dict] 添加了summary字段的新闻列表
+            List[Dict] 添加了summary字段的新闻列表（顺序不变）；总结失败的新闻summary为空，
+                失败原因记录在summary_error字段中
         """
         print("\n开始AI总结...")
-        total = len(news_list)
-        
-        for i, news in enumerate(news_list, 1):
-            try:
-                # 使用GPT总结标题和副标题
-                title = news['title']
-                subtitle = news.get('subtitle', '')
-                summary = self.gpt.summarize_text(title, subtitle)
-                news['summary'] = summary
-                print(f"总结进度: {i}/{total}")
-                print(f"原标题: {title}")
-                if subtitle:
-                    print(f"副标题: {subtitle}")
-                print(f"总结: {summary}")
-                
-                # 添加延时避免API调用过于频繁
-                if i < total:
-                    time.sleep(1)
-                    
-            except Exception as e:
-                print(f"总结新闻时出错: {str(e)}")
-                news['summary'] = news['title']
+        started = time.monotonic()
+        self.gpt.metrics.reset()
+        cache_keys, news_to_summarize, duplicates = self._apply_cache(news_list)
+        
+        total = len(news_to_summarize)
+        batches = self._make_batches(news_to_summarize)
+        max_in_flight = min(self.max_in_flight, len(batches))
+        latencies: List[float] = []
+        done = 0
         
+        if max_in_flight <= 1:
+            for batch in batches:
+                latencies.extend(self._summarize_batch(batch))
+                for news in batch:
+                    done += 1
+                    self._print_progress(done, total, news)
+        else:
+            print(f"并发总结 {total} 条新闻，共 {len(batches)} 批（最大并发数: {max_in_flight}）")
+            with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+                futures = [executor.submit(self._summarize_batch, batch) for batch in batches]
+                # 按提交顺序等待结果，进度输出与串行模式一致
+                for batch, future in zip(batches, futures):
+                    latencies.extend(future.result())
+                    for news in batch:
+                        done += 1
+                        self._print_progress(done, total, news)
+        
+        for news, same_news in duplicates:
+            news['summary'] = same_news['summary']
+            if same_news.get('summary_error'):
+                news['summary_error'] = same_news['summary_error']
+        
+        self._store_cache(cache_keys, news_to_summarize)
+        self._record_run_stats(news_list, latencies, time.monotonic() - started)
         print("总结完成")
-        return news_list 
\ No newline at end of file
+        return news_list
+    
+    def _apply_cache(self, news_list: List[Dict]) -> Tuple[Dict[str, str], List[Dict], List[Tuple[Dict, Dict]]]:
+        """查询总结缓存并合并相同输入的新闻，命中缓存的新闻直接写入总结
+        
+        标题和副标题相同的新闻（例如同一条新闻出现在多个来源）只调用一次API。
+        
+        Args:
+            news_list: List[Dict] 新闻列表
+        
+        Returns:
+            Tuple[Dict[str, str], List[Dict], List[Tuple[Dict, Dict]]]
+                (新闻ID到缓存键的映射, 需要调用API的新闻, (重复的新闻, 与其输入相同且需要调用API的新闻))
+        """
+        config = self.gpt.config
+        cache_keys = {
+            news['id']: SummaryCache.make_key(
+                config.MODEL, config.SYSTEM_RULES, config.MAX_CHARS, news['title'], news.get('subtitle') or ''
+            )
+            for news in news_list
+        }
+        cached = self.cache.get_many(cache_keys.values()) if self.cache is not None else {}
+        
+        news_to_summarize = []
+        duplicates = []
+        first_by_key: Dict[str, Dict] = {}
+        for news in news_list:
+            key = cache_keys[news['id']]
+            summary = cached.get(key)
+            if summary:
+                news['summary'] = summary
+                news.pop('summary_error', None)
+            elif key in first_by_key:
+                duplicates.append((news, first_by_key[key]))
+            else:
+                first_by_key[key] = news
+                news_to_summarize.append(news)
+        
+        if cached or duplicates:
+            print(f"总结缓存命中 {len(news_list) - len(news_to_summarize) - len(duplicates)} 条，"
+                  f"合并重复新闻 {len(duplicates)} 条，需要调用API {len(news_to_summarize)} 条")
+        return cache_keys, news_to_summarize, duplicates
+    
+    def _store_cache(self, cache_keys: Dict[str, str], news_list: List[Dict]) -> None:
+        """将本次成功的总结写入缓存并淘汰过期条目
+        
+        Args:
+            cache_keys: Dict[str, str] 新闻ID到缓存键的映射
+            news_list: List[Dict] 本次调用API总结的新闻
+        """
+        if self.cache is None:
+            return
+        
+        self.cache.put_many(
+            (cache_keys[news['id']], news['summary']) for news in news_list if news.get('summary')
+        )
+        self.cache.evict()
+    
+    def _make_batches(self, news_list: List[Dict]) -> List[List[Dict]]:
+        """按条数上限和估计的token预算将新闻顺序分批
+        
+        Args:
+            news_list: List[Dict] 新闻列表
+        
+        Returns:
+            List[List[Dict]] 分批后的新闻，单条超出预算的新闻单独成批
+        """
+        batch_size = self.gpt.config.BATCH_SIZE
+        token_budget = self.gpt.config.BATCH_TOKEN_BUDGET
+        
+        batches: List[List[Dict]] = []
+        batch: List[Dict] = []
+        batch_tokens = 0
+        for news in news_list:
+            tokens = self.gpt.estimate_tokens(news['title'], news.get('subtitle') or '')
+            if batch and (len(batch) >= batch_size or batch_tokens + tokens > token_budget):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(news)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _summarize_batch(self, batch: List[Dict]) -> List[float]:
+        """总结一批新闻，批量结果缺失或不合法的新闻逐条重新总结，结果写回新闻字典
+        
+        只有返回内容无法解析（空内容、不是JSON对象）时才整批改为逐条总结；限流、连接错误等
+        请求失败（重试已用尽）时逐条请求只会加重限流，整批记录summary_error，由调用方按退避时间重新排队。
+        
+        Args:
+            batch: List[Dict] 一批新闻
+        
+        Returns:
+            List[float] 本批每次请求的耗时（秒）
+        """
+        if len(batch) == 1:
+            return [self._summarize_one(batch[0])]
+        
+        started = time.monotonic()
+        try:
+            summaries = self.gpt.summarize_batch([
+                {'id': news['id'], 'title': news['title'], 'subtitle': news.get('subtitle') or '',
+                 'source_name': news.get('source_name')}
+                for news in batch
+            ])
+        except ValueError as e:
+            # 包括json.JSONDecodeError和空内容
+            print(f"批量总结返回内容不合法，改为逐条总结: {str(e)}")
+            summaries = {}
+        except Exception as e:
+            print(f"批量总结失败，本批 {len(batch)} 条新闻留待重试: {str(e)}")
+            for news in batch:
+                news['summary'] = ''
+                news['summary_error'] = str(e)
+            return [time.monotonic() - started]
+        latencies = [time.monotonic() - started]
+        
+        for news in batch:
+            summary = summaries.get(news['id'])
+            if summary:
+                news['summary'] = summary
+                news.pop('summary_error', None)
+            else:
+                latencies.append(self._summarize_one(news))
+        return latencies
+    
+    def _summarize_one(self, news: Dict) -> float:
+        """总结单条新闻，结果写回新闻字典
+        
+        Args:
+            news: Dict 新闻
+        
+        Returns:
+            float 请求耗时（秒）
+        """
+        started = time.monotonic()
+        try:
+            # 使用GPT总结标题和副标题
+            summary = self.gpt.summarize_text(news['title'], news.get('subtitle', ''), source=news.get('source_name'))
+            if not summary:
+                raise ValueError("返回内容为空")
+            news['summary'] = summary
+            news.pop('summary_error', None)
+        except Exception as e:
+            news['summary'] = ''
+            news['summary_error'] = str(e)
+        return time.monotonic() - started
+    
+    def _print_progress(self, index: int, total: int, news: Dict) -> None:
+        """输出单条新闻的总结结果"""
+        if news.get('summary_error'):
+            print(f"总结新闻时出错: {news['summary_error']}")
+            return
+        
+        print(f"总结进度: {index}/{total}")
+        print(f"原标题: {news['title']}")
+        if news.get('subtitle'):
+            print(f"副标题: {news['subtitle']}")
+        print(f"总结: {news['summary']}")
+    
+    def _record_run_stats(self, news_list: List[Dict], latencies: List[float], elapsed: float) -> None:
+        """记录并输出本次总结的吞吐量和延迟统计
+        
+        Args:
+            news_list: List[Dict] 新闻列表
+            latencies: List[float] 每次请求的耗时（秒）
+            elapsed: float 总耗时（秒）
+        """
+        failed = sum(1 for news in news_list if news.get('summary_error'))
+        self.last_run_stats = {
+            'total': len(news_list),
+            'failed': failed,
+            'requests': len(latencies),
+            'elapsed': elapsed,
+            'throughput': len(news_list) / elapsed if elapsed > 0 else 0.0,
+            'p50_latency': percentile(latencies, 50),
+            'p95_latency': percentile(latencies, 95),
+        }
+        if self.cache is not None:
+            self.last_run_stats['cache'] = self.cache.get_stats()
+        self.last_run_stats['llm'] = self.gpt.metrics.summary()
+        
+        stats = self.last_run_stats
+        print(f"总结 {stats['total']} 条（失败 {failed} 条），请求 {stats['requests']} 次，耗时 {elapsed:.1f} 秒，"
+              f"吞吐量 {stats['throughput']:.2f} 条/秒")
+        print(f"请求延迟: p50 {stats['p50_latency']:.2f} 秒，p95 {stats['p95_latency']:.2f} 秒")
+        if 'cache' in stats:
+            print(f"总结缓存: 命中 {stats['cache']['hits']} 次，未命中 {stats['cache']['misses']} 次")
+        
+        llm = stats['llm']
+        print(f"API调用 {llm['calls']} 次（失败 {llm['failed']} 次，重试 {llm['retries']} 次），"
+              f"token: 输入 {llm['prompt_tokens']}，输出 {llm['completion_tokens']}，截断总结 {llm['truncated']} 条")
+        if llm['errors'] or llm['retry_errors']:
+            print(f"错误类型: 失败 {llm['errors']}，重试前 {llm['retry_errors']}")
@@ -1,127 +1,698 @@
 import sqlite3
 import json
-from datetime import datetime, date, timedelta
-from typing import List, Dict, Optional, Tuple
+import zlib
+import atexit
+import threading
+from datetime import datetime, date, timedelta, timezone
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Sequence, Set, Tuple, Union
 import os
 
+# news_items中的字段，查询默认只读取这些字段；正文和原始数据存放在news_bodies中，按需加载
+NEWS_COLUMNS = ('id', 'manager_name', 'source_type', 'source_name', 'published', 'published_ts',
+                'title', 'subtitle', 'summary', 'link', 'fetch_timestamp',
+                'summary_status', 'summary_attempts', 'summary_error', 'summary_next_attempt')
+
+# AI总结状态：pending 待总结（包括等待重试），done 已总结，failed 重试次数用尽
+SUMMARY_PENDING = 'pending'
+SUMMARY_DONE = 'done'
+SUMMARY_FAILED = 'failed'
+
+# 旧版本总结失败时写入summary的前缀
+LEGACY_SUMMARY_FAILURE_PREFIX = '总结失败'
+
+# 每次按ID批量读取正文、统计状态的数量（不超过SQLite的参数个数上限）
+BODY_LOAD_BATCH_SIZE = 500
+
+# 流式查询每页读取的新闻数量
+DEFAULT_PAGE_SIZE = 500
+
+# 清理旧数据时每个事务删除的新闻数量，避免长时间持有写锁
+DELETE_BATCH_SIZE = 1000
+
+# 数据库结构迁移，按版本号顺序执行，版本号记录在PRAGMA user_version中。
+# 新增迁移时在末尾追加，不要修改已发布的版本号。
+MIGRATIONS: List[Tuple[int, str]] = [
+    (1, '_migrate_legacy_schema'),
+    (2, '_migrate_add_published_ts'),
+    (3, '_migrate_split_bodies'),
+    (4, '_migrate_add_published_id_index'),
+    (5, '_migrate_add_stats_tables'),
+    (6, '_migrate_add_summary_status'),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# 迁移时每批复制的行数，每批单独提交
+MIGRATION_BATCH_SIZE = 2000
+
+
+def news_columns_sql(columns: Optional[Sequence[str]] = None, alias: str = '') -> str:
+    """生成查询news_items的字段列表
+    
+    Args:
+        columns: Optional[Sequence[str]] 需要的字段，为None时使用NEWS_COLUMNS
+        alias: str 表别名
+    
+    Returns:
+        str 逗号分隔的字段列表
+    
+    Raises:
+        ValueError: 字段不在NEWS_COLUMNS中时抛出（正文请使用with_content或load_content读取）
+    """
+    columns = columns or NEWS_COLUMNS
+    unknown = [column for column in columns if column not in NEWS_COLUMNS]
+    if unknown:
+        raise ValueError(f"不支持查询的字段: {', '.join(unknown)}")
+    
+    prefix = f'{alias}.' if alias else ''
+    return ', '.join(prefix + column for column in columns)
+
+
+def encode_body(text: Optional[str], compress: bool) -> Union[bytes, str, None]:
+    """编码正文等大字段，压缩后以BLOB存储
+    
+    Args:
+        text: Optional[str] 原始文本
+        compress: bool 是否使用zlib压缩
+    
+    Returns:
+        Union[bytes, str, None] 存储值
+    """
+    if text is None or not compress:
+        return text
+    return zlib.compress(text.encode('utf-8'))
+
+
+def decode_body(value: Union[bytes, str, None]) -> Optional[str]:
+    """解码news_bodies中的字段，压缩（BLOB）和未压缩（TEXT）的值都可以读取
+    
+    Args:
+        value: Union[bytes, str, None] 存储值
+    
+    Returns:
+        Optional[str] 原始文本
+    """
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode('utf-8')
+    return value
+
+
+def connect_database(db_path: str, **kwargs) -> sqlite3.Connection:
+    """打开新闻数据库连接，并注册全文索引触发器和视图依赖的news_body_text函数
+    
+    news_fts的视图和触发器通过news_body_text读取news_bodies中压缩存储的正文，没有注册该函数的连接
+    写入或删除新闻、读取搜索片段时会报错（no such function: news_body_text）。
+    访问新闻数据库的代码都应通过此函数打开连接；使用sqlite3命令行等外部工具修改news_items/news_bodies前，
+    也需要先注册同名函数（参数为正文存储值，返回解压后的文本）。
+    
+    Args:
+        db_path: str 数据库文件路径
+        **kwargs: 传给sqlite3.connect的其他参数
+    
+    Returns:
+        sqlite3.Connection 数据库连接
+    """
+    conn = sqlite3.connect(db_path, **kwargs)
+    conn.create_function('news_body_text', 1, decode_body, deterministic=True)
+    return conn
+
+
+def to_epoch(value: datetime) -> int:
+    """将时间转换为UTC时间戳（秒），不带时区的时间按UTC处理
+    
+    Args:
+        value: datetime 时间
+    
+    Returns:
+        int UTC时间戳
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def epoch_range(start: datetime, end: datetime) -> Tuple[int, int]:
+    """将闭区间[start, end]转换为published_ts上的左闭右开区间
+    
+    Args:
+        start: datetime 开始时间
+        end: datetime 结束时间（包含，如23:59:59.999999）
+    
+    Returns:
+        Tuple[int, int] (开始时间戳, 结束时间戳+1)，用于 published_ts >= ? AND published_ts < ?
+    """
+    return to_epoch(start), to_epoch(end) + 1
+
+
+def day_range(start_date: date, end_date: Optional[date] = None) -> Tuple[str, str]:
+    """将日期闭区间转换为fetch_timestamp上的左闭右开区间
+    
+    fetch_timestamp以"YYYY-MM-DD HH:MM:SS"文本存储，按字符串比较即按时间比较，
+    因此 fetch_timestamp >= '开始日' AND fetch_timestamp < '结束日次日' 可以直接使用索引，
+    而 date(fetch_timestamp) BETWEEN ... 需要对每一行计算表达式。
+    
+    Args:
+        start_date: date 开始日期
+        end_date: Optional[date] 结束日期（包含），为None时只查询开始日期当天
+    
+    Returns:
+        Tuple[str, str] (开始日期, 结束日期次日)
+    """
+    end_date = end_date or start_date
+    return start_date.isoformat(), (end_date + timedelta(days=1)).isoformat()
+
+
 class NewsDatabase:
-    """新闻数据库服务"""
+    """新闻数据库服务
+    
+    每个线程对每个数据库文件只打开一个长连接并在进程内复用（WAL模式，读写互不阻塞），
+    表结构初始化和迁移检查在每个进程中只执行一次。
+    """
     
-    def __init__(self, db_path: str = "data/news.db"):
+    # 线程本地的长连接：{数据库绝对路径: 连接}
+    _local = threading.local()
+    # 进程内打开过的所有连接，退出时统一关闭
+    _connections: List[sqlite3.Connection] = []
+    # 本进程中已完成初始化和迁移检查的数据库
+    _initialized_paths: Set[str] = set()
+    # 本进程中FTS5全文索引可用的数据库
+    _search_index_paths: Set[str] = set()
+    _lock = threading.RLock()
+    
+    def __init__(self, db_path: str = "data/news.db",
+                 cache_size_kb: Optional[int] = None,
+                 mmap_size: Optional[int] = None,
+                 compress_bodies: Optional[bool] = None):
         """初始化数据库
         
         Args:
             db_path: str 数据库文件路径
+            cache_size_kb: Optional[int] 每个连接的页缓存大小（KB），为None则读取NEWS_DB_CACHE_SIZE_KB环境变量
+            mmap_size: Optional[int] 内存映射大小（字节），为None则读取NEWS_DB_MMAP_SIZE环境变量
+            compress_bodies: Optional[bool] 是否压缩存储正文和原始数据，为None则读取NEWS_DB_COMPRESS_BODIES环境变量
         """
         self.db_path = db_path
+        self.cache_size_kb = cache_size_kb if cache_size_kb is not None else int(os.getenv('NEWS_DB_CACHE_SIZE_KB', '16384'))
+        self.mmap_size = mmap_size if mmap_size is not None else int(os.getenv('NEWS_DB_MMAP_SIZE', str(64 * 1024 * 1024)))
+        if compress_bodies is None:
+            compress_bodies = os.getenv('NEWS_DB_COMPRESS_BODIES', '1') == '1'
+        self.compress_bodies = compress_bodies
+        self._path_key = os.path.abspath(db_path)
+        
+        # 最近一次批量保存的统计：新增、已存在、无效的数量
+        self.last_batch_stats: Dict[str, int] = {'inserted': 0, 'duplicates': 0, 'rejected': 0}
         
         # 确保目录存在
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
-        # 初始化数据库
-        self._init_database()
+        with NewsDatabase._lock:
+            if self._path_key not in NewsDatabase._initialized_paths:
+                # 结构版本已是最新时只需读取一次user_version
+                if self.get_schema_version() < SCHEMA_VERSION:
+                    # 初始化数据库
+                    self._init_database()
+                    
+                    # 检查并执行数据库迁移
+                    self._migrate_database()
+                
+                # 建立全文索引（SQLite不支持FTS5时搜索回退到LIKE）
+                if self._init_search_index():
+                    NewsDatabase._search_index_paths.add(self._path_key)
+                
+                NewsDatabase._initialized_paths.add(self._path_key)
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """获取当前线程的数据库长连接
+        
+        连接在首次使用时创建并一直复用，可以直接用于with语句（退出时提交或回滚，但不会关闭连接）。
+        
+        Returns:
+            sqlite3.Connection 数据库连接，row_factory为sqlite3.Row
+        """
+        connections = getattr(NewsDatabase._local, 'connections', None)
+        if connections is None:
+            connections = NewsDatabase._local.connections = {}
+        
+        conn = connections.get(self._path_key)
+        if conn is None:
+            conn = self._open_connection()
+            connections[self._path_key] = conn
+        return conn
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """打开并调优一个新的数据库连接"""
+        # cached_statements：复用预编译语句，避免重复解析相同的SQL
+        conn = connect_database(self.db_path, cached_statements=256, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        
+        # 新建的数据库开启增量自动清理（必须在切换WAL之前设置），删除数据后可以通过incremental_vacuum回收空间；
+        # 已有数据的数据库需要执行一次完整VACUUM才会生效（见vacuum()）
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        
+        # WAL模式下读操作不会阻塞写操作；NORMAL同步级别在WAL下足够安全且更快
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size={-int(self.cache_size_kb)}')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        conn.execute('PRAGMA busy_timeout=5000')
         
-        # 检查并执行数据库迁移
-        self._migrate_database()
+        with NewsDatabase._lock:
+            NewsDatabase._connections.append(conn)
+        return conn
     
-    def get_connection(self):
-        """获取数据库连接"""
-        return sqlite3.connect(self.db_path)
+    @classmethod
+    def close_all_connections(cls) -> None:
+        """关闭本进程打开的所有数据库连接（同时完成WAL检查点）"""
+        with cls._lock:
+            connections, cls._connections = cls._connections, []
+        
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        
+        cls._local = threading.local()
     
     def _init_database(self):
         """初始化数据库表结构"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             
             # 检查表是否已存在
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='news_items'")
             table_exists = cursor.fetchone()
             
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS news_bodies (
+                    id TEXT PRIMARY KEY,
+                    content BLOB,
+                    raw_data BLOB
+                )
+            ''')
+            
             if not table_exists:
-                # 创建新表（包含subtitle字段的结构）
+                # 创建新表（正文和原始数据存放在news_bodies中）
+                cursor.execute(self._create_news_items_sql())
+                
+                # 创建索引和触发器
+                self._create_current_schema_objects(cursor)
+                
+                # 新建的数据库已是最新结构，不需要执行迁移
+                conn.commit()
+                self._set_schema_version(conn, SCHEMA_VERSION)
+                
+                print("创建了正文独立存储的数据库结构")
+            else:
+                # 删除新闻时同步删除正文
+                self._create_body_delete_trigger(cursor)
+            
+            conn.commit()
+    
+    def _create_body_delete_trigger(self, cursor):
+        """删除新闻时同步删除news_bodies中的正文"""
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS news_items_body_delete AFTER DELETE ON news_items BEGIN
+                DELETE FROM news_bodies WHERE id = old.id;
+            END
+        ''')
+    
+    def _create_current_schema_objects(self, cursor):
+        """为当前结构的news_items创建全部索引和触发器"""
+        self._create_indexes(cursor)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_published_ts ON news_items(published_ts)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_source_fetch ON news_items(source_name, fetch_timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_published_id ON news_items(published, id)')
+        self._create_summary_queue_index(cursor)
+        self._create_body_delete_trigger(cursor)
+        self._create_stats_tables(cursor)
+    
+    def _create_summary_queue_index(self, cursor):
+        """待总结新闻的部分索引，只包含pending状态的行，总结完成后行会从索引中移除"""
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_summary_pending ON news_items(published_ts)
+            WHERE summary_status = 'pending'
+        ''')
+    
+    def _create_stats_tables(self, cursor):
+        """创建按抓取日期和按来源的统计表，以及在news_items上维护统计的触发器
+        
+        统计表的行数只与天数和来源数有关，get_statistics读取统计表，不再扫描news_items。
+        计数降为0的行会被删除，因此统计表中的日期范围就是现有新闻的日期范围。
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS news_stats_daily (
+                fetch_date TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS news_stats_source (
+                source_name TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS news_items_stats_insert AFTER INSERT ON news_items BEGIN
+                INSERT INTO news_stats_daily (fetch_date, count) VALUES (date(new.fetch_timestamp), 1)
+                ON CONFLICT(fetch_date) DO UPDATE SET count = count + 1;
+                INSERT INTO news_stats_source (source_name, count) VALUES (new.source_name, 1)
+                ON CONFLICT(source_name) DO UPDATE SET count = count + 1;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS news_items_stats_delete AFTER DELETE ON news_items BEGIN
+                UPDATE news_stats_daily SET count = count - 1 WHERE fetch_date = date(old.fetch_timestamp);
+                DELETE FROM news_stats_daily WHERE fetch_date = date(old.fetch_timestamp) AND count <= 0;
+                UPDATE news_stats_source SET count = count - 1 WHERE source_name = old.source_name;
+                DELETE FROM news_stats_source WHERE source_name = old.source_name AND count <= 0;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS news_items_stats_update
+            AFTER UPDATE OF fetch_timestamp, source_name ON news_items
+            WHEN date(old.fetch_timestamp) IS NOT date(new.fetch_timestamp) OR old.source_name IS NOT new.source_name
+            BEGIN
+                UPDATE news_stats_daily SET count = count - 1 WHERE fetch_date = date(old.fetch_timestamp);
+                DELETE FROM news_stats_daily WHERE fetch_date = date(old.fetch_timestamp) AND count <= 0;
+                UPDATE news_stats_source SET count = count - 1 WHERE source_name = old.source_name;
+                DELETE FROM news_stats_source WHERE source_name = old.source_name AND count <= 0;
+                INSERT INTO news_stats_daily (fetch_date, count) VALUES (date(new.fetch_timestamp), 1)
+                ON CONFLICT(fetch_date) DO UPDATE SET count = count + 1;
+                INSERT INTO news_stats_source (source_name, count) VALUES (new.source_name, 1)
+                ON CONFLICT(source_name) DO UPDATE SET count = count + 1;
+            END
+        ''')
+    
+    def _create_news_items_sql(self, table_name: str = 'news_items') -> str:
+        """生成创建news_items表（不含正文和原始数据）的语句
+        
+        Args:
+            table_name: str 表名，迁移时先创建为临时表名
+        
+        Returns:
+            str 建表语句
+        """
+        return f'''
+            CREATE TABLE {table_name} (
+                id TEXT PRIMARY KEY,
+                manager_name TEXT,
+                source_type TEXT NOT NULL,
+                source_name TEXT NOT NULL,
+                published DATETIME NOT NULL,
+                title TEXT NOT NULL,
+                subtitle TEXT,
+                summary TEXT,
+                link TEXT NOT NULL,
+                fetch_timestamp DATETIME DEFAULT (datetime('now', 'localtime')),
+                published_ts INTEGER,
+                summary_status TEXT NOT NULL DEFAULT 'pending',
+                summary_attempts INTEGER NOT NULL DEFAULT 0,
+                summary_error TEXT,
+                summary_next_attempt INTEGER
+            )
+        '''
+    
+    def _init_search_index(self) -> bool:
+        """初始化全文索引
+        
+        news_fts为外部内容FTS5表，只存储索引不重复存储正文。内容来自news_search_source视图，
+        视图把news_items的标题等字段和news_bodies中解压后的正文按rowid拼接在一起。
+        使用trigram分词器，中文按连续3个字符切分，不依赖分词词典。
+        索引由触发器保持同步：正文写入news_bodies时建立索引，新闻删除或标题等字段更新时同步修改。
+        触发器不存在时（首次创建或迁移重建了news_items表）会根据现有数据重建索引。
+        视图和触发器依赖应用注册的news_body_text函数，写入新闻的连接必须通过connect_database打开。
+        
+        Returns:
+            bool 全文索引是否可用
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # 旧版本的全文索引直接以news_items为内容表，正文拆分后需要重建
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='news_fts'")
+            existing = cursor.fetchone()
+            if existing and 'news_search_source' not in existing[0]:
+                for trigger in ('news_items_fts_insert', 'news_items_fts_delete', 'news_items_fts_update'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+                cursor.execute('DROP TABLE news_fts')
+            
+            cursor.execute('''
+                CREATE VIEW IF NOT EXISTS news_search_source AS
+                SELECT n.rowid AS news_rowid, n.title, n.subtitle, n.summary,
+                       news_body_text(b.content) AS content
+                FROM news_items n
+                LEFT JOIN news_bodies b ON b.id = n.id
+            ''')
+            
+            try:
                 cursor.execute('''
-                    CREATE TABLE news_items (
-                        id TEXT PRIMARY KEY,
-                        manager_name TEXT,
-                        source_type TEXT NOT NULL,
-                        source_name TEXT NOT NULL,
-                        published DATETIME NOT NULL,
-                        title TEXT NOT NULL,
-                        subtitle TEXT,
-                        summary TEXT,
-                        content TEXT NOT NULL,
-                        link TEXT NOT NULL,
-                        fetch_timestamp DATETIME DEFAULT (datetime('now', 'localtime')),
-                        raw_data TEXT
+                    CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+                        title, subtitle, summary, content,
+                        content='news_search_source', content_rowid='news_rowid',
+                        tokenize='trigram'
                     )
                 ''')
-                
-                # 创建索引
-                cursor.execute('CREATE INDEX idx_published ON news_items(published)')
-                cursor.execute('CREATE INDEX idx_source_name ON news_items(source_name)')
-                cursor.execute('CREATE INDEX idx_source_type ON news_items(source_type)')
-                cursor.execute('CREATE INDEX idx_fetch_timestamp ON news_items(fetch_timestamp)')
-                cursor.execute('CREATE INDEX idx_fetch_date ON news_items(date(fetch_timestamp))')
-                
-                print("创建了包含subtitle字段的数据库结构")
+            except sqlite3.OperationalError as e:
+                print(f"当前SQLite不支持FTS5 trigram全文索引，搜索将使用LIKE: {str(e)}")
+                return False
+            
+            cursor.execute('''
+                SELECT COUNT(*) FROM sqlite_master WHERE type='trigger'
+                AND name IN ('news_bodies_fts_insert', 'news_items_fts_delete', 'news_items_fts_update')
+            ''')
+            if cursor.fetchone()[0] == 3:
+                return True
             
+            # 保存新闻时先写入news_items，再写入news_bodies，此时标题和正文都已就绪
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS news_bodies_fts_insert AFTER INSERT ON news_bodies BEGIN
+                    INSERT INTO news_fts(rowid, title, subtitle, summary, content)
+                    SELECT n.rowid, n.title, n.subtitle, n.summary, news_body_text(new.content)
+                    FROM news_items n WHERE n.id = new.id;
+                END
+            ''')
+            # 删除索引需要原始正文，因此在删除news_items之前（正文被级联删除之前）执行
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS news_items_fts_delete BEFORE DELETE ON news_items BEGIN
+                    INSERT INTO news_fts(news_fts, rowid, title, subtitle, summary, content)
+                    SELECT 'delete', old.rowid, old.title, old.subtitle, old.summary, news_body_text(b.content)
+                    FROM news_bodies b WHERE b.id = old.id;
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS news_items_fts_update
+                AFTER UPDATE OF title, subtitle, summary ON news_items BEGIN
+                    INSERT INTO news_fts(news_fts, rowid, title, subtitle, summary, content)
+                    SELECT 'delete', old.rowid, old.title, old.subtitle, old.summary, news_body_text(b.content)
+                    FROM news_bodies b WHERE b.id = old.id;
+                    INSERT INTO news_fts(rowid, title, subtitle, summary, content)
+                    SELECT new.rowid, new.title, new.subtitle, new.summary, news_body_text(b.content)
+                    FROM news_bodies b WHERE b.id = new.id;
+                END
+            ''')
+            
+            self._rebuild_search_index(cursor)
             conn.commit()
+            return True
+    
+    def _rebuild_search_index(self, cursor) -> None:
+        """根据news_items中的现有数据重建全文索引"""
+        cursor.execute("INSERT INTO news_fts(news_fts) VALUES ('rebuild')")
+        cursor.execute('SELECT COUNT(*) FROM news_items')
+        print(f"已重建全文索引，共 {cursor.fetchone()[0]} 条新闻")
+    
+    def get_schema_version(self) -> int:
+        """读取数据库结构版本（PRAGMA user_version）
+        
+        Returns:
+            int 结构版本，未经过版本化迁移的数据库为0
+        """
+        with self.get_connection() as conn:
+            return conn.execute('PRAGMA user_version').fetchone()[0]
+    
+    def _set_schema_version(self, conn, version: int):
+        """写入数据库结构版本"""
+        conn.execute(f'PRAGMA user_version = {int(version)}')
     
     def _migrate_database(self):
-        """数据库迁移：处理从旧结构到新结构的升级"""
-        with sqlite3.connect(self.db_path) as conn:
+        """数据库迁移：按MIGRATIONS中的顺序执行版本号高于当前版本的迁移
+        
+        每个迁移成功后立即记录版本号，中途失败时下次启动从失败的迁移继续。
+        迁移步骤本身也会检查表结构，对未记录版本号的旧数据库重复执行不会出错。
+        """
+        current_version = self.get_schema_version()
+        if current_version >= SCHEMA_VERSION:
+            return
+        
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # 检查当前表结构
-            cursor.execute("PRAGMA table_info(news_items)")
-            columns = {col[1]: col for col in cursor.fetchall()}
+            for version, method_name in MIGRATIONS:
+                if version <= current_version:
+                    continue
+                
+                print(f"执行数据库迁移 v{version}: {method_name}")
+                getattr(self, method_name)(cursor, conn)
+                conn.commit()
+                self._set_schema_version(conn, version)
             
-            # 检查并执行数据库迁移
-            self._migrate_database_if_needed(cursor, conn)
+            print(f"数据库结构已升级到 v{SCHEMA_VERSION}")
+    
+    def _copy_in_batches(self, conn, step: str, select_sql: str, insert_sql: str,
+                         transform: Optional[Callable[[sqlite3.Row], Tuple]] = None) -> int:
+        """按rowid分批复制数据，每批单独提交，进度记录在migration_progress表中
+        
+        中途中断（进程退出、磁盘已满等）后再次执行同一步骤时，从上次提交的位置继续复制。
+        
+        Args:
+            conn: 数据库连接
+            step: str 步骤名称，用于记录进度
+            select_sql: str 读取语句，第一列必须是来源表的rowid，
+                并包含 WHERE rowid > ? ORDER BY rowid LIMIT ? 两个参数
+            insert_sql: str 写入语句
+            transform: Optional[Callable] 将读取的一行转换为写入参数，为None时直接使用整行
+        
+        Returns:
+            int 本步骤累计复制的行数
+        """
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS migration_progress (
+                step TEXT PRIMARY KEY,
+                last_rowid INTEGER NOT NULL,
+                copied INTEGER NOT NULL
+            )
+        ''')
+        
+        row = conn.execute('SELECT last_rowid, copied FROM migration_progress WHERE step = ?', (step,)).fetchone()
+        last_rowid, copied = (row['last_rowid'], row['copied']) if row else (0, 0)
+        if row:
+            print(f"从上次中断处继续: 已复制 {copied} 条")
+        
+        total = conn.execute('SELECT COUNT(*) FROM news_items').fetchone()[0]
+        
+        while True:
+            rows = conn.execute(select_sql, (last_rowid, MIGRATION_BATCH_SIZE)).fetchall()
+            if not rows:
+                break
             
+            conn.executemany(insert_sql, [transform(r) if transform else tuple(r) for r in rows])
+            last_rowid = rows[-1][0]
+            copied += len(rows)
+            conn.execute(
+                'INSERT OR REPLACE INTO migration_progress (step, last_rowid, copied) VALUES (?, ?, ?)',
+                (step, last_rowid, copied)
+            )
+            conn.commit()
+            print(f"  {step}: {copied}/{total}")
+        
+        return copied
+    
+    def _finish_copy(self, conn, step: str):
+        """清除步骤的复制进度"""
+        conn.execute('DELETE FROM migration_progress WHERE step = ?', (step,))
+    
+    def _rebuild_news_items(self, conn, step: str, create_sql: str, columns: Sequence[str],
+                            select_exprs: Sequence[str], recreate: Optional[Callable] = None) -> int:
+        """分批重建news_items表：复制到news_items_new后替换原表
+        
+        复制时保留rowid，复制完成后在一个事务中删除旧表、重命名新表并创建索引，
+        因此任何时候中断，原表都保持完整可用。
+        
+        Args:
+            conn: 数据库连接
+            step: str 步骤名称，用于记录进度
+            create_sql: str 创建news_items_new的语句
+            columns: Sequence[str] 新表的字段
+            select_exprs: Sequence[str] 与columns一一对应的旧表取值表达式
+            recreate: Optional[Callable] 替换后创建索引和触发器的函数，参数为游标，默认使用_create_indexes
+        
+        Returns:
+            int 复制的行数
+        """
+        conn.commit()
+        
+        progress_exists = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='migration_progress'"
+        ).fetchone() and conn.execute('SELECT 1 FROM migration_progress WHERE step = ?', (step,)).fetchone()
+        if not progress_exists:
+            # 没有进度记录时，残留的新表不可信，重新开始
+            conn.execute('DROP TABLE IF EXISTS news_items_new')
+            conn.execute(create_sql)
+        
+        placeholders = ', '.join('?' * (len(columns) + 1))
+        copied = self._copy_in_batches(
+            conn, step,
+            f"SELECT rowid, {', '.join(select_exprs)} FROM news_items WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            f"INSERT INTO news_items_new (rowid, {', '.join(columns)}) VALUES ({placeholders})"
+        )
+        
+        # 替换原表（显式事务，保证删除、重命名、建索引要么全部完成要么全部不做）
+        # 旧表上的触发器随旧表一起删除，全文索引的触发器会在_init_search_index中重新创建
+        conn.execute('BEGIN')
+        try:
+            conn.execute('DROP TABLE news_items')
+            conn.execute('ALTER TABLE news_items_new RENAME TO news_items')
+            (recreate or self._create_indexes)(conn.cursor())
+            self._finish_copy(conn, step)
             conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        return copied
     
-    def _migrate_database_if_needed(self, cursor, conn):
-        """检查并执行必要的数据库迁移"""
+    def _migrate_legacy_schema(self, cursor, conn):
+        """依次执行旧版本的表结构迁移，直到表结构不再需要调整"""
+        while self._migrate_database_if_needed(cursor, conn):
+            pass
+    
+    def _migrate_database_if_needed(self, cursor, conn) -> bool:
+        """检查并执行一个必要的旧版本表结构迁移
+        
+        Returns:
+            bool 是否执行了迁移
+        """
         # 获取当前表结构
         cursor.execute("PRAGMA table_info(news_items)")
         columns = [column[1] for column in cursor.fetchall()]
         
-        # 检查是否需要添加subtitle字段
-        if 'subtitle' not in columns:
-            print("检测到缺少subtitle字段，开始添加...")
-            self._migrate_add_subtitle(cursor, conn)
-            return
-        
         # 检查是否需要从旧结构迁移
         if 'source' in columns and 'source_name' not in columns:
             print("检测到旧表结构，开始迁移...")
             self._migrate_from_old_structure(cursor, conn)
-            return
+            return True
         
         # 检查是否有created_at字段需要重命名
         if 'created_at' in columns and 'fetch_timestamp' not in columns:
             print("检测到created_at字段，开始重命名迁移...")
             self._migrate_created_at_to_fetch_timestamp(cursor, conn)
-            return
+            return True
         
         # 检查是否有fetch_date字段需要删除
         if 'fetch_date' in columns:
             print("检测到冗余的fetch_date字段，开始去除...")
             self._migrate_remove_fetch_date(cursor, conn)
-            return
+            return True
         
         # 检查字段顺序是否需要调整（通过检查第2个字段是否为manager_name）
         if len(columns) > 1 and columns[1] != 'manager_name':
             print("检测到字段顺序需要调整，开始重排...")
             self._migrate_reorder_fields(cursor, conn)
-            return
+            return True
+        
+        # 检查是否需要添加subtitle字段
+        if 'subtitle' not in columns:
+            print("检测到缺少subtitle字段，开始添加...")
+            self._migrate_add_subtitle(cursor, conn)
+            return True
+        
+        return False
     
     def _migrate_from_old_structure(self, cursor, conn):
         """从旧结构迁移到新结构"""
         try:
-            # 创建新表
-            cursor.execute('''
+            self._rebuild_news_items(conn, 'from_old_structure', '''
                 CREATE TABLE news_items_new (
                     id TEXT PRIMARY KEY,
                     source_name TEXT NOT NULL,
@@ -136,37 +707,14 @@ class NewsDatabase:
                     fetch_timestamp DATETIME DEFAULT (datetime('now', 'localtime')),
                     raw_data TEXT
                 )
-            ''')
-            
-            # 迁移数据
-            cursor.execute('''
-                INSERT INTO news_items_new 
-                (id, source_name, source_type, manager_name, title, content, summary, 
-                 published, link, fetch_date, fetch_timestamp, raw_data)
-                SELECT 
-                    id, 
-                    COALESCE(source, '未知来源') as source_name,
-                    source_type,
-                    COALESCE(source, 'RSS聚合') as manager_name,
-                    title, 
-                    content, 
-                    summary, 
-                    published, 
-                    link, 
-                    fetch_date, 
-                    COALESCE(created_at, CURRENT_TIMESTAMP) as fetch_timestamp,
-                    raw_data
-                FROM news_items
-            ''')
-            
-            # 删除旧表并重命名
-            cursor.execute('DROP TABLE news_items')
-            cursor.execute('ALTER TABLE news_items_new RENAME TO news_items')
-            
-            # 创建索引
-            self._create_indexes(cursor)
-            
-            conn.commit()
+            ''', (
+                'id', 'source_name', 'source_type', 'manager_name', 'title', 'content', 'summary',
+                'published', 'link', 'fetch_date', 'fetch_timestamp', 'raw_data'
+            ), (
+                'id', "COALESCE(source, '未知来源')", 'source_type', "COALESCE(source, 'RSS聚合')",
+                'title', 'content', 'summary', 'published', 'link', 'fetch_date',
+                'COALESCE(created_at, CURRENT_TIMESTAMP)', 'raw_data'
+            ))
             print("从旧结构迁移完成！")
             
         except Exception as e:
@@ -177,8 +725,7 @@ class NewsDatabase:
     def _migrate_created_at_to_fetch_timestamp(self, cursor, conn):
         """将created_at字段重命名为fetch_timestamp"""
         try:
-            # 创建新表
-            cursor.execute('''
+            self._rebuild_news_items(conn, 'created_at_to_fetch_timestamp', '''
                 CREATE TABLE news_items_new (
                     id TEXT PRIMARY KEY,
                     source_name TEXT NOT NULL,
@@ -193,27 +740,13 @@ class NewsDatabase:
                     fetch_timestamp DATETIME DEFAULT (datetime('now', 'localtime')),
                     raw_data TEXT
                 )
-            ''')
-            
-            # 迁移数据（created_at重命名为fetch_timestamp）
-            cursor.execute('''
-                INSERT INTO news_items_new 
-                (id, source_name, source_type, manager_name, title, content, summary, 
-                 published, link, fetch_date, fetch_timestamp, raw_data)
-                SELECT 
-                    id, source_name, source_type, manager_name, title, content, summary, 
-                    published, link, fetch_date, created_at as fetch_timestamp, raw_data
-                FROM news_items
-            ''')
-            
-            # 删除旧表并重命名
-            cursor.execute('DROP TABLE news_items')
-            cursor.execute('ALTER TABLE news_items_new RENAME TO news_items')
-            
-            # 创建索引
-            self._create_indexes(cursor)
-            
-            conn.commit()
+            ''', (
+                'id', 'source_name', 'source_type', 'manager_name', 'title', 'content', 'summary',
+                'published', 'link', 'fetch_date', 'fetch_timestamp', 'raw_data'
+            ), (
+                'id', 'source_name', 'source_type', 'manager_name', 'title', 'content', 'summary',
+                'published', 'link', 'fetch_date', 'created_at', 'raw_data'
+            ))
             print("字段重命名迁移完成！")
             
         except Exception as e:
@@ -223,9 +756,12 @@ class NewsDatabase:
     
     def _migrate_remove_fetch_date(self, cursor, conn):
         """去掉冗余的fetch_date字段"""
+        columns = (
+            'id', 'source_name', 'source_type', 'manager_name', 'title', 'content', 'summary',
+            'published', 'link', 'fetch_timestamp', 'raw_data'
+        )
         try:
-            # 创建新表
-            cursor.execute('''
+            self._rebuild_news_items(conn, 'remove_fetch_date', '''
                 CREATE TABLE news_items_new (
                     id TEXT PRIMARY KEY,
                     source_name TEXT NOT NULL,
@@ -239,27 +775,7 @@ class NewsDatabase:
                     fetch_timestamp DATETIME DEFAULT (datetime('now', 'localtime')),
                     raw_data TEXT
                 )
-            ''')
-            
-            # 迁移数据（去掉fetch_date）
-            cursor.execute('''
-                INSERT INTO news_items_new 
-                (id, source_name, source_type, manager_name, title, content, summary, 
-                 published, link, fetch_timestamp, raw_data)
-                SELECT 
-                    id, source_name, source_type, manager_name, title, content, summary, 
-                    published, link, fetch_timestamp, raw_data
-                FROM news_items
-            ''')
-            
-            # 删除旧表并重命名
-            cursor.execute('DROP TABLE news_items')
-            cursor.execute('ALTER TABLE news_items_new RENAME TO news_items')
-            
-            # 创建索引
-            self._create_indexes(cursor)
-            
-            conn.commit()
+            ''', columns, columns)
             print("冗余字段迁移完成！")
             
         except Exception as e:
@@ -269,9 +785,12 @@ class NewsDatabase:
     
     def _migrate_fix_timezone(self, cursor, conn):
         """修复UTC时间戳问题"""
+        columns = (
+            'id', 'source_name', 'source_type', 'manager_name', 'title', 'content', 'summary',
+            'published', 'link', 'fetch_timestamp', 'raw_data'
+        )
         try:
-            # 创建新表
-            cursor.execute('''
+            self._rebuild_news_items(conn, 'fix_timezone', '''
                 CREATE TABLE news_items_new (
                     id TEXT PRIMARY KEY,
                     source_name TEXT NOT NULL,
@@ -285,27 +804,7 @@ class NewsDatabase:
                     fetch_timestamp DATETIME DEFAULT (datetime('now', 'localtime')),
                     raw_data TEXT
                 )
-            ''')
-            
-            # 迁移数据（修复时间戳）
-            cursor.execute('''
-                INSERT INTO news_items_new 
-                (id, source_name, source_type, manager_name, title, content, summary, 
-                 published, link, fetch_timestamp, raw_data)
-                SELECT 
-                    id, source_name, source_type, manager_name, title, content, summary, 
-                    published, link, datetime(fetch_timestamp, "localtime"), raw_data
-                FROM news_items
-            ''')
-            
-            # 删除旧表并重命名
-            cursor.execute('DROP TABLE news_items')
-            cursor.execute('ALTER TABLE news_items_new RENAME TO news_items')
-            
-            # 创建索引
-            self._create_indexes(cursor)
-            
-            conn.commit()
+            ''', columns, columns[:9] + ("datetime(fetch_timestamp, 'localtime')", 'raw_data'))
             print("UTC时间戳修复完成！")
             
         except Exception as e:
@@ -315,9 +814,13 @@ class NewsDatabase:
     
     def _migrate_reorder_fields(self, cursor, conn):
         """重新排列字段顺序，按照业务重要性"""
+        columns = (
+            'id', 'manager_name', 'source_type', 'source_name', 'published', 'title', 'summary',
+            'content', 'link', 'fetch_timestamp', 'raw_data'
+        )
         try:
-            # 创建新表（按重要性排序字段）
-            cursor.execute('''
+            # 新表按重要性排序字段
+            self._rebuild_news_items(conn, 'reorder_fields', '''
                 CREATE TABLE news_items_new (
                     id TEXT PRIMARY KEY,
                     manager_name TEXT,
@@ -331,27 +834,7 @@ class NewsDatabase:
                     fetch_timestamp DATETIME DEFAULT (datetime('now', 'localtime')),
                     raw_data TEXT
                 )
-            ''')
-            
-            # 迁移数据（新的字段顺序）
-            cursor.execute('''
-                INSERT INTO news_items_new 
-                (id, manager_name, source_type, source_name, published, title, summary, 
-                 content, link, fetch_timestamp, raw_data)
-                SELECT 
-                    id, manager_name, source_type, source_name, published, title, summary, 
-                    content, link, fetch_timestamp, raw_data
-                FROM news_items
-            ''')
-            
-            # 删除旧表并重命名
-            cursor.execute('DROP TABLE news_items')
-            cursor.execute('ALTER TABLE news_items_new RENAME TO news_items')
-            
-            # 创建索引
-            self._create_indexes(cursor)
-            
-            conn.commit()
+            ''', columns, columns)
             print("字段顺序重排完成！")
             
         except Exception as e:
@@ -361,9 +844,13 @@ class NewsDatabase:
     
     def _migrate_add_subtitle(self, cursor, conn):
         """添加subtitle字段的迁移"""
+        columns = (
+            'id', 'manager_name', 'source_type', 'source_name', 'published', 'title', 'subtitle', 'summary',
+            'content', 'link', 'fetch_timestamp', 'raw_data'
+        )
         try:
-            # 创建新表（包含subtitle字段）
-            cursor.execute('''
+            # 新表包含subtitle字段，旧数据填充空字符串
+            self._rebuild_news_items(conn, 'add_subtitle', '''
                 CREATE TABLE news_items_new (
                     id TEXT PRIMARY KEY,
                     manager_name TEXT,
@@ -378,34 +865,125 @@ class NewsDatabase:
                     fetch_timestamp DATETIME DEFAULT (datetime('now', 'localtime')),
                     raw_data TEXT
                 )
-            ''')
+            ''', columns, columns[:6] + ("''",) + columns[7:])
+            print("subtitle字段添加完成！")
             
-            # 迁移数据（添加空的subtitle字段）
+        except Exception as e:
+            print(f"添加subtitle字段失败: {str(e)}")
+            conn.rollback()
+            raise
+    
+    def _migrate_add_published_ts(self, cursor, conn):
+        """添加published_ts字段（UTC时间戳）及范围查询使用的索引
+        
+        published只存储日期用于显示，历史数据没有具体时间，回填为当天UTC 00:00。
+        回填按rowid分批提交，中断后只处理尚未回填的行。
+        """
+        cursor.execute("PRAGMA table_info(news_items)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'published_ts' not in columns:
+            print("检测到缺少published_ts字段，开始添加...")
+            cursor.execute('ALTER TABLE news_items ADD COLUMN published_ts INTEGER')
+            conn.commit()
+        
+        cursor.execute('SELECT COUNT(*) FROM news_items WHERE published_ts IS NULL')
+        pending = cursor.fetchone()[0]
+        filled = 0
+        while filled < pending:
             cursor.execute('''
-                INSERT INTO news_items_new 
-                (id, manager_name, source_type, source_name, published, title, subtitle, summary, 
-                 content, link, fetch_timestamp, raw_data)
-                SELECT 
-                    id, manager_name, source_type, source_name, published, title, '', summary, 
-                    content, link, fetch_timestamp, raw_data
-                FROM news_items
-            ''')
-            
-            # 删除旧表并重命名
-            cursor.execute('DROP TABLE news_items')
-            cursor.execute('ALTER TABLE news_items_new RENAME TO news_items')
-            
-            # 创建索引
-            self._create_indexes(cursor)
-            
+                UPDATE news_items SET published_ts = CAST(strftime('%s', published) AS INTEGER)
+                WHERE rowid IN (SELECT rowid FROM news_items WHERE published_ts IS NULL LIMIT ?)
+            ''', (MIGRATION_BATCH_SIZE,))
+            if cursor.rowcount <= 0:
+                break
+            filled += cursor.rowcount
             conn.commit()
-            print("subtitle字段添加完成！")
+            print(f"  已回填发布时间戳: {filled}/{pending}")
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_published_ts ON news_items(published_ts)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_source_fetch ON news_items(source_name, fetch_timestamp)')
+    
+    def _migrate_split_bodies(self, cursor, conn):
+        """将content和raw_data移动到news_bodies（按配置压缩），并重建不含这两个字段的news_items
+        
+        拆分之后全文索引通过news_body_text函数读取压缩的正文，写入新闻的连接都需要通过connect_database打开。
+        """
+        cursor.execute("PRAGMA table_info(news_items)")
+        columns = [column[1] for column in cursor.fetchall()]
+        if 'content' not in columns:
+            return
+        
+        print("检测到正文存储在news_items中，开始拆分到news_bodies...")
+        try:
+            # 分批读取并压缩，避免一次性把所有正文读入内存
+            moved = self._copy_in_batches(
+                conn, 'split_bodies',
+                'SELECT rowid, id, content, raw_data FROM news_items WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                'INSERT INTO news_bodies (id, content, raw_data) VALUES (?, ?, ?) ON CONFLICT(id) DO NOTHING',
+                lambda row: (row['id'],
+                             encode_body(row['content'], self.compress_bodies),
+                             encode_body(row['raw_data'], self.compress_bodies))
+            )
             
+            # 重建不含正文的news_items（旧的全文索引触发器随旧表一起删除）
+            # 复制的字段固定为此版本时的字段，之后版本新增的字段使用默认值
+            columns = ('id', 'manager_name', 'source_type', 'source_name', 'published', 'published_ts',
+                       'title', 'subtitle', 'summary', 'link', 'fetch_timestamp')
+            self._rebuild_news_items(
+                conn, 'drop_body_columns',
+                self._create_news_items_sql('news_items_new'),
+                columns, columns,
+                recreate=self._create_current_schema_objects
+            )
+            self._finish_copy(conn, 'split_bodies')
+            conn.commit()
+            print(f"正文拆分完成，共迁移 {moved} 条记录")
         except Exception as e:
-            print(f"添加subtitle字段失败: {str(e)}")
+            print(f"正文拆分失败: {e}")
             conn.rollback()
             raise
     
+    def _migrate_add_published_id_index(self, cursor, conn):
+        """添加流式查询按(published, id)分页使用的索引"""
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_published_id ON news_items(published, id)')
+    
+    def _migrate_add_stats_tables(self, cursor, conn):
+        """添加统计表并根据现有数据计算统计"""
+        self._create_stats_tables(cursor)
+        self._rebuild_statistics(cursor)
+    
+    def _migrate_add_summary_status(self, cursor, conn):
+        """添加AI总结状态字段
+        
+        已有总结的新闻标记为done；旧版本总结失败时写入的"总结失败: ..."清空后标记为pending重新总结。
+        旧版本失败时写入标题作为总结的新闻无法与正常总结区分，保持为done。
+        """
+        cursor.execute("PRAGMA table_info(news_items)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        for column, definition in (
+            ('summary_status', "TEXT NOT NULL DEFAULT 'pending'"),
+            ('summary_attempts', 'INTEGER NOT NULL DEFAULT 0'),
+            ('summary_error', 'TEXT'),
+            ('summary_next_attempt', 'INTEGER'),
+        ):
+            if column not in columns:
+                cursor.execute(f'ALTER TABLE news_items ADD COLUMN {column} {definition}')
+        
+        cursor.execute('''
+            UPDATE news_items SET summary_status = 'pending', summary_error = summary, summary = ''
+            WHERE summary LIKE ? || '%'
+        ''', (LEGACY_SUMMARY_FAILURE_PREFIX,))
+        if cursor.rowcount > 0:
+            print(f"{cursor.rowcount} 条总结失败的新闻将重新总结")
+        cursor.execute('''
+            UPDATE news_items SET summary_status = 'done'
+            WHERE summary IS NOT NULL AND summary != '' AND summary_status != 'done'
+        ''')
+        
+        self._create_summary_queue_index(cursor)
+    
     def _create_indexes(self, cursor):
         """创建数据库索引"""
         cursor.execute('CREATE INDEX idx_published ON news_items(published)')
@@ -417,211 +995,634 @@ class NewsDatabase:
     def save_news_batch(self, news_list: List[Dict]) -> int:
         """批量保存新闻数据
         
+        在单个事务中使用executemany批量插入，已存在的新闻由ON CONFLICT跳过，
+        不再逐条查询是否存在。本次保存的新增/重复/无效数量记录在last_batch_stats中。
+        
         Args:
             news_list: List[Dict] 新闻列表
         
         Returns:
             int 成功保存的新闻数量
         """
+        self.last_batch_stats = {'inserted': 0, 'duplicates': 0, 'rejected': 0}
         if not news_list:
             return 0
         
+        # 获取当前本地时间作为抓取时间戳
+        fetch_timestamp = datetime.now()
+        
+        rows = []
+        body_rows = []
+        rejected_count = 0
+        for news in news_list:
+            try:
+                row, body_row = self._news_to_row(news, fetch_timestamp)
+                rows.append(row)
+                body_rows.append(body_row)
+            except Exception as e:
+                print(f"保存新闻失败: {news.get('title', 'Unknown')} - {str(e)}")
+                rejected_count += 1
+        
+        inserted_count = 0
+        if rows:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                # 插入新闻，已存在的ID直接跳过
+                cursor.executemany('''
+                    INSERT INTO news_items 
+                    (id, manager_name, source_type, source_name, published, title, subtitle, summary, link,
+                     fetch_timestamp, published_ts, summary_status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO NOTHING
+                ''', rows)
+                inserted_count = cursor.rowcount
+                
+                # 正文和原始数据写入news_bodies（写入时触发全文索引更新）
+                cursor.executemany('''
+                    INSERT INTO news_bodies (id, content, raw_data)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(id) DO NOTHING
+                ''', body_rows)
+                conn.commit()
+        
+        duplicate_count = len(rows) - inserted_count
+        self.last_batch_stats = {
+            'inserted': inserted_count,
+            'duplicates': duplicate_count,
+            'rejected': rejected_count,
+        }
+        
+        print(f"\n批量保存完成: 成功保存 {inserted_count}/{len(news_list)} 条新闻"
+              f"（已存在 {duplicate_count} 条，无效 {rejected_count} 条）")
+        return inserted_count
+    
+    def _news_to_row(self, news: Dict, fetch_timestamp: datetime) -> Tuple[Tuple, Tuple]:
+        """将新闻数据转换为news_items表和news_bodies表的各一行
+        
+        Args:
+            news: Dict 新闻数据
+            fetch_timestamp: datetime 抓取时间戳
+        
+        Returns:
+            Tuple[Tuple, Tuple] (news_items行, news_bodies行)，与插入语句字段顺序一致
+        
+        Raises:
+            ValueError: 缺少必填字段时抛出
+        """
+        for field in ('id', 'source_type', 'title', 'content', 'link', 'published'):
+            if news.get(field) is None:
+                raise ValueError(f"缺少必填字段 {field}")
+        
+        # 处理发布时间 - published只存储日期部分用于显示，完整时间存为UTC时间戳
+        published = news['published']
+        if isinstance(published, str):
+            published = datetime.fromisoformat(published.replace('Z', '+00:00'))
+        
+        # 只保留日期部分，去掉时间和时区信息
+        published_date_only = published.date()
+        published_ts = to_epoch(published)
+        
+        row = (
+            news['id'],
+            news.get('manager_name', news.get('source', 'RSS聚合')),  # 管理器名称
+            news['source_type'],
+            news.get('source_name', news.get('source', '未知来源')),  # 优先使用source_name
+            published_date_only,  # 只存储日期
+            news['title'],
+            news.get('subtitle', ''),  # 副标题字段
+            news.get('summary', ''),
+            news['link'],
+            fetch_timestamp,
+            published_ts,
+            SUMMARY_DONE if news.get('summary') else SUMMARY_PENDING
+        )
+        body_row = (
+            news['id'],
+            encode_body(news['content'], self.compress_bodies),
+            encode_body(json.dumps(news.get('raw_data', {}), ensure_ascii=False), self.compress_bodies)
+        )
+        return row, body_row
+    
+    def save_news_stream(self, news_stream: Iterable[Dict], chunk_size: int = 100) -> int:
+        """分块保存新闻流，每个分块在单独的事务中提交
+        
+        内存中最多只保留一个分块的新闻；运行中途出错时，已提交的分块会保留在数据库中。
+        
+        Args:
+            news_stream: Iterable[Dict] 新闻数据流
+            chunk_size: int 每个事务保存的新闻数量
+        
+        Returns:
+            int 成功保存的新闻数量
+        """
         saved_count = 0
+        chunk = []
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            for news in news_list:
-                try:
-                    # 检查是否已存在
-                    cursor.execute('SELECT id FROM news_items WHERE id = ?', (news['id'],))
-                    if cursor.fetchone():
-                        print(f"新闻已存在，跳过: {news['title']}")
-                        continue
-                    
-                    # 处理发布时间 - 只存储日期部分
-                    published = news['published']
-                    if isinstance(published, str):
-                        published = datetime.fromisoformat(published.replace('Z', '+00:00'))
-                    
-                    # 只保留日期部分，去掉时间和时区信息
-                    published_date_only = published.date()
-                    
-                    # 获取当前本地时间作为抓取时间戳
-                    fetch_timestamp = datetime.now()
-                    
-                    # 插入新闻（包含subtitle字段的结构）
-                    cursor.execute('''
-                        INSERT INTO news_items 
-                        (id, manager_name, source_type, source_name, published, title, subtitle, summary, content, link, fetch_timestamp, raw_data)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        news['id'],
-                        news.get('manager_name', news.get('source', 'RSS聚合')),  # 管理器名称
-                        news['source_type'],
-                        news.get('source_name', news.get('source', '未知来源')),  # 优先使用source_name
-                        published_date_only,  # 只存储日期
-                        news['title'],
-                        news.get('subtitle', ''),  # 副标题字段
-                        news.get('summary', ''),
-                        news['content'],
-                        news['link'],
-                        fetch_timestamp,
-                        json.dumps(news.get('raw_data', {}), ensure_ascii=False)
-                    ))
-                    
-                    saved_count += 1
-                    print(f"保存新闻: {news['title']}")
-                    
-                except Exception as e:
-                    print(f"保存新闻失败: {news.get('title', 'Unknown')} - {str(e)}")
-                    continue
-            
-            conn.commit()
+        for news in news_stream:
+            chunk.append(news)
+            if len(chunk) >= chunk_size:
+                saved_count += self.save_news_batch(chunk)
+                chunk = []
+        
+        if chunk:
+            saved_count += self.save_news_batch(chunk)
         
-        print(f"\n批量保存完成: 成功保存 {saved_count}/{len(news_list)} 条新闻")
         return saved_count
     
-    def get_news_by_date(self, target_date: date) -> List[Dict]:
+    def get_news_by_date(self, target_date: date, columns: Optional[Sequence[str]] = None,
+                         with_content: bool = False) -> List[Dict]:
         """根据抓取日期检索新闻
         
         Args:
             target_date: date 目标日期
+            columns: Optional[Sequence[str]] 需要的字段，为None时读取NEWS_COLUMNS中的全部字段
+            with_content: bool 是否同时加载正文和原始数据
         
         Returns:
             List[Dict] 新闻列表
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            cursor.execute('''
-                SELECT * FROM news_items 
-                WHERE date(fetch_timestamp) = ? 
+            cursor.execute(f'''
+                SELECT {news_columns_sql(columns)} FROM news_items 
+                WHERE fetch_timestamp >= ? AND fetch_timestamp < ? 
                 ORDER BY published DESC
-            ''', (target_date,))
+            ''', day_range(target_date))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return self._fetch_results(cursor, with_content)
     
-    def get_news_by_date_range(self, start_date: date, end_date: date) -> List[Dict]:
+    def get_news_by_date_range(self, start_date: date, end_date: date, columns: Optional[Sequence[str]] = None,
+                               with_content: bool = False) -> List[Dict]:
         """根据日期范围检索新闻
         
         Args:
             start_date: date 开始日期
             end_date: date 结束日期
+            columns: Optional[Sequence[str]] 需要的字段，为None时读取NEWS_COLUMNS中的全部字段
+            with_content: bool 是否同时加载正文和原始数据
         
         Returns:
             List[Dict] 新闻列表
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            cursor.execute('''
-                SELECT * FROM news_items 
-                WHERE date(fetch_timestamp) BETWEEN ? AND ? 
+            cursor.execute(f'''
+                SELECT {news_columns_sql(columns)} FROM news_items 
+                WHERE fetch_timestamp >= ? AND fetch_timestamp < ? 
                 ORDER BY published DESC
-            ''', (start_date, end_date))
+            ''', day_range(start_date, end_date))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return self._fetch_results(cursor, with_content)
     
-    def get_news_by_source(self, source_name: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[Dict]:
+    def get_news_by_source(self, source_name: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                           columns: Optional[Sequence[str]] = None, with_content: bool = False) -> List[Dict]:
         """根据新闻来源检索新闻
         
         Args:
             source_name: str 新闻来源名称
             start_date: Optional[date] 开始日期
             end_date: Optional[date] 结束日期
+            columns: Optional[Sequence[str]] 需要的字段，为None时读取NEWS_COLUMNS中的全部字段
+            with_content: bool 是否同时加载正文和原始数据
         
         Returns:
             List[Dict] 新闻列表
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             
             if start_date and end_date:
-                cursor.execute('''
-                    SELECT * FROM news_items 
-                    WHERE source_name = ? AND date(fetch_timestamp) BETWEEN ? AND ?
+                cursor.execute(f'''
+                    SELECT {news_columns_sql(columns)} FROM news_items 
+                    WHERE source_name = ? AND fetch_timestamp >= ? AND fetch_timestamp < ?
                     ORDER BY published DESC
-                ''', (source_name, start_date, end_date))
+                ''', (source_name, *day_range(start_date, end_date)))
             else:
-                cursor.execute('''
-                    SELECT * FROM news_items 
+                cursor.execute(f'''
+                    SELECT {news_columns_sql(columns)} FROM news_items 
                     WHERE source_name = ?
                     ORDER BY published DESC
                 ''', (source_name,))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return self._fetch_results(cursor, with_content)
+    
+    def iter_news(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                  source_name: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+                  with_content: bool = False, limit: Optional[int] = None,
+                  page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict]:
+        """按发布日期倒序流式读取新闻
+        
+        使用(published, id)键集分页：每页从上一页最后一条之后继续读取，
+        不使用OFFSET，也不在两页之间保持读事务，内存中最多只有一页新闻。
+        
+        Args:
+            start_date: Optional[date] 抓取开始日期，与end_date同时指定时生效
+            end_date: Optional[date] 抓取结束日期（包含）
+            source_name: Optional[str] 新闻来源名称
+            columns: Optional[Sequence[str]] 需要的字段，为None时读取NEWS_COLUMNS中的全部字段（总会包含published和id）
+            with_content: bool 是否同时加载正文和原始数据
+            limit: Optional[int] 最多返回的条数，None表示不限制
+            page_size: int 每页读取的数量
+        
+        Yields:
+            Dict 新闻数据
+        """
+        columns = list(columns or NEWS_COLUMNS)
+        for key in ('published', 'id'):
+            if key not in columns:
+                columns.append(key)
+        
+        conditions = []
+        params: List = []
+        if start_date and end_date:
+            conditions.append('fetch_timestamp >= ? AND fetch_timestamp < ?')
+            params.extend(day_range(start_date, end_date))
+        if source_name:
+            conditions.append('source_name = ?')
+            params.append(source_name)
+        
+        remaining = limit
+        last_key = None
+        while remaining is None or remaining > 0:
+            page_conditions = list(conditions)
+            page_params = list(params)
+            if last_key:
+                page_conditions.append('(published, id) < (?, ?)')
+                page_params.extend(last_key)
+            
+            sql = f'SELECT {news_columns_sql(columns)} FROM news_items'
+            if page_conditions:
+                sql += ' WHERE ' + ' AND '.join(page_conditions)
+            sql += ' ORDER BY published DESC, id DESC LIMIT ?'
+            
+            batch_size = page_size if remaining is None else min(page_size, remaining)
+            page_params.append(batch_size)
+            
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, page_params)
+                page = [dict(row) for row in cursor.fetchmany(batch_size)]
+            
+            if not page:
+                return
+            
+            if with_content:
+                self.load_content(page)
+            
+            yield from page
+            
+            if remaining is not None:
+                remaining -= len(page)
+            if len(page) < batch_size:
+                return
+            last_key = (page[-1]['published'], page[-1]['id'])
     
-    def search_news(self, keyword: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[Dict]:
+    def _fetch_results(self, cursor, with_content: bool) -> List[Dict]:
+        """读取查询结果，需要时批量加载正文"""
+        results = [dict(row) for row in cursor.fetchall()]
+        if with_content:
+            self.load_content(results)
+        return results
+    
+    def load_content(self, news_list: List[Dict]) -> List[Dict]:
+        """按ID批量加载正文和原始数据，直接写入新闻字典的content和raw_data字段
+        
+        Args:
+            news_list: List[Dict] 新闻列表，需要包含id字段
+        
+        Returns:
+            List[Dict] 传入的新闻列表
+        """
+        by_id = {news['id']: news for news in news_list}
+        ids = list(by_id)
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for i in range(0, len(ids), BODY_LOAD_BATCH_SIZE):
+                batch = ids[i:i + BODY_LOAD_BATCH_SIZE]
+                placeholders = ', '.join('?' * len(batch))
+                cursor.execute(f'SELECT id, content, raw_data FROM news_bodies WHERE id IN ({placeholders})', batch)
+                for row in cursor.fetchall():
+                    news = by_id[row['id']]
+                    news['content'] = decode_body(row['content'])
+                    news['raw_data'] = decode_body(row['raw_data'])
+        
+        return news_list
+    
+    def get_news_content(self, news_id: str) -> Optional[str]:
+        """读取单条新闻的正文
+        
+        Args:
+            news_id: str 新闻ID
+        
+        Returns:
+            Optional[str] 正文，不存在时返回None
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT content FROM news_bodies WHERE id = ?', (news_id,))
+            row = cursor.fetchone()
+            return decode_body(row['content']) if row else None
+    
+    def search_news(self, keyword: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                    limit: Optional[int] = None) -> List[Dict]:
         """根据关键词搜索新闻
         
+        关键词按空白拆分为多个词，所有词都需要出现在标题、副标题、总结或正文中。
+        每个词都不少于3个字符时使用全文索引，按bm25相关度排序（标题权重最高）；
+        否则（trigram索引无法匹配1-2个字符的词）或全文索引不可用时回退到LIKE扫描，按发布时间排序。
+        
         Args:
             keyword: str 搜索关键词
             start_date: Optional[date] 开始日期
             end_date: Optional[date] 结束日期
+            limit: Optional[int] 最多返回的条数，None表示不限制
         
         Returns:
-            List[Dict] 新闻列表
+            List[Dict] 新闻列表，每条新闻附带snippet（命中片段）字段
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        terms = keyword.split()
+        if not terms:
+            return []
+        
+        use_index = (self._path_key in NewsDatabase._search_index_paths
+                     and all(len(term) >= 3 for term in terms))
+        
+        if use_index:
+            return self._search_with_index(terms, start_date, end_date, limit)
+        return self._search_with_like(terms, start_date, end_date, limit)
+    
+    def _search_with_index(self, terms: List[str], start_date: Optional[date], end_date: Optional[date],
+                           limit: Optional[int]) -> List[Dict]:
+        """使用FTS5全文索引搜索"""
+        # 每个词作为短语查询，避免关键词中的引号、运算符被解释为FTS查询语法
+        match_query = ' AND '.join('"' + term.replace('"', '""') + '"' for term in terms)
+        
+        sql = f'''
+            SELECT {news_columns_sql(alias='n')},
+                   snippet(news_fts, -1, '【', '】', '…', 16) AS snippet,
+                   bm25(news_fts, 10.0, 5.0, 3.0, 1.0) AS rank
+            FROM news_fts
+            JOIN news_items n ON n.rowid = news_fts.rowid
+            WHERE news_fts MATCH ?
+        '''
+        params: List = [match_query]
+        
+        if start_date and end_date:
+            sql += ' AND n.fetch_timestamp >= ? AND n.fetch_timestamp < ?'
+            params.extend(day_range(start_date, end_date))
+        
+        sql += ' ORDER BY rank'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        
+        with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def _search_with_like(self, terms: List[str], start_date: Optional[date], end_date: Optional[date],
+                          limit: Optional[int]) -> List[Dict]:
+        """使用LIKE扫描搜索（短关键词或全文索引不可用时）"""
+        conditions = []
+        params: List = []
+        for term in terms:
+            pattern = f'%{term}%'
+            conditions.append('(n.title LIKE ? OR n.subtitle LIKE ? OR n.summary LIKE ? '
+                              'OR news_body_text(b.content) LIKE ?)')
+            params.extend([pattern] * 4)
+        
+        sql = (f"SELECT {news_columns_sql(alias='n')}, news_body_text(b.content) AS content "
+               f"FROM news_items n LEFT JOIN news_bodies b ON b.id = n.id "
+               f"WHERE {' AND '.join(conditions)}")
+        
+        if start_date and end_date:
+            sql += ' AND n.fetch_timestamp >= ? AND n.fetch_timestamp < ?'
+            params.extend(day_range(start_date, end_date))
+        
+        sql += ' ORDER BY n.published DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            results = [dict(row) for row in cursor.fetchall()]
+        
+        # 正文只用于生成片段，与全文索引搜索的返回字段保持一致
+        for news in results:
+            news['snippet'] = self._make_snippet(news, terms[0])
+            del news['content']
+        return results
+    
+    def _make_snippet(self, news: Dict, term: str, context: int = 16) -> str:
+        """在新闻文本中截取关键词附近的片段，格式与FTS5 snippet()一致
+        
+        Args:
+            news: Dict 新闻数据
+            term: str 关键词
+            context: int 关键词前后保留的字符数
+        
+        Returns:
+            str 命中片段，未找到时返回空字符串
+        """
+        for field in ('title', 'subtitle', 'summary', 'content'):
+            text = news.get(field) or ''
+            pos = text.find(term)
+            if pos < 0:
+                continue
             
-            keyword_pattern = f'%{keyword}%'
-            
-            if start_date and end_date:
-                cursor.execute('''
-                    SELECT * FROM news_items 
-                    WHERE (title LIKE ? OR content LIKE ?) 
-                    AND date(fetch_timestamp) BETWEEN ? AND ?
-                    ORDER BY published DESC
-                ''', (keyword_pattern, keyword_pattern, start_date, end_date))
-            else:
-                cursor.execute('''
-                    SELECT * FROM news_items 
-                    WHERE title LIKE ? OR content LIKE ?
-                    ORDER BY published DESC
-                ''', (keyword_pattern, keyword_pattern))
-            
+            begin = max(0, pos - context)
+            end = min(len(text), pos + len(term) + context)
+            return (('…' if begin > 0 else '') + text[begin:pos] + '【' + term + '】'
+                    + text[pos + len(term):end] + ('…' if end < len(text) else ''))
+        return ''
+    
+    def get_summary_queue(self, published_range: Optional[Tuple[int, int]] = None,
+                          columns: Optional[Sequence[str]] = None, limit: Optional[int] = None) -> List[Dict]:
+        """获取当前需要AI总结的新闻（pending状态且已到重试时间）
+        
+        查询只使用idx_summary_pending部分索引，索引中只有待总结的行，与历史数据量无关。
+        
+        Args:
+            published_range: Optional[Tuple[int, int]] 发布时间戳的左闭右开区间；
+                为None时返回今天抓取的新闻以及之前失败后已到重试时间的新闻
+            columns: Optional[Sequence[str]] 需要的字段，为None时读取NEWS_COLUMNS中的全部字段
+            limit: Optional[int] 最多返回的条数
+        
+        Returns:
+            List[Dict] 新闻列表，按发布日期倒序
+        """
+        now = int(datetime.now(timezone.utc).timestamp())
+        sql = f'''
+            SELECT {news_columns_sql(columns)} FROM news_items INDEXED BY idx_summary_pending
+            WHERE summary_status = 'pending'
+            AND (summary_next_attempt IS NULL OR summary_next_attempt <= ?)
+        '''
+        params: List = [now]
+        
+        if published_range:
+            sql += ' AND published_ts >= ? AND published_ts < ?'
+            params.extend(published_range)
+        else:
+            sql += ' AND (fetch_timestamp >= ? OR summary_attempts > 0)'
+            params.append(date.today().isoformat())
+        
+        sql += ' ORDER BY published DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_summarized_news(self, published_range: Optional[Tuple[int, int]] = None,
+                            columns: Optional[Sequence[str]] = None) -> List[Dict]:
+        """获取已经完成AI总结（或已尝试过总结）的新闻，用于生成HTML
+        
+        Args:
+            published_range: Optional[Tuple[int, int]] 发布时间戳的左闭右开区间，为None时返回今天抓取的新闻
+            columns: Optional[Sequence[str]] 需要的字段，为None时读取NEWS_COLUMNS中的全部字段
+        
+        Returns:
+            List[Dict] 新闻列表，按发布日期倒序
+        """
+        if published_range:
+            # 按发布时间戳的左闭右开区间查询
+            condition = 'published_ts >= ? AND published_ts < ?'
+            params = published_range
+        else:
+            condition = 'fetch_timestamp >= ? AND fetch_timestamp < ?'
+            params = day_range(date.today())
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT {news_columns_sql(columns)} FROM news_items 
+                WHERE {condition}
+                AND ((summary IS NOT NULL AND summary != '') OR summary_attempts > 0)
+                ORDER BY published DESC
+            ''', params)
             return [dict(row) for row in cursor.fetchall()]
     
+    def count_news_by_published(self, published_range: Tuple[int, int]) -> int:
+        """统计发布时间在指定区间内的新闻数量
+        
+        Args:
+            published_range: Tuple[int, int] 发布时间戳的左闭右开区间
+        
+        Returns:
+            int 新闻数量
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*) as count FROM news_items 
+                WHERE published_ts >= ? AND published_ts < ?
+            ''', published_range)
+            return cursor.fetchone()['count']
+    
+    def mark_summaries_done(self, summaries: Iterable[Tuple[str, str]]) -> int:
+        """保存AI总结并标记为已完成
+        
+        Args:
+            summaries: Iterable[Tuple[str, str]] (新闻ID, 总结)
+        
+        Returns:
+            int 更新的新闻数量
+        """
+        rows = [(summary, news_id) for news_id, summary in summaries]
+        if not rows:
+            return 0
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE news_items
+                SET summary = ?, summary_status = 'done', summary_error = NULL, summary_next_attempt = NULL,
+                    summary_attempts = summary_attempts + 1
+                WHERE id = ?
+            ''', rows)
+            conn.commit()
+            return len(rows)
+    
+    def mark_summaries_failed(self, failures: Iterable[Tuple[str, str]], max_attempts: int,
+                              retry_base_seconds: int, retry_max_seconds: int = 86400) -> Dict[str, int]:
+        """记录AI总结失败，按指数退避安排重试
+        
+        第n次失败后等待 retry_base_seconds * 2^(n-1) 秒（不超过retry_max_seconds）再重试，
+        失败次数达到max_attempts后标记为failed，不再自动重试。
+        
+        Args:
+            failures: Iterable[Tuple[str, str]] (新闻ID, 错误信息)
+            max_attempts: int 最多尝试次数
+            retry_base_seconds: int 首次重试的等待秒数
+            retry_max_seconds: int 重试等待的上限秒数
+        
+        Returns:
+            Dict[str, int] {'retrying': 等待重试的数量, 'failed': 不再重试的数量}
+        """
+        rows = [(error, news_id) for news_id, error in failures]
+        if not rows:
+            return {'retrying': 0, 'failed': 0}
+        
+        now = int(datetime.now(timezone.utc).timestamp())
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(f'''
+                UPDATE news_items
+                SET summary_attempts = summary_attempts + 1,
+                    summary_error = ?,
+                    summary_status = CASE WHEN summary_attempts + 1 >= {int(max_attempts)} THEN 'failed' ELSE 'pending' END,
+                    summary_next_attempt = {now} + MIN({int(retry_max_seconds)},
+                        {int(retry_base_seconds)} * (1 << MIN(summary_attempts, 30)))
+                WHERE id = ?
+            ''', rows)
+            
+            # 分批统计，IN列表的参数个数不超过SQLite的上限
+            ids = [news_id for _, news_id in rows]
+            failed = 0
+            for i in range(0, len(ids), BODY_LOAD_BATCH_SIZE):
+                batch = ids[i:i + BODY_LOAD_BATCH_SIZE]
+                placeholders = ', '.join('?' * len(batch))
+                cursor.execute(
+                    f"SELECT COUNT(*) FROM news_items WHERE summary_status = 'failed' AND id IN ({placeholders})",
+                    batch
+                )
+                failed += cursor.fetchone()[0]
+            conn.commit()
+        
+        return {'retrying': len(rows) - failed, 'failed': failed}
+    
     def get_statistics(self) -> Dict:
-        """获取数据库统计信息
+        """获取数据库统计信息（读取由触发器维护的统计表）
         
         Returns:
             Dict 统计信息
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # 总新闻数
-            cursor.execute('SELECT COUNT(*) FROM news_items')
-            total_news = cursor.fetchone()[0]
-            
-            # 按来源统计
-            cursor.execute('''
-                SELECT source_name, COUNT(*) as count 
-                FROM news_items 
-                GROUP BY source_name 
-                ORDER BY count DESC
-            ''')
-            source_stats = dict(cursor.fetchall())
+            # 按来源统计（总新闻数为各来源之和）
+            cursor.execute('SELECT source_name, count FROM news_stats_source ORDER BY count DESC')
+            source_stats = {row['source_name']: row['count'] for row in cursor.fetchall()}
+            total_news = sum(source_stats.values())
             
             # 按日期统计
-            cursor.execute('''
-                SELECT date(fetch_timestamp) as fetch_date, COUNT(*) as count 
-                FROM news_items 
-                GROUP BY date(fetch_timestamp) 
-                ORDER BY date(fetch_timestamp) DESC 
-                LIMIT 10
-            ''')
-            date_stats = dict(cursor.fetchall())
+            cursor.execute('SELECT fetch_date, count FROM news_stats_daily ORDER BY fetch_date DESC LIMIT 10')
+            date_stats = {row['fetch_date']: row['count'] for row in cursor.fetchall()}
             
             # 最新和最早的新闻
-            cursor.execute('SELECT MIN(date(fetch_timestamp)), MAX(date(fetch_timestamp)) FROM news_items')
+            cursor.execute('''
+                SELECT (SELECT MIN(fetch_date) FROM news_stats_daily),
+                       (SELECT MAX(fetch_date) FROM news_stats_daily)
+            ''')
             date_range = cursor.fetchone()
             
             return {
@@ -634,28 +1635,123 @@ class NewsDatabase:
                 }
             }
     
+    def rebuild_statistics(self) -> Dict[str, int]:
+        """根据news_items从头重新计算统计表，并报告与原统计表不一致的行数
+        
+        Returns:
+            Dict[str, int] {'daily_mismatches': 按日期统计不一致的行数, 'source_mismatches': 按来源统计不一致的行数}
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            result = self._rebuild_statistics(cursor)
+            conn.commit()
+            return result
+    
+    def _rebuild_statistics(self, cursor) -> Dict[str, int]:
+        """重新计算统计表（在调用方的事务中执行）"""
+        cursor.execute('SELECT fetch_date, count FROM news_stats_daily')
+        old_daily = {row[0]: row[1] for row in cursor.fetchall()}
+        cursor.execute('SELECT source_name, count FROM news_stats_source')
+        old_source = {row[0]: row[1] for row in cursor.fetchall()}
+        
+        cursor.execute('''
+            SELECT date(fetch_timestamp), COUNT(*) FROM news_items
+            WHERE fetch_timestamp IS NOT NULL
+            GROUP BY date(fetch_timestamp)
+        ''')
+        new_daily = {row[0]: row[1] for row in cursor.fetchall()}
+        cursor.execute('SELECT source_name, COUNT(*) FROM news_items GROUP BY source_name')
+        new_source = {row[0]: row[1] for row in cursor.fetchall()}
+        
+        cursor.execute('DELETE FROM news_stats_daily')
+        cursor.executemany('INSERT INTO news_stats_daily (fetch_date, count) VALUES (?, ?)', new_daily.items())
+        cursor.execute('DELETE FROM news_stats_source')
+        cursor.executemany('INSERT INTO news_stats_source (source_name, count) VALUES (?, ?)', new_source.items())
+        
+        return {
+            'daily_mismatches': sum(1 for key in old_daily.keys() | new_daily.keys()
+                                    if old_daily.get(key) != new_daily.get(key)),
+            'source_mismatches': sum(1 for key in old_source.keys() | new_source.keys()
+                                     if old_source.get(key) != new_source.get(key)),
+        }
+    
     def cleanup_old_data(self, days_to_keep: int = 90) -> int:
         """清理旧数据
         
+        按idx_fetch_timestamp索引分批删除抓取时间早于保留期的新闻，每批单独提交，
+        不会长时间阻塞其他写入；删除后通过增量清理回收空闲页。
+        
         Args:
             days_to_keep: int 保留天数，默认90天
         
         Returns:
             int 删除的记录数
         """
-        cutoff_date = date.today() - timedelta(days=days_to_keep)
+        cutoff_date = (date.today() - timedelta(days=days_to_keep)).isoformat()
+        deleted = 0
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            cursor.execute('SELECT COUNT(*) FROM news_items WHERE date(fetch_timestamp) < ?', (cutoff_date,))
-            count_to_delete = cursor.fetchone()[0]
-            
-            cursor.execute('DELETE FROM news_items WHERE date(fetch_timestamp) < ?', (cutoff_date,))
-            conn.commit()
-            
-            print(f"清理了 {count_to_delete} 条超过 {days_to_keep} 天的旧新闻")
-            return count_to_delete
+            while True:
+                cursor.execute('''
+                    DELETE FROM news_items WHERE rowid IN (
+                        SELECT rowid FROM news_items INDEXED BY idx_fetch_timestamp
+                        WHERE fetch_timestamp < ? LIMIT ?
+                    )
+                ''', (cutoff_date, DELETE_BATCH_SIZE))
+                batch_deleted = cursor.rowcount
+                conn.commit()
+                
+                deleted += batch_deleted
+                if batch_deleted < DELETE_BATCH_SIZE:
+                    break
+        
+        print(f"清理了 {deleted} 条超过 {days_to_keep} 天的旧新闻")
+        
+        if deleted:
+            self.vacuum()
+        return deleted
+    
+    def vacuum(self, full: bool = False) -> Dict[str, int]:
+        """回收数据库文件中的空闲空间
+        
+        默认执行增量清理（PRAGMA incremental_vacuum），只释放空闲页，耗时与空闲页数量相关。
+        full=True时执行完整VACUUM重写整个数据库文件，并开启增量自动清理；
+        VACUUM可能改变news_items的rowid，因此之后会重建以rowid关联的全文索引。
+        
+        Args:
+            full: bool 是否执行完整VACUUM
+        
+        Returns:
+            Dict[str, int] {'pages_before': 清理前页数, 'pages_after': 清理后页数, 'page_size': 页大小}
+        """
+        conn = self.get_connection()
+        conn.commit()
+        
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        pages_before = conn.execute('PRAGMA page_count').fetchone()[0]
+        auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+        
+        if full:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+            with conn:
+                self._rebuild_search_index(conn.cursor())
+        elif auto_vacuum == 2:
+            # incremental_vacuum每执行一步只释放部分空闲页，使用executescript执行到结束
+            conn.executescript('PRAGMA incremental_vacuum;')
+        else:
+            freelist = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            print(f"数据库未开启增量自动清理（{freelist} 个空闲页），请执行一次完整VACUUM")
+        
+        # 将WAL中的内容写回主数据库文件并截断WAL
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        pages_after = conn.execute('PRAGMA page_count').fetchone()[0]
+        
+        freed_kb = (pages_before - pages_after) * page_size // 1024
+        print(f"数据库空间回收完成: {pages_before} -> {pages_after} 页，释放 {freed_kb} KB")
+        return {'pages_before': pages_before, 'pages_after': pages_after, 'page_size': page_size}
     
     def clear_all_data(self) -> int:
         """清空所有新闻数据
@@ -663,7 +1759,7 @@ class NewsDatabase:
         Returns:
             int 删除的记录数
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('SELECT COUNT(*) FROM news_items')
@@ -673,4 +1769,8 @@ class NewsDatabase:
             conn.commit()
             
             print(f"已清空所有数据，共删除 {total_count} 条新闻")
-            return total_count 
\ No newline at end of file
+            return total_count
+
+
+# 进程退出时关闭长连接，使WAL内容写回主数据库文件
+atexit.register(NewsDatabase.close_all_connections)
@@ -0,0 +1,254 @@
+import sqlite3
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+import os
+
+from services.database import connect_database
+
+# 每个RSS源最多记录的已处理文章ID数量
+RECENT_IDS_LIMIT = 500
+
+class FeedStateStore:
+    """RSS源抓取状态存储
+
+    记录每个RSS源上次抓取的HTTP校验值（ETag/Last-Modified）、已处理过的时间窗口
+    以及最近处理过的文章ID（增量抓取水位），与news_items存放在同一个SQLite数据库中。
+    抓取过程中的更新先暂存在内存中，只有在新闻成功入库后调用commit()才会写入数据库，
+    避免未保存的新闻被误判为已处理。
+    """
+
+    def __init__(self, db_path: str = "data/news.db"):
+        """初始化状态存储
+
+        Args:
+            db_path: str 数据库文件路径
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict] = {}
+
+        # 确保目录存在
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._init_table()
+        self._states = self._load_states()
+
+    def _init_table(self):
+        """初始化状态表结构"""
+        with connect_database(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS feed_state (
+                    feed_url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body_size INTEGER DEFAULT 0,
+                    window_start TEXT,
+                    window_end TEXT,
+                    newest_published TEXT,
+                    last_entry_id TEXT,
+                    last_published TEXT,
+                    recent_ids TEXT,
+                    updated_at DATETIME
+                )
+            ''')
+
+            # 兼容旧版本创建的状态表，补充增量抓取水位字段
+            cursor.execute("PRAGMA table_info(feed_state)")
+            columns = [column[1] for column in cursor.fetchall()]
+            for column in ('last_entry_id', 'last_published', 'recent_ids'):
+                if column not in columns:
+                    cursor.execute(f'ALTER TABLE feed_state ADD COLUMN {column} TEXT')
+
+            conn.commit()
+
+    def _load_states(self) -> Dict[str, Dict]:
+        """一次性读取所有RSS源的状态"""
+        with connect_database(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM feed_state')
+            return {row['feed_url']: dict(row) for row in cursor.fetchall()}
+
+    def get(self, feed_url: str) -> Optional[Dict]:
+        """获取RSS源的已提交状态
+
+        Args:
+            feed_url: str RSS地址
+
+        Returns:
+            Optional[Dict] 状态字典，不存在时返回None
+        """
+        state = self._states.get(feed_url)
+        return dict(state) if state else None
+
+    def stage(self, feed_url: str, **fields) -> None:
+        """暂存RSS源的状态更新，调用commit()后才会生效
+
+        Args:
+            feed_url: str RSS地址
+            **fields: 需要更新的字段
+        """
+        with self._lock:
+            self._pending.setdefault(feed_url, {}).update(fields)
+
+    def commit(self) -> int:
+        """将暂存的状态更新写入数据库
+
+        Returns:
+            int 更新的RSS源数量
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return 0
+
+        with connect_database(self.db_path) as conn:
+            cursor = conn.cursor()
+            for feed_url, fields in pending.items():
+                state = self._states.get(feed_url, {'feed_url': feed_url})
+                state.update(fields)
+                state['updated_at'] = datetime.now()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO feed_state
+                    (feed_url, etag, last_modified, body_size, window_start, window_end, newest_published,
+                     last_entry_id, last_published, recent_ids, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    feed_url,
+                    state.get('etag'),
+                    state.get('last_modified'),
+                    state.get('body_size', 0),
+                    state.get('window_start'),
+                    state.get('window_end'),
+                    state.get('newest_published'),
+                    state.get('last_entry_id'),
+                    state.get('last_published'),
+                    state.get('recent_ids'),
+                    state['updated_at'],
+                ))
+                self._states[feed_url] = state
+            conn.commit()
+
+        return len(pending)
+
+    def discard(self) -> int:
+        """丢弃暂存的状态更新
+
+        Returns:
+            int 丢弃的RSS源数量
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return len(pending)
+
+    def clear(self) -> int:
+        """清空所有RSS源的状态（清空新闻数据后需要同步清空，否则已删除的文章不会被重新抓取）
+
+        Returns:
+            int 删除的记录数
+        """
+        with self._lock:
+            self._pending = {}
+
+        with connect_database(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM feed_state')
+            deleted = cursor.rowcount
+            conn.commit()
+
+        self._states = {}
+        return deleted
+
+    @staticmethod
+    def get_recent_ids(state: Optional[Dict]) -> Dict[str, Optional[str]]:
+        """读取RSS源最近处理过的文章ID
+
+        Args:
+            state: Optional[Dict] RSS源状态
+
+        Returns:
+            Dict[str, Optional[str]] 文章ID到处理该文章时时间窗口起点的映射，按处理时间由新到旧排列
+        """
+        if not state or not state.get('recent_ids'):
+            return {}
+        return json.loads(state['recent_ids'])
+
+    @staticmethod
+    def merge_recent_ids(new_ids: Dict[str, Optional[str]], old_ids: Dict[str, Optional[str]]) -> str:
+        """合并新旧文章ID并截断到上限
+
+        Args:
+            new_ids: Dict[str, Optional[str]] 本次处理的文章ID
+            old_ids: Dict[str, Optional[str]] 之前记录的文章ID
+
+        Returns:
+            str JSON格式的文章ID映射
+        """
+        merged = dict(new_ids)
+        for news_id, window_start in old_ids.items():
+            if len(merged) >= RECENT_IDS_LIMIT:
+                break
+            merged.setdefault(news_id, window_start)
+        return json.dumps(merged)
+
+    @staticmethod
+    def can_stop_at(known_window_start: Optional[str], start_date: Optional[datetime]) -> bool:
+        """判断遇到已处理文章时能否停止处理该RSS源剩余的（更早的）文章
+
+        RSS源按发布时间倒序排列。已处理文章之后的文章都更早，
+        只要本次开始时间不早于当时处理该文章的时间窗口起点，这些文章当时就已经处理过。
+
+        Args:
+            known_window_start: Optional[str] 处理已知文章时的时间窗口起点，None表示不限制
+            start_date: Optional[datetime] 本次开始时间，None表示不限制
+
+        Returns:
+            bool 是否可以停止
+        """
+        if known_window_start is None:
+            return True
+        if start_date is None:
+            return False
+        return start_date >= datetime.fromisoformat(known_window_start)
+
+    @staticmethod
+    def window_covers(state: Optional[Dict], start_date: Optional[datetime], end_date: Optional[datetime]) -> bool:
+        """判断上次抓取是否已经处理过本次时间范围内该RSS源可能包含的所有文章
+
+        RSS源内容未变化时，其中的文章都不晚于上次记录的最新发布时间。
+        因此只要本次时间范围与这些文章的交集落在上次处理过的时间窗口内，就无需重新处理。
+
+        Args:
+            state: Optional[Dict] RSS源状态
+            start_date: Optional[datetime] 本次开始时间，None表示不限制
+            end_date: Optional[datetime] 本次结束时间，None表示不限制
+
+        Returns:
+            bool 是否已覆盖
+        """
+        if not state or not state.get('newest_published'):
+            return False
+
+        newest = datetime.fromisoformat(state['newest_published'])
+
+        # 本次时间范围内不可能包含该RSS源中的任何文章
+        if start_date and start_date > newest:
+            return True
+
+        window_start = state.get('window_start')
+        window_end = state.get('window_end')
+
+        if window_start:
+            if not start_date or start_date < datetime.fromisoformat(window_start):
+                return False
+
+        if window_end:
+            effective_end = min(end_date, newest) if end_date else newest
+            if effective_end > datetime.fromisoformat(window_end):
+                return False
+
+        return True
@@ -0,0 +1,188 @@
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from services.database import NewsDatabase
+from utils.gpt.metrics import percentile
+
+class LLMMetricsStore:
+    """LLM调用指标存储
+
+    每次运行的调用指标写入llm_calls表，与news_items存放在同一个SQLite数据库中，复用NewsDatabase的线程级长连接；
+    批量请求包含多个来源的新闻，来源及条数写入llm_call_sources表，统计时按条数分摊token。
+    """
+
+    def __init__(self, db_path: str = "data/news.db"):
+        """初始化指标存储
+
+        Args:
+            db_path: str 数据库文件路径
+        """
+        self.db_path = db_path
+        self.db = NewsDatabase(db_path)
+        self._init_table()
+
+    def _init_table(self):
+        """初始化指标表结构"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS llm_calls (
+                    id INTEGER PRIMARY KEY,
+                    run_id TEXT NOT NULL,
+                    created_at INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    model TEXT,
+                    prompt_hash TEXT,
+                    items INTEGER NOT NULL DEFAULT 1,
+                    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                    completion_tokens INTEGER NOT NULL DEFAULT 0,
+                    latency_ms INTEGER NOT NULL,
+                    retries INTEGER NOT NULL DEFAULT 0,
+                    retry_errors TEXT,
+                    truncated INTEGER NOT NULL DEFAULT 0,
+                    error_class TEXT,
+                    status_code INTEGER
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_calls_created ON llm_calls(created_at)')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS llm_call_sources (
+                    call_id INTEGER NOT NULL REFERENCES llm_calls(id),
+                    source_name TEXT NOT NULL,
+                    items INTEGER NOT NULL,
+                    PRIMARY KEY (call_id, source_name)
+                )
+            ''')
+            conn.commit()
+
+    def save_run(self, calls: List[Dict], run_id: Optional[str] = None) -> str:
+        """保存一次运行的调用指标
+
+        Args:
+            calls: List[Dict] LLMMetrics记录的调用指标
+            run_id: Optional[str] 运行ID，为None时自动生成
+
+        Returns:
+            str 运行ID
+        """
+        run_id = run_id or f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        if not calls:
+            return run_id
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            for call in calls:
+                cursor.execute('''
+                    INSERT INTO llm_calls
+                    (run_id, created_at, kind, model, prompt_hash, items, prompt_tokens, completion_tokens,
+                     latency_ms, retries, retry_errors, truncated, error_class, status_code)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    run_id,
+                    call['created_at'],
+                    call['kind'],
+                    call['model'],
+                    call['prompt_hash'],
+                    call['items'],
+                    call['prompt_tokens'],
+                    call['completion_tokens'],
+                    int(call['latency'] * 1000),
+                    call['retries'],
+                    json.dumps(call['retry_errors']) if call['retry_errors'] else None,
+                    call['truncated'],
+                    call['error_class'],
+                    call['status_code'],
+                ))
+                call_id = cursor.lastrowid
+                cursor.executemany(
+                    'INSERT INTO llm_call_sources (call_id, source_name, items) VALUES (?, ?, ?)',
+                    [(call_id, source_name, count) for source_name, count in call['sources'].items()]
+                )
+            conn.commit()
+
+        return run_id
+
+    def get_report(self, days: int = 7) -> Dict:
+        """统计最近若干天的调用指标
+
+        Args:
+            days: int 统计的天数
+
+        Returns:
+            Dict 包含以下内容：
+                total: 调用次数、失败次数、重试次数、token数、截断条数
+                by_source: 各来源分摊的token数，按token总数降序
+                by_prompt: 各系统提示词版本（模型+提示词哈希）的调用次数和token数
+                errors: 最终失败的错误类型分布
+                daily_latency: 每天的调用次数和延迟p50/p95（毫秒），用于发现上游变慢
+        """
+        since = int(time.time()) - days * 86400
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT COUNT(*) AS calls, COUNT(error_class) AS failed,
+                       COALESCE(SUM(retries), 0) AS retries, COALESCE(SUM(truncated), 0) AS truncated,
+                       COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens,
+                       COALESCE(SUM(completion_tokens), 0) AS completion_tokens
+                FROM llm_calls WHERE created_at >= ?
+            ''', (since,))
+            total = dict(cursor.fetchone())
+
+            cursor.execute('''
+                SELECT s.source_name, SUM(s.items) AS items,
+                       SUM(c.prompt_tokens * 1.0 * s.items / c.items) AS prompt_tokens,
+                       SUM(c.completion_tokens * 1.0 * s.items / c.items) AS completion_tokens,
+                       SUM((c.prompt_tokens + c.completion_tokens) * 1.0 * s.items / c.items) AS total_tokens
+                FROM llm_calls c JOIN llm_call_sources s ON s.call_id = c.id
+                WHERE c.created_at >= ?
+                GROUP BY s.source_name
+                ORDER BY total_tokens DESC
+            ''', (since,))
+            by_source = [dict(row) for row in cursor.fetchall()]
+
+            cursor.execute('''
+                SELECT model, prompt_hash, kind, COUNT(*) AS calls, SUM(items) AS items,
+                       SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens,
+                       SUM(prompt_tokens + completion_tokens) AS total_tokens
+                FROM llm_calls WHERE created_at >= ?
+                GROUP BY model, prompt_hash, kind
+                ORDER BY total_tokens DESC
+            ''', (since,))
+            by_prompt = [dict(row) for row in cursor.fetchall()]
+
+            cursor.execute('''
+                SELECT error_class, COUNT(*) AS count FROM llm_calls
+                WHERE created_at >= ? AND error_class IS NOT NULL
+                GROUP BY error_class ORDER BY count DESC
+            ''', (since,))
+            errors = {row['error_class']: row['count'] for row in cursor.fetchall()}
+
+            cursor.execute('''
+                SELECT date(created_at, 'unixepoch', 'localtime') AS day, latency_ms
+                FROM llm_calls WHERE created_at >= ? ORDER BY day
+            ''', (since,))
+            latencies_by_day: Dict[str, List[int]] = {}
+            for row in cursor.fetchall():
+                latencies_by_day.setdefault(row['day'], []).append(row['latency_ms'])
+
+        daily_latency = {
+            day: {
+                'calls': len(latencies),
+                'p50_ms': percentile(latencies, 50),
+                'p95_ms': percentile(latencies, 95),
+            }
+            for day, latencies in latencies_by_day.items()
+        }
+
+        return {
+            'total': total,
+            'by_source': by_source,
+            'by_prompt': by_prompt,
+            'errors': errors,
+            'daily_latency': daily_latency,
+        }
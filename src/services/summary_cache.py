@@ -0,0 +1,167 @@
+import hashlib
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.database import NewsDatabase
+
+# 每次按键批量查询缓存的数量（不超过SQLite的参数个数上限）
+LOOKUP_BATCH_SIZE = 500
+
+class SummaryCache:
+    """AI总结结果缓存
+
+    以 (模型, 系统规则, 字数限制, 标题, 副标题) 的哈希为键保存总结结果，与news_items存放在同一个SQLite数据库中，
+    复用NewsDatabase的线程级长连接。
+    相同输入（例如同一条新闻出现在多个来源，或失败后重新运行）不会重复调用API；
+    修改模型或SYSTEM_RULES后键随之变化，旧结果自然失效，并在过期或超出容量后被淘汰。
+    命中时更新最近使用时间，淘汰时先删除超过有效期的条目，再按最近使用时间删除超出容量的条目。
+    """
+
+    def __init__(self, db_path: str = "data/news.db", ttl_days: int = 90, max_entries: int = 50000):
+        """初始化总结缓存
+
+        Args:
+            db_path: str 数据库文件路径
+            ttl_days: int 条目未被使用的最长保留天数
+            max_entries: int 最多保留的条目数
+        """
+        self.db_path = db_path
+        self.db = NewsDatabase(db_path)
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._init_table()
+
+    def _init_table(self):
+        """初始化缓存表结构"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS summary_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    created_at INTEGER NOT NULL,
+                    last_used INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_summary_cache_last_used ON summary_cache(last_used)')
+            conn.commit()
+
+    @staticmethod
+    def make_key(model: str, rules: List[str], max_chars: int, title: str, subtitle: str = "") -> str:
+        """计算缓存键
+
+        Args:
+            model: str 模型名称
+            rules: List[str] 系统规则
+            max_chars: int 字数限制
+            title: str 新闻标题
+            subtitle: str 新闻副标题
+
+        Returns:
+            str 缓存键（SHA-256十六进制）
+        """
+        payload = json.dumps(
+            [model, list(rules), max_chars, title.strip(), (subtitle or "").strip()],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """批量查询缓存，命中的条目更新最近使用时间
+
+        Args:
+            keys: Iterable[str] 缓存键
+
+        Returns:
+            Dict[str, str] 命中的缓存键到总结的映射
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        now = int(time.time())
+        found: Dict[str, str] = {}
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            for i in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                batch = keys[i:i + LOOKUP_BATCH_SIZE]
+                placeholders = ', '.join('?' * len(batch))
+                cursor.execute(
+                    f'SELECT cache_key, summary FROM summary_cache WHERE cache_key IN ({placeholders}) AND last_used >= ?',
+                    batch + [now - self.ttl_seconds]
+                )
+                found.update((row['cache_key'], row['summary']) for row in cursor.fetchall())
+
+            if found:
+                cursor.executemany(
+                    'UPDATE summary_cache SET last_used = ? WHERE cache_key = ?',
+                    [(now, key) for key in found]
+                )
+            conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[str, str]]) -> int:
+        """批量写入缓存
+
+        Args:
+            entries: Iterable[Tuple[str, str]] (缓存键, 总结)
+
+        Returns:
+            int 写入的条目数
+        """
+        now = int(time.time())
+        rows = [(key, summary, now, now) for key, summary in entries if summary]
+        if not rows:
+            return 0
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO summary_cache (cache_key, summary, created_at, last_used)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET summary = excluded.summary, last_used = excluded.last_used
+            ''', rows)
+            conn.commit()
+
+        return len(rows)
+
+    def evict(self) -> int:
+        """淘汰过期条目和超出容量的最久未使用条目
+
+        Returns:
+            int 删除的条目数
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM summary_cache WHERE last_used < ?', (int(time.time()) - self.ttl_seconds,))
+            deleted = cursor.rowcount
+
+            cursor.execute('''
+                DELETE FROM summary_cache WHERE cache_key IN (
+                    SELECT cache_key FROM summary_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+            deleted += cursor.rowcount
+            conn.commit()
+
+        return deleted
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        """获取本次运行的命中统计
+
+        Returns:
+            Dict[str, Optional[float]] {'hits': 命中数, 'misses': 未命中数, 'hit_rate': 命中率（无查询时为None）}
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+        }
@@ -1,10 +1,20 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
+from .config import HTTPConfig
+import asyncio
+import atexit
+import httpx
+import threading
 
 class NewsSource(ABC):
     """新闻源基类"""
     
+    # 所有新闻源共享的HTTP客户端（连接池、keep-alive、HTTP/2）
+    _http_client: Optional[httpx.Client] = None
+    _http_lock = threading.Lock()
+    _http_stats: Dict[str, int] = {'requests': 0, 'new_connections': 0}
+    
     def __init__(self, name: str, source_type: str):
         """初始化新闻源
         
@@ -14,6 +24,8 @@ class NewsSource(ABC):
         """
         self.name = name
         self.source_type = source_type
+        # 取消标志：来源超过总时限被放弃时设置，在线程中运行的同步实现据此提前结束
+        self._cancelled = threading.Event()
     
     @abstractmethod
     def get_news(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Dict]:
@@ -36,6 +48,165 @@ class NewsSource(ABC):
         """
         pass
     
+    async def aget_news(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Dict]:
+        """异步获取新闻文章列表
+        
+        默认在线程池中运行同步的get_news，使同步实现的来源也能与其他来源并发执行。
+        原生支持异步的来源（如API、网页来源）可以直接重写此方法。
+        
+        Args:
+            start_date: Optional[datetime] 开始时间，为None则不限制
+            end_date: Optional[datetime] 结束时间，为None则不限制
+        
+        Returns:
+            List[Dict] 标准化的新闻数据列表，格式同get_news
+        """
+        return await asyncio.to_thread(self.get_news, start_date, end_date)
+    
+    def iter_news(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Iterator[List[Dict]]:
+        """分批获取新闻，供流式处理使用
+        
+        默认一次性返回get_news的全部结果，子类可以按自身的自然批次（如单个RSS源）逐批返回，
+        使调用方无需把整个运行的新闻都保存在内存中。
+        
+        Args:
+            start_date: Optional[datetime] 开始时间，为None则不限制
+            end_date: Optional[datetime] 结束时间，为None则不限制
+        
+        Yields:
+            List[Dict] 一批标准化的新闻数据
+        """
+        yield self.get_news(start_date, end_date)
+    
+    @classmethod
+    def get_http_client(cls, config: Optional[HTTPConfig] = None) -> httpx.Client:
+        """获取共享的HTTP客户端，首次调用时创建
+        
+        Args:
+            config: Optional[HTTPConfig] HTTP配置，仅在首次创建时生效
+        
+        Returns:
+            httpx.Client 共享的HTTP客户端
+        """
+        with NewsSource._http_lock:
+            if NewsSource._http_client is None:
+                config = config or HTTPConfig()
+                config.validate()
+                
+                http2 = config.HTTP2
+                if http2:
+                    try:
+                        import h2  # noqa: F401
+                    except ImportError:
+                        print("未安装h2，HTTP/2已禁用")
+                        http2 = False
+                
+                # gzip由httpx自动解压，安装brotli后会自动支持br编码
+                NewsSource._http_client = httpx.Client(
+                    http2=http2,
+                    follow_redirects=True,
+                    timeout=httpx.Timeout(config.TIMEOUT, connect=config.CONNECT_TIMEOUT),
+                    limits=httpx.Limits(
+                        max_connections=config.MAX_CONNECTIONS,
+                        max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=config.KEEPALIVE_EXPIRY,
+                    ),
+                )
+                atexit.register(NewsSource.close_http_client)
+            
+            return NewsSource._http_client
+    
+    @classmethod
+    def close_http_client(cls) -> None:
+        """关闭共享的HTTP客户端"""
+        with NewsSource._http_lock:
+            if NewsSource._http_client is not None:
+                NewsSource._http_client.close()
+                NewsSource._http_client = None
+    
+    @classmethod
+    def get_http_stats(cls) -> Dict[str, float]:
+        """获取共享HTTP客户端的连接统计
+        
+        Returns:
+            Dict 包含请求数、新建连接数和连接复用率
+        """
+        with NewsSource._http_lock:
+            requests = NewsSource._http_stats['requests']
+            new_connections = NewsSource._http_stats['new_connections']
+        
+        reused = max(requests - new_connections, 0)
+        return {
+            'requests': requests,
+            'new_connections': new_connections,
+            'reused_connections': reused,
+            'reuse_rate': reused / requests if requests else 0.0,
+        }
+    
+    @classmethod
+    def reset_http_stats(cls) -> None:
+        """重置共享HTTP客户端的连接统计"""
+        with NewsSource._http_lock:
+            NewsSource._http_stats = {'requests': 0, 'new_connections': 0}
+    
+    def http_get(self, url: str, **kwargs) -> httpx.Response:
+        """通过共享HTTP客户端发送GET请求，并统计连接复用情况
+        
+        Args:
+            url: str 请求地址
+            **kwargs: 传给httpx.Client.get的其他参数
+        
+        Returns:
+            httpx.Response 响应对象
+        """
+        new_connections = []
+        
+        def trace(event_name: str, info: Dict) -> None:
+            # 只有新建连接时才会触发TCP连接事件，复用的连接不会触发
+            if event_name == 'connection.connect_tcp.complete':
+                new_connections.append(event_name)
+        
+        extensions = dict(kwargs.pop('extensions', None) or {})
+        extensions['trace'] = trace
+        
+        client = self.get_http_client()
+        response = client.get(url, extensions=extensions, **kwargs)
+        
+        with NewsSource._http_lock:
+            NewsSource._http_stats['requests'] += 1 + len(response.history)
+            NewsSource._http_stats['new_connections'] += len(new_connections)
+        
+        return response
+    
+    def commit_state(self) -> None:
+        """新闻成功保存后提交来源的抓取状态（如条件请求缓存），默认无需处理"""
+        pass
+    
+    def discard_state(self) -> None:
+        """放弃本次抓取暂存的来源状态（来源超时被放弃、新闻未保存时调用），默认无需处理"""
+        pass
+    
+    def cancel(self) -> None:
+        """请求停止本次抓取
+        
+        异步实现的aget_news会被直接取消；默认实现在线程池中运行get_news，线程无法被强制中断，
+        会继续运行到get_news返回（进程退出前也会等待它结束）。同步实现应在处理每个子任务
+        （如单个RSS源）之前检查is_cancelled()并尽快返回，且不再暂存抓取状态。
+        """
+        self._cancelled.set()
+    
+    def reset_cancel(self) -> None:
+        """开始新一次抓取前清除取消标志"""
+        self._cancelled.clear()
+    
+    def is_cancelled(self) -> bool:
+        """本次抓取是否已被取消
+        
+        Returns:
+            bool 是否已取消
+        """
+        return self._cancelled.is_set()
+    
     def filter_by_date(self, news_list: List[Dict], start_date: Optional[datetime], end_date: Optional[datetime]) -> List[Dict]:
         """按日期过滤新闻列表
         
@@ -0,0 +1,157 @@
+import json
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# 未提供规则文件时使用的内置规则（微信公众号文章常见的尾部内容）
+DEFAULT_RULES: List[Dict[str, str]] = [
+    {'name': '阅读原文', 'pattern': '阅读原文.*'},
+    {'name': '跳转微信打开', 'pattern': '跳转微信打开.*'},
+    {'name': '长按二维码', 'pattern': '长按二维码.*'},
+    {'name': '点击收看', 'pattern': '点击收看.*'},
+]
+
+
+class BoilerplateRules:
+    """正文无用内容清理规则
+
+    规则文件为JSON格式，包含全局规则和按来源名称划分的规则：
+        {
+            "global": [{"name": "阅读原文", "pattern": "阅读原文.*"}],
+            "sources": {"摩登天空": [{"name": "...", "pattern": "..."}]}
+        }
+
+    启动时将每个来源适用的所有规则（全局规则 + 来源规则）编译为一个交替正则，
+    清理时只需对正文扫描一次，规则数量增加不会成倍增加清理时间。
+    所有规则在同一次扫描中作用于原始文本，匹配到的内容会被删除。
+
+    包含捕获分组（如反向引用\\1、命名分组）或全局内联标志（如(?i)）的规则放入交替正则后
+    分组编号会错位或无法编译，这类规则单独编译，在交替正则扫描之后按顺序逐条应用。
+    """
+
+    def __init__(self, rules_file: Optional[str] = None):
+        """初始化清理规则
+
+        Args:
+            rules_file: Optional[str] 规则文件路径，为None或文件不存在时使用内置规则
+        """
+        global_rules, source_rules = self._load_rules(rules_file)
+
+        self._rule_names: Dict[str, str] = {}
+        self._global_patterns = self._compile(global_rules)
+        self._source_patterns: Dict[str, Tuple[Optional[Pattern], List[Tuple[str, Pattern]]]] = {
+            source_name: self._compile(global_rules + rules)
+            for source_name, rules in source_rules.items()
+        }
+
+        self._hit_counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _load_rules(self, rules_file: Optional[str]):
+        """读取规则文件
+
+        Args:
+            rules_file: Optional[str] 规则文件路径
+
+        Returns:
+            Tuple[List[Dict], Dict[str, List[Dict]]] (全局规则, 按来源划分的规则)
+        """
+        if not rules_file:
+            return list(DEFAULT_RULES), {}
+        if not os.path.exists(rules_file):
+            print(f"警告: 清理规则文件不存在: {rules_file}，使用内置规则")
+            return list(DEFAULT_RULES), {}
+
+        with open(rules_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        return config.get('global', []), config.get('sources', {})
+
+    def _compile(self, rules: List[Dict[str, str]]) -> Tuple[Optional[Pattern], List[Tuple[str, Pattern]]]:
+        """将多条规则编译为一个交替正则，每条规则对应一个命名分组用于统计命中次数
+
+        Args:
+            rules: List[Dict[str, str]] 规则列表
+
+        Returns:
+            Tuple[Optional[Pattern], List[Tuple[str, Pattern]]] (交替正则，没有可合并的规则时为None,
+                需要单独应用的 (规则名称, 正则) 列表)
+        """
+        alternatives = []
+        separate = []
+        for rule in rules:
+            name = rule.get('name') or rule['pattern']
+
+            # 校验单条规则，便于定位写错的正则
+            try:
+                compiled = re.compile(rule['pattern'])
+            except re.error as e:
+                raise ValueError(f"清理规则 {name} 不是合法的正则: {str(e)}")
+
+            group_name = f"rule{len(self._rule_names)}"
+            alternative = f"(?P<{group_name}>{rule['pattern']})"
+            if compiled.groups or not self._is_valid(alternative):
+                separate.append((name, compiled))
+                continue
+
+            self._rule_names[group_name] = name
+            alternatives.append(alternative)
+
+        combined = re.compile('|'.join(alternatives)) if alternatives else None
+        return combined, separate
+
+    @staticmethod
+    def _is_valid(pattern: str) -> bool:
+        """检查正则能否编译（规则中的全局内联标志放入分组后无法编译）"""
+        try:
+            re.compile(pattern)
+        except re.error:
+            return False
+        return True
+
+    def apply(self, text: str, source_name: Optional[str] = None) -> str:
+        """对文本应用清理规则
+
+        Args:
+            text: str 待清理文本
+            source_name: Optional[str] 来源名称，用于选择来源专属规则
+
+        Returns:
+            str: 清理后的文本
+        """
+        pattern, separate = self._source_patterns.get(source_name, self._global_patterns)
+
+        hits = []
+
+        def remove(match) -> str:
+            hits.append(self._rule_names[match.lastgroup])
+            return ''
+
+        if pattern is not None:
+            text = pattern.sub(remove, text)
+
+        for name, rule_pattern in separate:
+            text, count = rule_pattern.subn('', text)
+            hits.extend([name] * count)
+
+        if hits:
+            with self._lock:
+                self._hit_counts.update(hits)
+
+        return text
+
+    def get_hit_counts(self) -> Dict[str, int]:
+        """获取各规则的命中次数
+
+        Returns:
+            Dict[str, int] 规则名称到命中次数的映射，按命中次数降序排列
+        """
+        with self._lock:
+            return dict(self._hit_counts.most_common())
+
+    def reset_hit_counts(self) -> None:
+        """重置命中次数统计"""
+        with self._lock:
+            self._hit_counts.clear()
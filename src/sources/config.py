@@ -0,0 +1,66 @@
+import os
+
+# 内置的正文清理规则文件，按本文件位置解析，与运行时的工作目录无关
+DEFAULT_CLEANING_RULES_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'default', 'cleaning_rules.json'
+)
+
+class RSSConfig:
+    """RSS抓取配置类"""
+
+    def __init__(self):
+        # 并发配置：同时抓取的RSS源数量，1表示串行抓取
+        self.MAX_WORKERS: int = int(os.getenv('RSS_MAX_WORKERS', '4'))
+        # 单个RSS源的请求超时时间（秒）
+        self.FEED_TIMEOUT: float = float(os.getenv('RSS_FEED_TIMEOUT', '20'))
+        # 是否使用ETag/Last-Modified条件请求跳过未更新的RSS源
+        self.CONDITIONAL_GET: bool = os.getenv('RSS_CONDITIONAL_GET', '1') == '1'
+        # 是否启用增量抓取：遇到已处理过的文章即停止处理该RSS源剩余的文章
+        self.INCREMENTAL: bool = os.getenv('RSS_INCREMENTAL', '1') == '1'
+        # 同一主机的默认限流参数：每秒请求数与允许的突发请求数
+        # 单个RSS源可在OPML中通过rateLimit/rateBurst属性覆盖
+        self.HOST_RATE: float = float(os.getenv('RSS_HOST_RATE', '1'))
+        self.HOST_BURST: float = float(os.getenv('RSS_HOST_BURST', '1'))
+        # 正文HTML转纯文本的引擎：bs4（BeautifulSoup）或lxml（流式解析，较快）
+        # lxml在样例正文上与bs4输出一致，但对格式错误的实体/注释等仍有差异，默认使用bs4
+        self.HTML_ENGINE: str = os.getenv('RSS_HTML_ENGINE', 'bs4')
+        # 正文无用内容清理规则文件（全局规则与按来源划分的规则）
+        self.CLEANING_RULES_FILE: str = os.getenv('RSS_CLEANING_RULES', DEFAULT_CLEANING_RULES_FILE)
+
+    def validate(self) -> bool:
+        """验证配置是否合法"""
+        if self.MAX_WORKERS < 1:
+            raise ValueError("RSS_MAX_WORKERS必须大于等于1")
+        if self.FEED_TIMEOUT <= 0:
+            raise ValueError("RSS_FEED_TIMEOUT必须大于0")
+        if self.HOST_RATE <= 0 or self.HOST_BURST <= 0:
+            raise ValueError("RSS_HOST_RATE和RSS_HOST_BURST必须大于0")
+        if self.HTML_ENGINE not in ('lxml', 'bs4'):
+            raise ValueError("RSS_HTML_ENGINE只能为lxml或bs4")
+        return True
+
+
+class HTTPConfig:
+    """新闻源共享HTTP客户端配置类"""
+
+    def __init__(self):
+        # 连接池配置
+        self.MAX_CONNECTIONS: int = int(os.getenv('HTTP_MAX_CONNECTIONS', '20'))
+        self.MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '10'))
+        # 空闲连接保持时间（秒）
+        self.KEEPALIVE_EXPIRY: float = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '30'))
+        # 超时配置（秒）
+        self.CONNECT_TIMEOUT: float = float(os.getenv('HTTP_CONNECT_TIMEOUT', '10'))
+        self.TIMEOUT: float = float(os.getenv('HTTP_TIMEOUT', '30'))
+        # 是否启用HTTP/2（需要安装h2）
+        self.HTTP2: bool = os.getenv('HTTP_HTTP2', '1') == '1'
+
+    def validate(self) -> bool:
+        """验证配置是否合法"""
+        if self.MAX_CONNECTIONS < 1:
+            raise ValueError("HTTP_MAX_CONNECTIONS必须大于等于1")
+        if self.MAX_KEEPALIVE_CONNECTIONS < 0:
+            raise ValueError("HTTP_MAX_KEEPALIVE_CONNECTIONS不能小于0")
+        if self.CONNECT_TIMEOUT <= 0 or self.TIMEOUT <= 0:
+            raise ValueError("HTTP_CONNECT_TIMEOUT和HTTP_TIMEOUT必须大于0")
+        return True
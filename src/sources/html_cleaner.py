@@ -0,0 +1,191 @@
+import html
+import re
+from html.entities import html5
+from typing import Callable, List, Optional
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:  # lxml为可选依赖，缺失时回退到BeautifulSoup
+    etree = None
+
+# 提取纯文本时整体丢弃的标签（BeautifulSoup的get_text()本身也不输出template中的文本）
+SKIPPED_TAGS = ('script', 'style', 'template')
+
+# 预编译的空白字符正则
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# 交给lxml之前需要按html.parser的规则预处理的片段：
+# CDATA段、</html>和</body>结束标签（libxml2会丢弃其后的内容）、数字字符引用和命名实体引用。
+# 实体引用的匹配规则与html.parser一致：名称后必须跟一个非字母数字字符，结尾的分号可省略；
+# 不构成字符引用的&#、不构成标签的<按字面输出
+LXML_PREPROCESS_PATTERN = re.compile(
+    r'(?P<cdata><!\[CDATA\[(?P<cdata_text>.*?)\]\s*\]\s*>)'
+    r'|(?P<end_tag></(?:html|body)\s*>)'
+    r'|&#(?P<charref>[0-9]+|[xX][0-9a-fA-F]+)(?:;|(?=[^0-9a-fA-F]))'
+    r'|&(?P<entityref>[a-zA-Z][-.a-zA-Z0-9]*)(?:;|(?=[^a-zA-Z0-9]))'
+    r'|(?P<bare_charref>&#)'
+    r'|(?P<bare_lt><(?![a-zA-Z/!?]))',
+    re.DOTALL | re.IGNORECASE
+)
+
+# libxml2无法原样保留的字符（XML 1.0不允许的控制字符、代理项等），遇到时回退到BeautifulSoup
+LXML_INVALID_CHAR_PATTERN = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+
+def extract_text_bs4(html_content: str) -> str:
+    """使用BeautifulSoup(html.parser)提取纯文本
+
+    Args:
+        html_content: str HTML内容
+
+    Returns:
+        str: 未清理空白的纯文本
+    """
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    # 移除script、style和template标签
+    for tag in soup(list(SKIPPED_TAGS)):
+        tag.decompose()
+
+    return soup.get_text()
+
+
+class _TextCollector:
+    """lxml解析器的事件接收器，边解析边收集文本，不构建DOM树"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.skip_depth = 0
+
+    def start(self, tag, attrib):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        if tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+    def close(self) -> str:
+        return ''.join(self.parts)
+
+
+def _decode_charref(name: str) -> str:
+    """按BeautifulSoup的规则解码数字字符引用，0-255优先按windows-1252解释
+
+    Args:
+        name: str 引用中的数字部分，十六进制以x开头
+
+    Returns:
+        str: 对应的字符，无效码位返回替换字符
+    """
+    codepoint = int(name[1:], 16) if name[0] in 'xX' else int(name)
+    if codepoint < 256:
+        try:
+            return bytes([codepoint]).decode('windows-1252')
+        except UnicodeDecodeError:
+            pass
+    try:
+        return chr(codepoint)
+    except (ValueError, OverflowError):
+        return '\N{REPLACEMENT CHARACTER}'
+
+
+def _escape_for_lxml(text: str) -> str:
+    """转义文本中的&、<、>，避免libxml2再次把其中的字符解释为标记"""
+    return html.escape(text, quote=False)
+
+
+def _replace_for_lxml(match: re.Match) -> str:
+    """LXML_PREPROCESS_PATTERN的替换函数，输出与html.parser解析结果一致的标记"""
+    if match.group('cdata'):
+        # html.parser把CDATA段作为文本输出
+        return _escape_for_lxml(match.group('cdata_text'))
+    if match.group('end_tag'):
+        return ''
+    if match.group('charref'):
+        return _escape_for_lxml(_decode_charref(match.group('charref')))
+    if match.group('bare_charref'):
+        return '&amp;#'
+    if match.group('bare_lt'):
+        return '&lt;'
+
+    # 未知的实体按字面输出，BeautifulSoup会丢弃其后的分号
+    name = match.group('entityref')
+    character = html5.get(name + ';')
+    return _escape_for_lxml(character if character is not None else '&' + name)
+
+
+def _prepare_for_lxml(html_content: str) -> Optional[str]:
+    """按html.parser的规则预处理HTML，使lxml提取的文本与BeautifulSoup一致
+
+    Args:
+        html_content: str HTML内容
+
+    Returns:
+        Optional[str]: 预处理后的HTML，包含lxml无法原样保留的字符时返回None
+    """
+    prepared = LXML_PREPROCESS_PATTERN.sub(_replace_for_lxml, html_content)
+    if LXML_INVALID_CHAR_PATTERN.search(prepared):
+        return None
+    return prepared
+
+
+def extract_text_lxml(html_content: str) -> str:
+    """使用lxml事件解析流式提取纯文本，跳过script、style和template，忽略注释
+
+    实体、CDATA段和</html>之后的内容先按html.parser的规则预处理，结果与extract_text_bs4一致；
+    包含NUL等libxml2无法保留的字符时回退到extract_text_bs4。
+
+    Args:
+        html_content: str HTML内容
+
+    Returns:
+        str: 未清理空白的纯文本
+    """
+    prepared = _prepare_for_lxml(html_content)
+    if prepared is None:
+        return extract_text_bs4(html_content)
+
+    parser = etree.HTMLParser(target=_TextCollector())
+    # 文档以多余的结束标签开头时libxml2会丢弃全部内容，先打开body
+    parser.feed('<body>')
+    parser.feed(prepared)
+    return parser.close()
+
+
+def get_text_extractor(engine: str) -> Callable[[str], str]:
+    """根据配置选择纯文本提取引擎
+
+    Args:
+        engine: str 引擎名称，lxml或bs4
+
+    Returns:
+        Callable[[str], str] 提取函数
+    """
+    if engine == 'lxml':
+        if etree is not None:
+            return extract_text_lxml
+        print("未安装lxml，HTML清理回退到BeautifulSoup")
+        return extract_text_bs4
+
+    if engine == 'bs4':
+        return extract_text_bs4
+
+    raise ValueError(f"不支持的HTML清理引擎: {engine}")
+
+
+def normalize_text(text: str) -> str:
+    """合并提取出的纯文本中的空白字符并去除首尾空白
+
+    Args:
+        text: str 纯文本
+
+    Returns:
+        str: 清理后的文本
+    """
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
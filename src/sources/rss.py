@@ -1,25 +1,60 @@
 import feedparser
 import xml.etree.ElementTree as ET
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Tuple
 from .base import NewsSource
-import time
+from .config import RSSConfig
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import httpx
+import threading
 import hashlib
 from utils.date_service import DateRangeService
-from bs4 import BeautifulSoup
+from utils.rate_limiter import HostRateLimiter
+from urllib.parse import urljoin, urlparse
+from services.feed_state import FeedStateStore
+from .html_cleaner import get_text_extractor, normalize_text
+from .cleaning_rules import BoilerplateRules
 import re
 
+# 常见的RSS时间格式，按尝试顺序排列
+TIME_FORMATS = (
+    '%a, %d %b %Y %H:%M:%S %z',  # RFC 2822
+    '%a, %d %b %Y %H:%M:%S %Z',  # RFC 2822 with timezone name
+    '%Y-%m-%dT%H:%M:%S%z',       # ISO 8601
+    '%Y-%m-%dT%H:%M:%SZ',        # ISO 8601 UTC
+    '%Y-%m-%d %H:%M:%S',         # Simple format
+)
+
 class RSSSource(NewsSource):
     """RSS新闻来源"""
     
-    def __init__(self, opml_file: str):
+    def __init__(self, opml_file: str, config: Optional[RSSConfig] = None, feed_state: Optional[FeedStateStore] = None):
         """初始化RSS来源
         
         Args:
             opml_file: str OPML文件路径
+            config: Optional[RSSConfig] 抓取配置，如果为None则使用默认配置
+            feed_state: Optional[FeedStateStore] RSS源状态存储，如果为None且启用了条件请求则使用默认存储
         """
         super().__init__("RSS聚合", "rss")
         self.opml_file = opml_file
+        self.config = config or RSSConfig()
+        self.config.validate()
+        self._extract_text = get_text_extractor(self.config.HTML_ENGINE)
+        # 正文无用内容清理规则，启动时编译一次
+        self.cleaning_rules = BoilerplateRules(self.config.CLEANING_RULES_FILE)
+        # 每个RSS源的时间格式尝试顺序（上次成功的格式排在最前）
+        self._date_formats: Dict[str, Tuple[str, ...]] = {}
+        
+        # 条件请求（ETag/Last-Modified）需要持久化每个RSS源的状态
+        if feed_state is None and self.config.CONDITIONAL_GET:
+            feed_state = FeedStateStore()
+        self.feed_state = feed_state
+        
+        # 本次抓取的统计数据
+        self.fetch_stats: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
     
     def _extract_subtitle(self, entry) -> str:
         """提取RSS条目的副标题（description字段）
@@ -44,11 +79,12 @@ class RSSSource(NewsSource):
         
         return subtitle
     
-    def _extract_content(self, entry) -> str:
+    def _extract_content(self, entry, source_name: Optional[str] = None) -> str:
         """提取RSS条目的完整内容
         
         Args:
             entry: RSS条目
+            source_name: Optional[str] RSS源名称，用于选择来源专属的清理规则
         
         Returns:
             str: 清理后的文本内容
@@ -72,44 +108,26 @@ class RSSSource(NewsSource):
         
         # 清理HTML并提取纯文本
         if content:
-            return self._clean_html_content(content)
+            return self._clean_html_content(content, source_name)
         
         return ""
     
-    def _clean_html_content(self, html_content: str) -> str:
+    def _clean_html_content(self, html_content: str, source_name: Optional[str] = None) -> str:
         """清理HTML内容，提取纯文本
         
         Args:
             html_content: str HTML内容
+            source_name: Optional[str] RSS源名称，用于选择来源专属的清理规则
         
         Returns:
             str: 清理后的纯文本
         """
         try:
-            # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # 移除script和style标签
-            for tag in soup(['script', 'style']):
-                tag.decompose()
-            
-            # 获取纯文本
-            text = soup.get_text()
+            # 使用配置的引擎（lxml或BeautifulSoup）提取纯文本，script和style会被移除
+            text = self._extract_text(html_content)
             
-            # 清理文本
-            # 移除多余的空白字符
-            text = re.sub(r'\s+', ' ', text)
-            
-            # 移除首尾空白
-            text = text.strip()
-            
-            # 移除常见的无用内容
-            text = re.sub(r'阅读原文.*', '', text)
-            text = re.sub(r'跳转微信打开.*', '', text)
-            text = re.sub(r'长按二维码.*', '', text)
-            text = re.sub(r'点击收看.*', '', text)
-            
-            return text
+            # 合并空白，再按清理规则一次性移除常见的无用内容
+            return self.cleaning_rules.apply(normalize_text(text), source_name)
             
         except Exception as e:
             print(f"HTML清理失败，使用原始内容: {str(e)}")
@@ -128,106 +146,414 @@ class RSSSource(NewsSource):
         Returns:
             List[Dict] 标准化的新闻数据列表
         """
-        all_news = []
+        return [news_item for feed_news in self.iter_news(start_date, end_date) for news_item in feed_news]
+    
+    def iter_news(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Iterator[List[Dict]]:
+        """逐个RSS源获取新闻，每处理完一个RSS源就返回该源的新闻
+        
+        Args:
+            start_date: Optional[datetime] 开始时间
+            end_date: Optional[datetime] 结束时间
         
+        Yields:
+            List[Dict] 单个RSS源中符合时间条件的新闻列表，按OPML中的顺序返回
+        """
         # 解析OPML文件
-        tree = ET.parse(self.opml_file)
-        root = tree.getroot()
+        feeds = self._load_feeds()
+        self.fetch_stats = {}
+        # 丢弃之前被放弃的抓取残留的暂存状态
+        if self.feed_state:
+            self.feed_state.discard()
+        self.cleaning_rules.reset_hit_counts()
+        self.rate_limiter = self._build_rate_limiter(feeds)
         
         print(f"\n开始获取RSS内容...")
         if start_date and end_date:
             print(f"时间范围: {start_date.strftime('%Y-%m-%d %H:%M')} 到 {end_date.strftime('%Y-%m-%d %H:%M')}")
         print()
         
-        # 查找所有RSS源
-        outlines = root.findall('.//outline[@type="rss"]')
+        total_count = 0
+        for feed_news in self._iter_feed_results(feeds, start_date, end_date):
+            total_count += len(feed_news)
+            yield feed_news
         
-        for outline in outlines:
-            source_name = outline.get('text', '未知来源')  # 具体的RSS源名称
-            rss_url = outline.get('xmlUrl')
+        if self.is_cancelled():
+            print(f"RSS抓取已取消，已获取 {total_count} 条新闻")
+            return
+        
+        print(f"\n总计获取到 {total_count} 条符合时间条件的新闻")
+        self._print_fetch_stats(len(feeds))
+    
+    def _iter_feed_results(self, feeds: List[Dict], start_date: Optional[datetime], end_date: Optional[datetime]) -> Iterator[List[Dict]]:
+        """按OPML中的顺序返回各RSS源的抓取结果，并发模式下最多预取两倍并发数的结果
+        
+        抓取被取消（见NewsSource.cancel）后不再开始新的RSS源，尚未开始的任务直接取消。
+        
+        Args:
+            feeds: List[Dict] RSS源列表
+            start_date: Optional[datetime] 开始时间
+            end_date: Optional[datetime] 结束时间
+        
+        Yields:
+            List[Dict] 单个RSS源的新闻列表
+        """
+        max_workers = min(self.config.MAX_WORKERS, len(feeds))
+        if max_workers <= 1:
+            for feed in feeds:
+                if self.is_cancelled():
+                    return
+                yield self._fetch_feed(feed, start_date, end_date)
+            return
+        
+        # 并发抓取，结果按OPML中的顺序返回，与串行抓取保持一致
+        print(f"并发抓取 {len(feeds)} 个RSS源（并发数: {max_workers}）")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for feed in feeds:
+                if self.is_cancelled():
+                    break
+                pending.append(executor.submit(self._fetch_feed, feed, start_date, end_date))
+                # 限制已完成但尚未被消费的结果数量，保证内存占用有上限
+                if len(pending) >= max_workers * 2:
+                    yield pending.popleft().result()
             
+            while pending:
+                if self.is_cancelled():
+                    for future in pending:
+                        future.cancel()
+                    return
+                yield pending.popleft().result()
+    
+    def _print_fetch_stats(self, feed_count: int) -> None:
+        """输出本次抓取的统计信息
+        
+        Args:
+            feed_count: int RSS源总数
+        """
+        stats = self.fetch_stats
+        print(f"RSS源总数: {feed_count}，未更新跳过: {stats.get('feeds_not_modified', 0)}，"
+              f"增量跳过已处理文章: {stats.get('entries_known', 0)}")
+        print(f"下载流量: {stats.get('bytes_downloaded', 0) / 1024:.1f} KB，"
+              f"条件请求节省: {stats.get('bytes_saved', 0) / 1024:.1f} KB")
+        
+        hit_counts = self.cleaning_rules.get_hit_counts()
+        if hit_counts:
+            print("清理规则命中: " + "，".join(f"{name} {count} 次" for name, count in hit_counts.items()))
+    
+    def _load_feeds(self) -> List[Dict]:
+        """从OPML文件中读取RSS源列表
+        
+        Returns:
+            List[Dict] RSS源列表，每项包含name和url
+        """
+        tree = ET.parse(self.opml_file)
+        root = tree.getroot()
+        
+        feeds = []
+        # 查找所有RSS源
+        for outline in root.findall('.//outline[@type="rss"]'):
+            rss_url = outline.get('xmlUrl')
             if not rss_url:
                 continue
+            feeds.append({
+                'name': outline.get('text', '未知来源'),  # 具体的RSS源名称
+                'url': rss_url,
+                'host': urlparse(rss_url).netloc,
+                # 可选的单源限流配置
+                'rate': self._parse_float_attr(outline, 'rateLimit'),
+                'burst': self._parse_float_attr(outline, 'rateBurst'),
+            })
+        
+        return feeds
+    
+    def _parse_float_attr(self, outline, name: str) -> Optional[float]:
+        """读取OPML outline中的数值属性
+        
+        Args:
+            outline: OPML outline节点
+            name: str 属性名
+        
+        Returns:
+            Optional[float] 属性值，不存在或不合法时返回None
+        """
+        value = outline.get(name)
+        if not value:
+            return None
+        
+        try:
+            number = float(value)
+        except ValueError:
+            print(f"忽略不合法的{name}属性: {outline.get('text', '未知来源')} ({value})")
+            return None
+        
+        return number if number > 0 else None
+    
+    def _build_rate_limiter(self, feeds: List[Dict]) -> HostRateLimiter:
+        """根据RSS源列表构建按主机划分的限流器
+        
+        不同主机的RSS源互不等待，同一主机的多个RSS源共享一个令牌桶，
+        按OPML中配置的最严格的rateLimit/rateBurst进行间隔。
+        
+        Args:
+            feeds: List[Dict] RSS源列表
+        
+        Returns:
+            HostRateLimiter 限流器
+        """
+        rate_limiter = HostRateLimiter(self.config.HOST_RATE, self.config.HOST_BURST)
+        for feed in feeds:
+            rate_limiter.configure(feed['host'], feed['rate'], feed['burst'])
+        return rate_limiter
+    
+    def _download_feed(self, feed: Dict, start_date: Optional[datetime], end_date: Optional[datetime]) -> Optional[httpx.Response]:
+        """下载RSS源内容，必要时使用条件请求
+        
+        Args:
+            feed: Dict RSS源信息
+            start_date: Optional[datetime] 开始时间
+            end_date: Optional[datetime] 结束时间
+        
+        Returns:
+            Optional[httpx.Response] 响应对象，内容未更新（304）时返回None
+        """
+        rss_url = feed['url']
+        headers = {'User-Agent': feedparser.USER_AGENT}
+        
+        # 只有上次抓取已处理过本次时间范围时，才能依赖304跳过该RSS源
+        state = self.feed_state.get(rss_url) if self.feed_state else None
+        if state and FeedStateStore.window_covers(state, start_date, end_date):
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+        
+        # 同一主机的请求按令牌桶间隔，不同主机之间无需等待
+        self.rate_limiter.acquire(feed['host'])
+        
+        response = self.http_get(rss_url, timeout=self.config.FEED_TIMEOUT, headers=headers)
+        
+        if response.status_code == 304:
+            self._record_stat('feeds_not_modified')
+            self._record_stat('bytes_saved', state.get('body_size') or 0)
+            return None
+        
+        response.raise_for_status()
+        self._record_stat('bytes_downloaded', len(response.content))
+        return response
+    
+    def _fetch_feed(self, feed: Dict, start_date: Optional[datetime], end_date: Optional[datetime]) -> List[Dict]:
+        """获取单个RSS源的新闻
+        
+        Args:
+            feed: Dict RSS源信息
+            start_date: Optional[datetime] 开始时间
+            end_date: Optional[datetime] 结束时间
+        
+        Returns:
+            List[Dict] 该RSS源中符合时间条件的新闻列表
+        """
+        source_name = feed['name']
+        rss_url = feed['url']
+        feed_news = []
+        
+        print(f"处理RSS源: {source_name}")
+        
+        try:
+            # 获取RSS内容
+            response = self._download_feed(feed, start_date, end_date)
+            
+            if self.is_cancelled():
+                # 下载期间抓取被取消，不再解析，也不暂存状态
+                return []
+            
+            if response is None:
+                print(f"RSS源 {source_name}: 内容未更新，跳过")
+            else:
+                # 传入响应头，使feedparser能够按照Content-Type识别编码，与直接解析URL的结果一致；
+                # 解析字节内容时没有文档地址，通过content-location传入最终URL，相对链接和guid才会按RSS地址解析
+                response_headers = dict(response.headers)
+                response_headers['content-location'] = urljoin(
+                    str(response.url), response_headers.get('content-location', '')
+                )
+                parsed_feed = feedparser.parse(response.content, response_headers=response_headers)
                 
-            print(f"处理RSS源: {source_name}")
+                if parsed_feed.bozo:
+                    print(f"RSS源解析警告: {source_name}")
+                
+                feed_news, newest_published = self._process_entries(parsed_feed, feed, start_date, end_date)
+                
+                if self.feed_state:
+                    fields = dict(
+                        etag=response.headers.get('ETag'),
+                        last_modified=response.headers.get('Last-Modified'),
+                        body_size=len(response.content),
+                        window_start=start_date.isoformat() if start_date else None,
+                        window_end=end_date.isoformat() if end_date else None,
+                    )
+                    # 所有文章都已处理过、提前停止或不在时间范围内时没有新的发布时间，
+                    # 此时保留上次记录的最新发布时间，否则下次无法按时间窗口跳过该RSS源
+                    newest_published = self._merge_newest_published(rss_url, newest_published)
+                    if newest_published:
+                        fields['newest_published'] = newest_published.isoformat()
+                    self.feed_state.stage(rss_url, **fields)
             
+        except Exception as e:
+            print(f"获取RSS源失败: {source_name} - {str(e)}")
+        
+        return feed_news
+    
+    def _merge_newest_published(self, rss_url: str, newest_published: Optional[datetime]) -> Optional[datetime]:
+        """取本次与上次记录的最新发布时间中较晚的一个
+        
+        Args:
+            rss_url: str RSS地址
+            newest_published: Optional[datetime] 本次处理的文章中最新的发布时间
+        
+        Returns:
+            Optional[datetime] 较晚的发布时间，都不存在时返回None
+        """
+        state = self.feed_state.get(rss_url)
+        if not state or not state.get('newest_published'):
+            return newest_published
+        
+        previous = datetime.fromisoformat(state['newest_published'])
+        if newest_published is None:
+            return previous
+        return max(previous, newest_published)
+    
+    def _process_entries(self, parsed_feed, feed: Dict, start_date: Optional[datetime], end_date: Optional[datetime]) -> Tuple[List[Dict], Optional[datetime]]:
+        """处理RSS源中的文章条目
+        
+        Args:
+            parsed_feed: feedparser解析结果
+            feed: Dict RSS源信息
+            start_date: Optional[datetime] 开始时间
+            end_date: Optional[datetime] 结束时间
+        
+        Returns:
+            Tuple[List[Dict], Optional[datetime]] (符合时间条件的新闻列表, 该RSS源中最新的发布时间)
+        """
+        source_name = feed['name']
+        rss_url = feed['url']
+        feed_news = []
+        newest_published = None
+        
+        matched_count = 0
+        total_count = len(parsed_feed.entries)
+        processed_count = 0
+        known_count = 0
+        
+        # 增量抓取：读取该RSS源最近处理过的文章ID
+        state = self.feed_state.get(rss_url) if self.feed_state and self.config.INCREMENTAL else None
+        known_ids = FeedStateStore.get_recent_ids(state)
+        
+        # 获取RSS源的新闻
+        for entry in parsed_feed.entries:
+            processed_count += 1
             try:
-                # 获取RSS内容
-                feed = feedparser.parse(rss_url)
+                # 生成唯一ID
+                unique_id = hashlib.md5(
+                    f"{source_name}_{entry.link}_{entry.title}".encode('utf-8')
+                ).hexdigest()
                 
-                if feed.bozo:
-                    print(f"RSS源解析警告: {source_name}")
+                # 已处理过的文章：满足条件时直接停止，否则只跳过该文章
+                if unique_id in known_ids:
+                    known_count += 1
+                    if FeedStateStore.can_stop_at(known_ids[unique_id], start_date):
+                        print(f"RSS源 {source_name}: 遇到已处理文章，停止处理剩余 {total_count - processed_count} 篇")
+                        break
+                    continue
+                
+                # 解析发布时间
+                published_time = self._parse_published_time(entry, rss_url)
+                
+                if published_time is None:
+                    continue
                 
-                matched_count = 0
-                total_count = len(feed.entries)
+                if newest_published is None or published_time > newest_published:
+                    newest_published = published_time
                 
-                # 获取RSS源的新闻
-                for entry in feed.entries:
-                    try:
-                        # 解析发布时间
-                        published_time = self._parse_published_time(entry)
-                        
-                        if published_time is None:
-                            continue
-                        
-                        # 使用标准的时间格式显示
-                        published_str = published_time.strftime('%Y-%m-%d %H:%M:%S')
-                        
-                        # 检查时间范围
-                        if start_date and end_date:
-                            if not (start_date <= published_time <= end_date):
-                                print(f"跳过文章（时间过早）: {entry.title} ({published_str})")
-                                continue
-                        
-                        print(f"✓ 匹配文章: {entry.title} ({published_str})")
-                        matched_count += 1
-                        
-                        # 生成唯一ID
-                        unique_id = hashlib.md5(
-                            f"{source_name}_{entry.link}_{entry.title}".encode('utf-8')
-                        ).hexdigest()
-                        
-                        # 创建标准化的新闻数据
-                        news_item = {
-                            'id': unique_id,
-                            'source_name': source_name,  # 具体的RSS源名称
-                            'source_type': self.source_type,
-                            'manager_name': self.name,   # RSS聚合管理器名称
-                            'title': entry.title,
-                            'content': self._extract_content(entry),
-                            'published': published_time,
-                            'link': entry.link,
-                            'raw_data': {
-                                'rss_source': source_name,
-                                'rss_url': rss_url,
-                                'entry_id': getattr(entry, 'id', ''),
-                            },
-                            'subtitle': self._extract_subtitle(entry)
-                        }
-                        
-                        all_news.append(news_item)
-                        
-                    except Exception as e:
-                        print(f"处理文章时出错: {str(e)}")
+                # 使用标准的时间格式显示
+                published_str = published_time.strftime('%Y-%m-%d %H:%M:%S')
+                
+                # 检查时间范围
+                if start_date and end_date:
+                    if not (start_date <= published_time <= end_date):
+                        print(f"跳过文章（时间过早）: {entry.title} ({published_str})")
                         continue
                 
-                print(f"RSS源 {source_name}: 处理 {total_count} 篇文章，匹配 {matched_count} 篇")
+                print(f"✓ 匹配文章: {entry.title} ({published_str})")
+                matched_count += 1
+                
+                # 创建标准化的新闻数据
+                news_item = {
+                    'id': unique_id,
+                    'source_name': source_name,  # 具体的RSS源名称
+                    'source_type': self.source_type,
+                    'manager_name': self.name,   # RSS聚合管理器名称
+                    'title': entry.title,
+                    'content': self._extract_content(entry, source_name),
+                    'published': published_time,
+                    'link': entry.link,
+                    'raw_data': {
+                        'rss_source': source_name,
+                        'rss_url': rss_url,
+                        'entry_id': getattr(entry, 'id', ''),
+                    },
+                    'subtitle': self._extract_subtitle(entry)
+                }
                 
-                # 添加延时避免频繁请求
-                time.sleep(1)
+                feed_news.append(news_item)
                 
             except Exception as e:
-                print(f"获取RSS源失败: {source_name}")
+                print(f"处理文章时出错: {str(e)}")
                 continue
         
-        print(f"\n总计获取到 {len(all_news)} 条符合时间条件的新闻")
-        return all_news
+        print(f"RSS源 {source_name}: 处理 {total_count} 篇文章，匹配 {matched_count} 篇")
+        if known_count:
+            print(f"RSS源 {source_name}: 跳过 {known_count} 篇已处理文章")
+        self._record_stat('entries_known', known_count + total_count - processed_count)
+        
+        if self.feed_state and self.config.INCREMENTAL and feed_news:
+            # 记录本次处理的文章及其时间窗口起点，供下次抓取判断能否提前停止
+            window_start = start_date.isoformat() if start_date else None
+            new_ids = {news_item['id']: window_start for news_item in feed_news}
+            latest = max(feed_news, key=lambda news_item: news_item['published'])
+            self.feed_state.stage(
+                rss_url,
+                last_entry_id=latest['raw_data']['entry_id'],
+                last_published=latest['published'].isoformat(),
+                recent_ids=FeedStateStore.merge_recent_ids(new_ids, known_ids),
+            )
+        
+        return feed_news, newest_published
     
-    def _parse_published_time(self, entry) -> Optional[datetime]:
+    def _record_stat(self, key: str, value: int = 1) -> None:
+        """累加本次抓取的统计数据（线程安全）
+        
+        Args:
+            key: str 统计项名称
+            value: int 增加的数值
+        """
+        with self._stats_lock:
+            self.fetch_stats[key] = self.fetch_stats.get(key, 0) + value
+    
+    def commit_state(self) -> None:
+        """新闻保存成功后，提交本次抓取的RSS源状态"""
+        if self.feed_state:
+            updated = self.feed_state.commit()
+            if updated:
+                print(f"已更新 {updated} 个RSS源的抓取状态")
+    
+    def _parse_published_time(self, entry, feed_key: Optional[str] = None) -> Optional[datetime]:
         """解析RSS条目的发布时间
         
+        同一个RSS源通常使用固定的时间格式。传入feed_key时会记住该源上次解析成功的格式，
+        下次优先尝试，避免每篇文章都依次尝试多个格式并触发异常。
+        
         Args:
             entry: RSS条目
+            feed_key: Optional[str] RSS源标识（如RSS地址），用于缓存该源的时间格式
         
         Returns:
             Optional[datetime] 解析后的时间，失败返回None
@@ -239,29 +565,25 @@ class RSSSource(NewsSource):
             # 尝试不同的时间格式
             published_str = entry.published
             
-            # 常见的RSS时间格式
-            time_formats = [
-                '%a, %d %b %Y %H:%M:%S %z',  # RFC 2822
-                '%a, %d %b %Y %H:%M:%S %Z',  # RFC 2822 with timezone name
-                '%Y-%m-%dT%H:%M:%S%z',       # ISO 8601
-                '%Y-%m-%dT%H:%M:%SZ',        # ISO 8601 UTC
-                '%Y-%m-%d %H:%M:%S',         # Simple format
-            ]
+            # 优先使用该RSS源上次成功的格式，其余格式保持原有顺序
+            time_formats = self._date_formats.get(feed_key, TIME_FORMATS) if feed_key else TIME_FORMATS
             
             for fmt in time_formats:
                 try:
                     parsed_time = datetime.strptime(published_str, fmt)
-                    # 如果没有时区信息，假设为UTC
-                    if parsed_time.tzinfo is None:
-                        from datetime import timezone
-                        parsed_time = parsed_time.replace(tzinfo=timezone.utc)
-                    return parsed_time
                 except ValueError:
                     continue
+                
+                if feed_key and time_formats[0] != fmt:
+                    self._date_formats[feed_key] = (fmt,) + tuple(f for f in TIME_FORMATS if f != fmt)
+                
+                # 如果没有时区信息，假设为UTC
+                if parsed_time.tzinfo is None:
+                    parsed_time = parsed_time.replace(tzinfo=timezone.utc)
+                return parsed_time
             
             # 如果所有格式都失败，尝试使用feedparser的解析
             if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                from datetime import timezone
                 time_tuple = entry.published_parsed
                 # 将time_struct转换为datetime
                 dt = datetime(*time_tuple[:6])
@@ -270,4 +592,4 @@ class RSSSource(NewsSource):
         except Exception as e:
             print(f"解析时间失败: {published_str} - {str(e)}")
             
-        return None 
\ No newline at end of file
+        return None 
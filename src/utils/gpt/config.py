@@ -8,6 +8,9 @@ class GPTConfig:
         # 基础配置
         self.API_KEY: str = os.getenv('GPT_API_KEY', '')
         self.BASE_URL: str = os.getenv('GPT_BASE_URL', 'https://api.openai.com/v1')
+        self.MODEL: str = os.getenv('GPT_MODEL', 'gpt-4o')
+        # 是否输出客户端初始化的调试信息（代理、Base URL），不会输出API Key
+        self.DEBUG: bool = os.getenv('GPT_DEBUG', '0') == '1'
         
         # 项目特定配置 - 音乐行业新闻摘要专用
         self.SYSTEM_RULES: List[str] = [
@@ -20,6 +23,37 @@ class GPTConfig:
             "作品名称使用完整书名号《》，确保不截断",
         ]
         self.MAX_CHARS: int = 25
+        
+        # 总结失败重试配置：最多尝试次数，首次重试等待秒数（之后每次翻倍）
+        self.SUMMARY_MAX_ATTEMPTS: int = int(os.getenv('GPT_SUMMARY_MAX_ATTEMPTS', '5'))
+        self.SUMMARY_RETRY_BASE: int = int(os.getenv('GPT_SUMMARY_RETRY_BASE', '300'))
+        
+        # 并发配置：同时进行的总结请求数量，1表示串行总结
+        self.MAX_IN_FLIGHT: int = int(os.getenv('GPT_MAX_IN_FLIGHT', '4'))
+        
+        # 批量总结配置：每次请求最多包含的新闻数量（1表示逐条请求），
+        # 以及每次请求中新闻部分估计token数的上限
+        self.BATCH_SIZE: int = int(os.getenv('GPT_BATCH_SIZE', '10'))
+        self.BATCH_TOKEN_BUDGET: int = int(os.getenv('GPT_BATCH_TOKEN_BUDGET', '2000'))
+        
+        # 限流配置：每分钟请求数和token数上限（0表示不限制），会同时参考服务端返回的限流响应头
+        self.RPM: float = float(os.getenv('GPT_RPM', '60'))
+        self.TPM: float = float(os.getenv('GPT_TPM', '0'))
+        # 临时错误（限流、超时、连接错误、5xx）的重试次数和指数退避参数（秒）
+        self.MAX_RETRIES: int = int(os.getenv('GPT_MAX_RETRIES', '5'))
+        self.RETRY_BACKOFF_BASE: float = float(os.getenv('GPT_RETRY_BACKOFF_BASE', '1'))
+        self.RETRY_BACKOFF_MAX: float = float(os.getenv('GPT_RETRY_BACKOFF_MAX', '60'))
+        # 服务端Retry-After要求的等待时间上限（秒），避免异常的响应头让所有请求长时间暂停
+        self.RETRY_AFTER_MAX: float = float(os.getenv('GPT_RETRY_AFTER_MAX', '300'))
+        
+        # 每百万token的价格（输入/输出），用于llm-stats估算费用
+        self.PROMPT_PRICE: float = float(os.getenv('GPT_PROMPT_PRICE', '0'))
+        self.COMPLETION_PRICE: float = float(os.getenv('GPT_COMPLETION_PRICE', '0'))
+        
+        # 总结缓存配置：是否启用，条目未被使用的最长保留天数，最多保留的条目数
+        self.SUMMARY_CACHE: bool = os.getenv('GPT_SUMMARY_CACHE', '1') == '1'
+        self.SUMMARY_CACHE_TTL_DAYS: int = int(os.getenv('GPT_SUMMARY_CACHE_TTL_DAYS', '90'))
+        self.SUMMARY_CACHE_MAX_ENTRIES: int = int(os.getenv('GPT_SUMMARY_CACHE_MAX_ENTRIES', '50000'))
     
     def validate(self) -> bool:
         """验证配置是否完整"""
@@ -27,8 +61,22 @@ class GPTConfig:
             raise ValueError("请设置GPT_API_KEY环境变量")
         if not self.BASE_URL:
             raise ValueError("请设置GPT_BASE_URL环境变量")
+        if not self.MODEL:
+            raise ValueError("请设置GPT_MODEL环境变量")
         if not self.SYSTEM_RULES:
             raise ValueError("请设置SYSTEM_RULES")
         if not self.MAX_CHARS:
             raise ValueError("请设置MAX_CHARS")
+        if self.MAX_IN_FLIGHT < 1:
+            raise ValueError("GPT_MAX_IN_FLIGHT必须大于等于1")
+        if self.RPM < 0 or self.TPM < 0:
+            raise ValueError("GPT_RPM和GPT_TPM不能小于0")
+        if self.MAX_RETRIES < 0:
+            raise ValueError("GPT_MAX_RETRIES不能小于0")
+        if self.RETRY_AFTER_MAX < 0:
+            raise ValueError("GPT_RETRY_AFTER_MAX不能小于0")
+        if self.BATCH_SIZE < 1:
+            raise ValueError("GPT_BATCH_SIZE必须大于等于1")
+        if self.BATCH_TOKEN_BUDGET <= 0:
+            raise ValueError("GPT_BATCH_TOKEN_BUDGET必须大于0")
         return True 
\ No newline at end of file
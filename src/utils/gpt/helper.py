@@ -1,7 +1,27 @@
-from openai import OpenAI
+from openai import OpenAI, APIConnectionError, APIStatusError
+from collections import Counter
 from typing import Dict, List, Optional
 from .config import GPTConfig
+from .metrics import LLMMetrics
+from .rate_limit import APIRateLimiter, backoff_delay, get_retry_after
+import json
 import os
+import time
+
+# 批量总结时追加到系统提示词的输出格式要求
+BATCH_RULES = [
+    "输入是JSON数组，每项包含key、标题和可选的副标题，请对每一项分别按上述要求生成摘要",
+    "只输出一个JSON对象，键为输入中的key，值为对应的摘要字符串，不要输出任何其他内容",
+]
+
+# 批量请求中每条新闻的JSON结构开销（token）
+BATCH_ITEM_OVERHEAD_TOKENS = 20
+
+# 可以重试的HTTP状态码（5xx另外判断）
+RETRYABLE_STATUS_CODES = (408, 409, 429)
+
+# 调用方未提供来源时，调用指标中使用的来源名称
+UNKNOWN_SOURCE = '未知来源'
 
 class GPTHelper:
     def __init__(self, config: Optional[GPTConfig] = None):
@@ -12,50 +32,59 @@ class GPTHelper:
         """
         self.config = config or GPTConfig()
         
-        # 检查环境变量，看是否有代理相关配置
-        print(f"[DEBUG] HTTP_PROXY: {os.getenv('HTTP_PROXY', 'None')}")
-        print(f"[DEBUG] HTTPS_PROXY: {os.getenv('HTTPS_PROXY', 'None')}")
-        print(f"[DEBUG] http_proxy: {os.getenv('http_proxy', 'None')}")
-        print(f"[DEBUG] https_proxy: {os.getenv('https_proxy', 'None')}")
-        
-        # 显示实际使用的配置（不完整显示敏感信息）
-        api_key_display = f"{self.config.API_KEY[:8]}...{self.config.API_KEY[-4:]}" if self.config.API_KEY else "None"
-        print(f"[DEBUG] 使用的API Key: {api_key_display}")
-        print(f"[DEBUG] 使用的Base URL: {self.config.BASE_URL}")
+        if self.config.DEBUG:
+            # 检查环境变量，看是否有代理相关配置
+            for name in ('HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy'):
+                self._debug(f"{name}: {os.getenv(name, 'None')}")
+            self._debug(f"API Key: {'已设置' if self.config.API_KEY else '未设置'}")
+            self._debug(f"使用的Base URL: {self.config.BASE_URL}")
         
         # 尝试使用base_url的初始化方式
         try:
             # 直接使用api_key和base_url参数
+            # 重试由_create_completion统一处理（需要读取限流响应头），关闭SDK自带的重试
             self.client = OpenAI(
                 api_key=self.config.API_KEY,
-                base_url=self.config.BASE_URL
+                base_url=self.config.BASE_URL,
+                max_retries=0
             )
-            print(f"[DEBUG] 成功使用api_key和base_url初始化OpenAI客户端")
+            self._debug("成功使用api_key和base_url初始化OpenAI客户端")
         except Exception as e:
-            print(f"[DEBUG] 使用api_key和base_url初始化失败: {e}")
+            self._debug(f"使用api_key和base_url初始化失败: {e}")
             try:
                 # 方法2: 使用字典方式传参
                 self.client = OpenAI(**{
                     'api_key': self.config.API_KEY,
-                    'base_url': self.config.BASE_URL
+                    'base_url': self.config.BASE_URL,
+                    'max_retries': 0
                 })
-                print(f"[DEBUG] 成功使用字典参数初始化OpenAI客户端")
+                self._debug("成功使用字典参数初始化OpenAI客户端")
             except Exception as e2:
-                print(f"[DEBUG] 字典参数初始化也失败: {e2}")
+                self._debug(f"字典参数初始化也失败: {e2}")
                 # 方法3: 只使用api_key（不推荐，会调用官方API）
                 try:
-                    self.client = OpenAI(api_key=self.config.API_KEY)
-                    print(f"[DEBUG] 警告：只使用api_key初始化，将调用OpenAI官方API")
+                    self.client = OpenAI(api_key=self.config.API_KEY, max_retries=0)
+                    print("警告：只使用api_key初始化OpenAI客户端，将调用OpenAI官方API")
                 except Exception as e3:
-                    print(f"[DEBUG] 所有初始化方法都失败: {e3}")
+                    print(f"初始化OpenAI客户端失败: {e3}")
                     raise e3
+        
+        self.rate_limiter = APIRateLimiter(self.config.RPM, self.config.TPM)
+        # 每次API调用的token、延迟、重试、截断和错误类型
+        self.metrics = LLMMetrics()
+    
+    def _debug(self, message: str) -> None:
+        """GPT_DEBUG=1时输出调试信息"""
+        if self.config.DEBUG:
+            print(f"[DEBUG] {message}")
     
     def summarize_text(
         self, 
         title: str,
         subtitle: str = "",
         system_rules: Optional[List[str]] = None,
-        max_chars: Optional[int] = None
+        max_chars: Optional[int] = None,
+        source: Optional[str] = None
     ) -> str:
         """文本总结方法
         
@@ -64,68 +93,251 @@ class GPTHelper:
             subtitle: 新闻副标题（可选）
             system_rules: 自定义规则列表，如果为None则使用配置中的规则
             max_chars: 自定义字符限制，如果为None则使用配置中的限制
+            source: 新闻来源名称，用于调用指标按来源统计
         
         Returns:
             str: 总结后的文本
+        
+        Raises:
+            Exception: 重试后请求仍然失败，或API返回空内容
         """
-        try:
-            rules = system_rules or self.config.SYSTEM_RULES
-            chars_limit = max_chars or self.config.MAX_CHARS
-            
-            # 构建系统提示词
-            system_prompt = "\n".join(rules)
-            
-            # 构建用户输入，包含标题和副标题
-            user_input = f"标题：{title}"
-            if subtitle and subtitle.strip():
-                user_input += f"\n副标题：{subtitle}"
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
+        rules = system_rules or self.config.SYSTEM_RULES
+        chars_limit = max_chars or self.config.MAX_CHARS
+        
+        # 构建系统提示词
+        system_prompt = "\n".join(rules)
+        
+        # 构建用户输入，包含标题和副标题
+        user_input = f"标题：{title}"
+        if subtitle and subtitle.strip():
+            user_input += f"\n副标题：{subtitle}"
+        
+        with self.metrics.track('summarize', self.config.MODEL, system_prompt, {source or UNKNOWN_SOURCE: 1}) as call:
+            response = self._create_completion(
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_input}
-                ]
+                ],
+                max_output_tokens=chars_limit * 2,
+                call=call
             )
             
             if not response.choices or len(response.choices) == 0:
-                return "总结失败: API未返回任何选择"
+                raise ValueError("API未返回任何选择")
             
             result = response.choices[0].message.content
             
-            if result is None:
-                return "总结失败: API返回内容为None"
+            if result is None or result.strip() == "":
+                raise ValueError("API返回空内容")
             
-            if result.strip() == "":
-                return "总结失败: API返回空内容"
+            return self._clean_summary(result, chars_limit, call)
+    
+    def estimate_tokens(self, title: str, subtitle: str = "") -> int:
+        """粗略估计单条新闻在批量请求中占用的token数（输入加输出）
+        
+        按每个字符一个token保守估计（中文接近该比例），再加上JSON结构和输出总结的开销。
+        
+        Args:
+            title: 新闻标题
+            subtitle: 新闻副标题（可选）
+        
+        Returns:
+            int: 估计的token数
+        """
+        return len(title) + len(subtitle or "") + self.config.MAX_CHARS * 2 + BATCH_ITEM_OVERHEAD_TOKENS
+    
+    def summarize_batch(
+        self,
+        items: List[Dict[str, str]],
+        system_rules: Optional[List[str]] = None,
+        max_chars: Optional[int] = None
+    ) -> Dict[str, str]:
+        """批量总结：一次请求总结多条新闻，系统提示词只发送一次
+        
+        请求中每条新闻使用序号作为键，要求模型返回以序号为键的JSON对象，再映射回新闻ID。
+        每条结果单独校验，缺失或不合法的条目不会出现在返回值中，由调用方逐条重新总结。
+        
+        Args:
+            items: 新闻列表，每项包含id、title，以及可选的subtitle和source_name
+            system_rules: 自定义规则列表，如果为None则使用配置中的规则
+            max_chars: 自定义字符限制，如果为None则使用配置中的限制
+        
+        Returns:
+            Dict[str, str]: 新闻ID到总结的映射，只包含校验通过的条目
+        
+        Raises:
+            Exception: 请求失败或返回内容不是JSON对象
+        """
+        rules = system_rules or self.config.SYSTEM_RULES
+        chars_limit = max_chars or self.config.MAX_CHARS
+        
+        system_prompt = "\n".join(list(rules) + BATCH_RULES)
+        
+        # 使用序号代替新闻ID，减少token并避免模型改写较长的ID
+        keys: Dict[str, str] = {}
+        entries = []
+        for index, item in enumerate(items, 1):
+            key = str(index)
+            keys[key] = item['id']
+            entry = {"key": key, "标题": item['title']}
+            if item.get('subtitle') and item['subtitle'].strip():
+                entry["副标题"] = item['subtitle']
+            entries.append(entry)
+        
+        sources = Counter(item.get('source_name') or UNKNOWN_SOURCE for item in items)
+        with self.metrics.track('batch', self.config.MODEL, system_prompt, sources) as call:
+            response = self._create_completion(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": json.dumps(entries, ensure_ascii=False)}
+                ],
+                max_output_tokens=len(items) * (chars_limit * 2 + BATCH_ITEM_OVERHEAD_TOKENS),
+                call=call
+            )
             
-            result = result.strip('"').strip("'")
-            result = result.rstrip('。')
+            if not response.choices or not response.choices[0].message.content:
+                raise ValueError("API返回空内容")
             
-            # 后处理：确保单行输出
-            # 移除所有换行符，只保留第一行
-            result = result.split('\n')[0].strip()
+            results = self._parse_batch_response(response.choices[0].message.content)
             
-            # 智能长度控制：只在明显超长时进行截断
-            if len(result) > chars_limit + 10:  # 增加容错空间到10字符
-                # 尝试在合适的位置截断，避免破坏书名号等
-                last_book_end = result.rfind('》')
-                if last_book_end != -1 and last_book_end <= chars_limit + 15:  # 进一步增加容错空间
-                    # 如果最后一个书名号结束在合理范围内，截断到那里
-                    result = result[:last_book_end + 1]
+            summaries = {}
+            for key, news_id in keys.items():
+                result = results.get(key)
+                # 每条结果必须是非空的单个字符串
+                if not isinstance(result, str) or not result.strip():
+                    continue
+                summary = self._clean_summary(result.strip(), chars_limit, call)
+                if summary:
+                    summaries[news_id] = summary
+            return summaries
+    
+    def _parse_batch_response(self, content: str) -> Dict:
+        """解析批量总结返回的JSON对象，兼容被```json代码块包裹的输出
+        
+        Args:
+            content: 模型返回的内容
+        
+        Returns:
+            Dict: 序号到总结的映射
+        
+        Raises:
+            ValueError: 返回内容不是JSON对象
+        """
+        text = content.strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            if text.startswith("json"):
+                text = text[len("json"):]
+        
+        results = json.loads(text)
+        if not isinstance(results, dict):
+            raise ValueError("批量总结返回的不是JSON对象")
+        return results
+    
+    def _create_completion(self, messages: List[Dict[str, str]], max_output_tokens: int = 0,
+                           call: Optional[Dict] = None):
+        """发送对话请求：请求前经过RPM/TPM限流，临时错误按Retry-After或带抖动的指数退避重试
+        
+        使用with_raw_response读取响应头中的限流信息，剩余配额耗尽时暂停后续请求。
+        
+        Args:
+            messages: 对话消息
+            max_output_tokens: 估计的输出token数，用于TPM限流
+            call: 调用指标（LLMMetrics.track），记录重试次数和token数
+        
+        Returns:
+            ChatCompletion: 解析后的响应
+        
+        Raises:
+            Exception: 不可重试的错误，或重试次数用尽
+        """
+        # 按每个字符一个token保守估计输入token数
+        estimated_tokens = sum(len(message.get("content") or "") for message in messages) + max_output_tokens
+        
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(estimated_tokens)
+            try:
+                raw_response = self.client.chat.completions.with_raw_response.create(
+                    model=self.config.MODEL,
+                    messages=messages
+                )
+            except Exception as e:
+                if not self._is_retryable(e) or attempt >= self.config.MAX_RETRIES:
+                    raise
+                attempt += 1
+                if call is not None:
+                    call['retries'] += 1
+                    call['retry_errors'].append(type(e).__name__)
+                
+                headers = e.response.headers if isinstance(e, APIStatusError) else None
+                self.rate_limiter.update_from_headers(headers)
+                retry_after = get_retry_after(headers)
+                if retry_after is not None:
+                    # 服务端指定了等待时间，所有并发请求一起暂停；等待时间不超过GPT_RETRY_AFTER_MAX
+                    delay = min(retry_after, self.config.RETRY_AFTER_MAX)
+                    self.rate_limiter.pause(delay)
                 else:
-                    # 查找倒数第二个书名号
-                    second_last_book_end = result.rfind('》', 0, last_book_end)
-                    if second_last_book_end != -1 and second_last_book_end <= chars_limit + 5:
-                        result = result[:second_last_book_end + 1]
-                    else:
-                        # 最后方案：简单截断到限制长度+5
-                        result = result[:chars_limit + 5]
+                    delay = backoff_delay(attempt, self.config.RETRY_BACKOFF_BASE, self.config.RETRY_BACKOFF_MAX)
+                
+                print(f"GPT请求失败（{type(e).__name__}），{delay:.1f} 秒后第 {attempt} 次重试")
+                time.sleep(delay)
+                continue
             
-            return result
+            self.rate_limiter.update_from_headers(raw_response.headers)
+            response = raw_response.parse()
+            if call is not None:
+                LLMMetrics.record_usage(call, response)
+            return response
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """判断错误是否为可以重试的临时错误（限流、超时、连接错误、5xx）"""
+        if isinstance(error, APIConnectionError):
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+        return False
+    
+    def _clean_summary(self, result: str, chars_limit: int, call: Optional[Dict] = None) -> str:
+        """总结结果后处理：去除引号和句号，只保留第一行，明显超长时截断
+        
+        Args:
+            result: 模型返回的总结
+            chars_limit: 字符限制
+            call: 调用指标，发生截断时累加truncated
+        
+        Returns:
+            str: 处理后的总结
+        """
+        result = result.strip('"').strip("'")
+        result = result.rstrip('。')
+        
+        # 后处理：确保单行输出
+        # 移除所有换行符，只保留第一行
+        result = result.split('\n')[0].strip()
+        
+        # 智能长度控制：只在明显超长时进行截断
+        untruncated_length = len(result)
+        if len(result) > chars_limit + 10:  # 增加容错空间到10字符
+            # 尝试在合适的位置截断，避免破坏书名号等
+            last_book_end = result.rfind('》')
+            if last_book_end != -1 and last_book_end <= chars_limit + 15:  # 进一步增加容错空间
+                # 如果最后一个书名号结束在合理范围内，截断到那里
+                result = result[:last_book_end + 1]
+            else:
+                # 查找倒数第二个书名号
+                second_last_book_end = result.rfind('》', 0, last_book_end)
+                if second_last_book_end != -1 and second_last_book_end <= chars_limit + 5:
+                    result = result[:second_last_book_end + 1]
+                else:
+                    # 最后方案：简单截断到限制长度+5
+                    result = result[:chars_limit + 5]
             
-        except Exception as e:
-            return f"总结失败: {str(e)}"
+            if call is not None and len(result) < untruncated_length:
+                call['truncated'] += 1
+        
+        return result
     
     def chat(
         self,
@@ -145,12 +357,9 @@ class GPTHelper:
             if system_prompt:
                 messages.insert(0, {"role": "system", "content": system_prompt})
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=messages
-            )
-            
-            return response.choices[0].message.content
+            with self.metrics.track('chat', self.config.MODEL, system_prompt or "") as call:
+                response = self._create_completion(messages, call=call)
+                return response.choices[0].message.content
             
         except Exception as e:
             return f"对话失败: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,158 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """计算百分位数（最近秩法）
+
+    Args:
+        values: List[float] 数值列表
+        percent: float 百分位，0-100
+
+    Returns:
+        float 百分位数，列表为空时返回0
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def prompt_hash(system_prompt: str) -> str:
+    """系统提示词的短哈希，用于区分不同版本的提示词
+
+    Args:
+        system_prompt: str 系统提示词
+
+    Returns:
+        str 12位十六进制哈希
+    """
+    return hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:12]
+
+
+class LLMMetrics:
+    """LLM调用指标收集器（线程安全）
+
+    每次API调用（包括其中的重试）记录为一条指标：
+        kind: 调用类型（summarize/batch/chat）
+        model, prompt_hash: 模型和系统提示词哈希
+        sources: 来源名称到新闻条数的映射，用于按来源分摊token
+        prompt_tokens, completion_tokens: response.usage中的token数
+        latency: 包括限流等待和重试在内的总耗时（秒）
+        retries, retry_errors: 重试次数和每次重试前的错误类型
+        truncated: 总结因超长被后处理截断的条数
+        error_class, status_code: 最终失败时的错误类型和HTTP状态码
+    """
+
+    def __init__(self):
+        self._calls: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, kind: str, model: str, system_prompt: str,
+              sources: Optional[Dict[str, int]] = None) -> Iterator[Dict]:
+        """记录一次API调用，退出时写入耗时和错误类型
+
+        Args:
+            kind: str 调用类型
+            model: str 模型名称
+            system_prompt: str 系统提示词
+            sources: Optional[Dict[str, int]] 来源名称到新闻条数的映射
+
+        Yields:
+            Dict 本次调用的指标，调用过程中补充token数、重试次数等
+        """
+        sources = {name: count for name, count in (sources or {}).items() if count}
+        call = {
+            'created_at': int(time.time()),
+            'kind': kind,
+            'model': model,
+            'prompt_hash': prompt_hash(system_prompt),
+            'sources': sources,
+            'items': sum(sources.values()) or 1,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'latency': 0.0,
+            'retries': 0,
+            'retry_errors': [],
+            'truncated': 0,
+            'error_class': None,
+            'status_code': None,
+        }
+        started = time.monotonic()
+        try:
+            yield call
+        except Exception as e:
+            call['error_class'] = type(e).__name__
+            call['status_code'] = getattr(e, 'status_code', None)
+            raise
+        finally:
+            call['latency'] = time.monotonic() - started
+            with self._lock:
+                self._calls.append(call)
+
+    @staticmethod
+    def record_usage(call: Dict, response) -> None:
+        """从响应的usage中读取token数
+
+        Args:
+            call: Dict 调用指标
+            response: ChatCompletion API响应
+        """
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return
+        call['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+        call['completion_tokens'] += getattr(usage, 'completion_tokens', 0) or 0
+
+    def get_calls(self) -> List[Dict]:
+        """获取已记录的调用指标
+
+        Returns:
+            List[Dict] 调用指标列表（副本）
+        """
+        with self._lock:
+            return list(self._calls)
+
+    def reset(self) -> None:
+        """清空已记录的调用指标"""
+        with self._lock:
+            self._calls = []
+
+    def summary(self) -> Dict:
+        """汇总已记录的调用指标
+
+        Returns:
+            Dict 调用次数、失败次数、重试次数、token数、截断条数、延迟p50/p95、
+                错误类型分布以及按来源分摊的token数
+        """
+        calls = self.get_calls()
+        latencies = [call['latency'] for call in calls]
+
+        by_source: Dict[str, Dict[str, float]] = {}
+        for call in calls:
+            for source_name, count in call['sources'].items():
+                share = count / call['items']
+                stats = by_source.setdefault(source_name, {'items': 0, 'prompt_tokens': 0.0, 'completion_tokens': 0.0})
+                stats['items'] += count
+                stats['prompt_tokens'] += call['prompt_tokens'] * share
+                stats['completion_tokens'] += call['completion_tokens'] * share
+
+        return {
+            'calls': len(calls),
+            'failed': sum(1 for call in calls if call['error_class']),
+            'retries': sum(call['retries'] for call in calls),
+            'prompt_tokens': sum(call['prompt_tokens'] for call in calls),
+            'completion_tokens': sum(call['completion_tokens'] for call in calls),
+            'truncated': sum(call['truncated'] for call in calls),
+            'p50_latency': percentile(latencies, 50),
+            'p95_latency': percentile(latencies, 95),
+            'errors': dict(Counter(call['error_class'] for call in calls if call['error_class'])),
+            'retry_errors': dict(Counter(error for call in calls for error in call['retry_errors'])),
+            'by_source': by_source,
+        }
@@ -0,0 +1,167 @@
+import math
+import random
+import re
+import threading
+import time
+from typing import Mapping, Optional
+from utils.rate_limiter import TokenBucket
+
+# 令牌桶允许的突发量，按多少秒的配额计算
+BURST_SECONDS = 10
+
+# 限流响应头中的时长格式，如 "1s"、"6m0s"、"200ms"、"1h2m3.5s"
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+DURATION_UNITS = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """解析限流响应头中的时长
+
+    Args:
+        value: Optional[str] 纯数字（秒）或 "6m0s" 形式的时长
+
+    Returns:
+        Optional[float] 秒数，无法解析或不是有限的非负数时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return _valid_seconds(float(value))
+    except ValueError:
+        pass
+
+    parts = DURATION_PATTERN.findall(value)
+    if not parts or ''.join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _valid_seconds(seconds: float) -> Optional[float]:
+    """只接受有限的非负秒数，负数、nan、inf等不可信的响应头取值返回None"""
+    if math.isfinite(seconds) and seconds >= 0:
+        return seconds
+    return None
+
+
+def get_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """读取响应头中要求的重试等待时间（retry-after-ms 或 retry-after）
+
+    Args:
+        headers: Optional[Mapping[str, str]] 响应头
+
+    Returns:
+        Optional[float] 等待秒数，未提供或取值不合法（负数、nan等）时返回None
+    """
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            seconds = _valid_seconds(float(retry_after_ms) / 1000)
+        except ValueError:
+            seconds = None
+        if seconds is not None:
+            return seconds
+
+    # Retry-After也可能是HTTP日期格式，此时忽略，使用退避时间
+    return parse_duration(headers.get('retry-after'))
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """带随机抖动的指数退避时间（full jitter）
+
+    Args:
+        attempt: int 第几次重试，从1开始
+        base: float 首次重试的基准等待秒数
+        cap: float 等待秒数上限
+
+    Returns:
+        float 等待秒数，在 [0, min(cap, base * 2^(attempt-1))] 内均匀分布
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class APIRateLimiter:
+    """API客户端限流器，同时限制每分钟请求数（RPM）和每分钟token数（TPM）
+
+    两个维度各使用一个令牌桶；请求前按估计的token数获取令牌。
+    响应头中某个维度的剩余配额为0时暂停对应的令牌桶；Retry-After会暂停所有请求，并发请求一起退避。
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        """初始化限流器
+
+        Args:
+            requests_per_minute: float 每分钟请求数上限，0表示不限制
+            tokens_per_minute: float 每分钟token数上限，0表示不限制
+        """
+        self.requests = self._create_bucket(requests_per_minute)
+        self.tokens = self._create_bucket(tokens_per_minute)
+        # 服务端要求暂停时，所有请求都要等到该时间（time.monotonic()）之后
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def _create_bucket(self, per_minute: float) -> Optional[TokenBucket]:
+        """按每分钟配额创建令牌桶，突发量为BURST_SECONDS秒的配额"""
+        if per_minute <= 0:
+            return None
+        rate = per_minute / 60
+        return TokenBucket(rate, max(1.0, rate * BURST_SECONDS))
+
+    def acquire(self, estimated_tokens: int = 0) -> float:
+        """发送请求前获取配额，不足时阻塞等待
+
+        Args:
+            estimated_tokens: int 本次请求估计消耗的token数
+
+        Returns:
+            float 实际等待的秒数
+        """
+        with self._lock:
+            waited = max(0.0, self._resume_at - time.monotonic())
+        if waited > 0:
+            time.sleep(waited)
+
+        if self.requests:
+            waited += self.requests.acquire()
+        if self.tokens and estimated_tokens > 0:
+            # 单次请求超过桶容量时按容量获取，避免永远无法满足
+            waited += self.tokens.acquire(min(estimated_tokens, self.tokens.burst))
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """暂停所有请求，已经处于更长暂停中时不会缩短暂停时间
+
+        Args:
+            seconds: float 暂停的秒数
+        """
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """根据响应头中的剩余配额调整限流，剩余配额为0时暂停到配额重置
+
+        Args:
+            headers: Optional[Mapping[str, str]] 响应头（x-ratelimit-remaining-*/x-ratelimit-reset-*）
+        """
+        if not headers:
+            return
+
+        for kind, bucket in (('requests', self.requests), ('tokens', self.tokens)):
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            reset = parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+            if remaining is None or reset is None:
+                continue
+            try:
+                exhausted = float(remaining) <= 0
+            except ValueError:
+                continue
+
+            if exhausted:
+                # 未配置该维度的本地限流时暂停所有请求
+                if bucket:
+                    bucket.pause(reset)
+                else:
+                    self.pause(reset)
@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Dict, Optional
+
+class TokenBucket:
+    """令牌桶限流器（线程安全）"""
+
+    def __init__(self, rate: float, burst: float):
+        """初始化令牌桶
+
+        Args:
+            rate: float 每秒补充的令牌数
+            burst: float 桶容量，即允许的最大突发量
+        """
+        if rate <= 0:
+            raise ValueError("rate必须大于0")
+        if burst <= 0:
+            raise ValueError("burst必须大于0")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """按流逝的时间补充令牌"""
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """获取令牌，令牌不足时阻塞等待
+
+        令牌在锁内预先扣除（允许为负），等待在锁外进行，
+        因此并发调用会按到达顺序依次排队，而不会互相阻塞锁。
+
+        Args:
+            amount: float 需要的令牌数
+
+        Returns:
+            float 实际等待的秒数
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """暂停发放令牌，之后的acquire至少等待seconds秒
+        
+        用于服务端返回限流信息（如Retry-After）时让所有调用方一起退避；
+        已经处于更长暂停中时不会缩短暂停时间。
+        
+        Args:
+            seconds: float 暂停的秒数
+        """
+        if seconds <= 0:
+            return
+        
+        with self._lock:
+            self._refill(time.monotonic())
+            # 令牌数调整为：获取一个令牌恰好需要等待seconds秒
+            self._tokens = min(self._tokens, 1.0 - seconds * self.rate)
+
+
+class HostRateLimiter:
+    """按主机划分的令牌桶限流器，不同主机之间互不影响"""
+
+    def __init__(self, default_rate: float, default_burst: float):
+        """初始化限流器
+
+        Args:
+            default_rate: float 默认每秒请求数
+            default_burst: float 默认突发请求数
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host: str, rate: Optional[float] = None, burst: Optional[float] = None) -> None:
+        """为主机设置限流参数，同一主机多次设置时取最严格的值
+
+        Args:
+            host: str 主机名
+            rate: Optional[float] 每秒请求数，None则使用默认值
+            burst: Optional[float] 突发请求数，None则使用默认值
+        """
+        rate = rate or self.default_rate
+        burst = burst or self.default_burst
+
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket:
+                rate = min(rate, bucket.rate)
+                burst = min(burst, bucket.burst)
+            self._buckets[host] = TokenBucket(rate, burst)
+
+    def acquire(self, host: str) -> float:
+        """获取主机的请求令牌
+
+        Args:
+            host: str 主机名
+
+        Returns:
+            float 实际等待的秒数
+        """
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.default_rate, self.default_burst)
+                self._buckets[host] = bucket
+
+        return bucket.acquire()
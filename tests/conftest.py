@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 与运行 src/main.py 时一致，以src为导入根目录
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
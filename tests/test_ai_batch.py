@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError, RateLimitError
+
+from services.ai import AISummarizer
+from utils.gpt.metrics import LLMMetrics
+
+REQUEST = httpx.Request('POST', 'https://api.example.com/v1/chat/completions')
+
+
+class FakeGPT:
+    def __init__(self, batch_error):
+        self.batch_error = batch_error
+        self.single_calls = []
+
+    def summarize_batch(self, items):
+        raise self.batch_error
+
+    def summarize_text(self, title, subtitle='', source=None):
+        self.single_calls.append(title)
+        return f'{title}的总结'
+
+
+def make_summarizer(batch_error):
+    summarizer = AISummarizer.__new__(AISummarizer)
+    summarizer.gpt = FakeGPT(batch_error)
+    return summarizer
+
+
+def make_batch():
+    return [{'id': f'news-{i}', 'title': f'标题{i}', 'subtitle': ''} for i in range(3)]
+
+
+@pytest.mark.parametrize('error', [
+    RateLimitError('rate limited', response=httpx.Response(429, request=REQUEST), body=None),
+    APIConnectionError(request=REQUEST),
+])
+def test_request_failures_mark_the_whole_batch_failed(error):
+    summarizer = make_summarizer(error)
+    batch = make_batch()
+
+    latencies = summarizer._summarize_batch(batch)
+
+    assert len(latencies) == 1
+    assert summarizer.gpt.single_calls == []
+    assert all(news['summary'] == '' and news['summary_error'] for news in batch)
+
+
+@pytest.mark.parametrize('error', [
+    ValueError('API返回空内容'),
+    json.JSONDecodeError('Expecting value', 'not json', 0),
+])
+def test_unparseable_batch_falls_back_to_single_requests(error):
+    summarizer = make_summarizer(error)
+    batch = make_batch()
+
+    summarizer._summarize_batch(batch)
+
+    assert summarizer.gpt.single_calls == ['标题0', '标题1', '标题2']
+    assert [news['summary'] for news in batch] == ['标题0的总结', '标题1的总结', '标题2的总结']
+    assert not any('summary_error' in news for news in batch)
+
+
+# 每批请求的模拟耗时（秒），前面的批次更慢，完成顺序与提交顺序不同
+BATCH_DELAYS = [0.20, 0.05, 0.15, 0.01, 0.10]
+
+
+class SlowBatchGPT:
+    def __init__(self):
+        self.config = SimpleNamespace(MODEL='test-model', SYSTEM_RULES=['规则'], MAX_CHARS=25,
+                                      BATCH_SIZE=2, BATCH_TOKEN_BUDGET=10000)
+        self.metrics = LLMMetrics()
+        self.completed = []
+        self._lock = threading.Lock()
+
+    def estimate_tokens(self, title, subtitle=''):
+        return len(title)
+
+    def summarize_batch(self, items):
+        batch_index = int(items[0]['id'].split('-')[1]) // 2
+        time.sleep(BATCH_DELAYS[batch_index])
+        with self._lock:
+            self.completed.append(batch_index)
+        return {item['id']: f"{item['title']}的总结" for item in items}
+
+    def summarize_text(self, title, subtitle='', source=None):
+        time.sleep(BATCH_DELAYS[-1])
+        with self._lock:
+            self.completed.append(len(BATCH_DELAYS) - 1)
+        return f'{title}的总结'
+
+
+def test_thread_pool_writes_results_back_in_original_order(capsys):
+    summarizer = AISummarizer.__new__(AISummarizer)
+    summarizer.gpt = SlowBatchGPT()
+    summarizer.cache = None
+    summarizer.max_in_flight = 4
+    summarizer.last_run_stats = {}
+    # 9条新闻分为5批，最后一批只有1条（逐条请求）
+    news_list = [{'id': f'news-{i}', 'title': f'标题{i}', 'subtitle': ''} for i in range(9)]
+
+    result = summarizer.summarize_news(news_list)
+
+    assert result is news_list
+    assert [news['id'] for news in result] == [f'news-{i}' for i in range(9)]
+    assert [news['summary'] for news in result] == [f'标题{i}的总结' for i in range(9)]
+    # 请求乱序完成
+    assert summarizer.gpt.completed != sorted(summarizer.gpt.completed)
+    assert summarizer.gpt.completed[0] == 3
+
+    # 进度按原顺序输出
+    output = capsys.readouterr().out
+    assert '最大并发数: 4' in output
+    positions = [output.index(f'原标题: 标题{i}\n') for i in range(9)]
+    assert positions == sorted(positions)
+
+    stats = summarizer.last_run_stats
+    assert stats['total'] == 9 and stats['failed'] == 0 and stats['requests'] == 5
+    # 最近秩法：5次请求的p50为第3小的耗时，p95为最大耗时
+    assert stats['p50_latency'] == pytest.approx(0.10, abs=0.04)
+    assert stats['p95_latency'] == pytest.approx(0.20, abs=0.04)
+    # 并发执行，总耗时明显小于各批耗时之和
+    assert stats['elapsed'] < sum(BATCH_DELAYS) - 0.1
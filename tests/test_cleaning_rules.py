@@ -0,0 +1,50 @@
+import json
+import os
+
+from sources.cleaning_rules import BoilerplateRules
+from sources.config import DEFAULT_CLEANING_RULES_FILE, RSSConfig
+
+
+def write_rules(tmp_path, config):
+    path = tmp_path / 'cleaning_rules.json'
+    path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def test_default_rules_file_does_not_depend_on_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('RSS_CLEANING_RULES', raising=False)
+    assert RSSConfig().CLEANING_RULES_FILE == DEFAULT_CLEANING_RULES_FILE
+    assert os.path.exists(DEFAULT_CLEANING_RULES_FILE)
+
+
+def test_missing_rules_file_warns_and_uses_builtin_rules(tmp_path, capsys):
+    rules = BoilerplateRules(str(tmp_path / 'missing.json'))
+    assert '清理规则文件不存在' in capsys.readouterr().out
+    assert rules.apply('正文阅读原文 更多') == '正文'
+
+
+def test_rules_are_applied_in_one_pass(tmp_path):
+    rules = BoilerplateRules(write_rules(tmp_path, {
+        'global': [{'name': '阅读原文', 'pattern': '阅读原文.*'}, {'name': '广告', 'pattern': '【广告】'}],
+        'sources': {'来源A': [{'name': '购票', 'pattern': '点击购票'}]},
+    }))
+    assert rules.apply('【广告】正文点击购票阅读原文 尾部', '来源A') == '正文'
+    assert rules.apply('正文点击购票') == '正文点击购票'
+    assert rules.get_hit_counts() == {'阅读原文': 1, '广告': 1, '购票': 1}
+
+
+def test_backreferences_and_named_groups_keep_their_meaning(tmp_path):
+    rules = BoilerplateRules(write_rules(tmp_path, {
+        'global': [
+            {'name': '阅读原文', 'pattern': '阅读原文.*'},
+            {'name': '重复词', 'pattern': r'(\w)\1{2,}'},
+            {'name': '引号', 'pattern': r'(?P<q>["\'])广告(?P=q)'},
+            {'name': '同名分组', 'pattern': r'(?P<q>【)推广】'},
+            {'name': '忽略大小写', 'pattern': '(?i)ad:'},
+        ],
+        'sources': {},
+    }))
+    assert rules.apply('正文aaaa结束"广告"【推广】AD:阅读原文') == '正文结束'
+    assert rules.apply("正文ab'广告\"") == "正文ab'广告\""
+    assert rules.get_hit_counts() == {'阅读原文': 1, '重复词': 1, '引号': 1, '同名分组': 1, '忽略大小写': 1}
@@ -0,0 +1,50 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from services.database import NewsDatabase, connect_database
+from services.feed_state import FeedStateStore
+from services.llm_metrics import LLMMetricsStore
+from services.summary_cache import SummaryCache
+
+
+@pytest.fixture
+def db_path(tmp_path, capsys):
+    path = str(tmp_path / 'news.db')
+    NewsDatabase(path).save_news_batch([{
+        'id': 'news-1',
+        'source_type': 'rss',
+        'source_name': '来源',
+        'published': datetime(2026, 10, 16, 8, 0, 0),
+        'title': '乐队发布新专辑',
+        'content': '正文内容',
+        'link': 'https://example.com/1',
+    }])
+    capsys.readouterr()
+    yield path
+    NewsDatabase.close_all_connections()
+
+
+def test_fts_triggers_need_the_registered_function(db_path):
+    # 未注册news_body_text的连接无法删除新闻（删除触发器需要读取正文）
+    with pytest.raises(sqlite3.OperationalError, match='news_body_text'):
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("DELETE FROM news_items WHERE id = 'news-1'")
+
+    with connect_database(db_path) as conn:
+        conn.execute("DELETE FROM news_items WHERE id = 'news-1'")
+        assert conn.execute("SELECT COUNT(*) FROM news_fts WHERE news_fts MATCH '新专辑'").fetchone()[0] == 0
+
+
+def test_side_stores_share_the_news_database(db_path):
+    FeedStateStore(db_path)
+    SummaryCache(db_path)
+    LLMMetricsStore(db_path)
+
+    with connect_database(db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert {'news_items', 'feed_state', 'summary_cache', 'llm_calls'} <= tables
+        assert conn.execute(
+            "SELECT snippet(news_fts, -1, '[', ']', '…', 8) FROM news_fts WHERE news_fts MATCH '新专辑'"
+        ).fetchone()[0] == '乐队发布[新专辑]'
@@ -0,0 +1,153 @@
+import sqlite3
+
+import pytest
+
+from services import database
+from services.database import SCHEMA_VERSION, NewsDatabase, decode_body
+
+NEWS_COUNT = 20
+
+
+@pytest.fixture(autouse=True)
+def close_connections(capsys):
+    yield
+    NewsDatabase.close_all_connections()
+
+
+def create_oldest_database(path):
+    """创建最早版本结构（source、created_at、fetch_date字段，正文存放在news_items中）的数据库
+
+    Returns:
+        Dict[str, int] 新闻ID到rowid的映射
+    """
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE news_items (
+            id TEXT PRIMARY KEY,
+            source TEXT,
+            source_type TEXT NOT NULL,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            summary TEXT,
+            published DATETIME NOT NULL,
+            link TEXT NOT NULL,
+            fetch_date DATE NOT NULL,
+            created_at DATETIME,
+            raw_data TEXT
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO news_items (rowid, id, source, source_type, title, content, summary, published, link, '
+        'fetch_date, created_at, raw_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [(
+            # rowid不连续，用于验证迁移保留了原来的rowid
+            i * 3 + 1, f'news-{i}', f'来源{i % 3}', 'rss', f'标题{i}', f'正文{i}',
+            '总结失败: 超时' if i == 0 else f'总结{i}',
+            f'2024-01-{i % 28 + 1:02d} 00:00:00', f'https://example.com/{i}',
+            f'2024-01-{i % 28 + 1:02d}', f'2024-01-{i % 28 + 1:02d} 08:00:00', f'{{"i": {i}}}',
+        ) for i in range(NEWS_COUNT)]
+    )
+    conn.commit()
+    ids = dict(conn.execute('SELECT id, rowid FROM news_items'))
+    conn.close()
+    return ids
+
+
+def read_news(path):
+    conn = sqlite3.connect(path)
+    rows = dict(conn.execute('SELECT id, rowid FROM news_items'))
+    bodies = conn.execute('SELECT id, content FROM news_bodies').fetchall()
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    conn.close()
+    return rows, bodies, version
+
+
+def test_oldest_schema_is_migrated_to_latest_version(tmp_path):
+    path = str(tmp_path / 'news.db')
+    ids = create_oldest_database(path)
+
+    db = NewsDatabase(path)
+
+    rows, bodies, version = read_news(path)
+    assert version == SCHEMA_VERSION
+    assert rows == ids
+    assert sorted(news_id for news_id, _ in bodies) == sorted(ids)
+    assert db.get_news_content('news-5') == '正文5'
+
+    news = {item['id']: item for item in db.iter_news()}
+    assert len(news) == NEWS_COUNT
+    assert news['news-4']['source_name'] == '来源1'
+    assert news['news-4']['fetch_timestamp'] == '2024-01-05 08:00:00'
+    assert news['news-4']['published_ts'] is not None
+    assert news['news-4']['summary_status'] == 'done'
+    # 旧版本的失败总结清空后重新进入待总结队列
+    assert news['news-0']['summary'] == '' and news['news-0']['summary_status'] == 'pending'
+    assert db.get_statistics()['total_news'] == NEWS_COUNT
+
+
+def test_interrupted_copy_resumes_from_last_committed_batch(tmp_path, monkeypatch):
+    path = str(tmp_path / 'news.db')
+    ids = create_oldest_database(path)
+    monkeypatch.setattr(database, 'MIGRATION_BATCH_SIZE', 3)
+
+    # 拆分正文时在第3批的第2行失败（每行编码content和raw_data两次），前两批（6行）已经提交
+    encode_body = database.encode_body
+    encoded = []
+
+    def failing_encode_body(text, compress):
+        encoded.append(text)
+        if len(encoded) == 2 * 7 + 1:
+            raise sqlite3.OperationalError('database or disk is full')
+        return encode_body(text, compress)
+
+    monkeypatch.setattr(database, 'encode_body', failing_encode_body)
+    with pytest.raises(sqlite3.OperationalError):
+        NewsDatabase(path)
+    NewsDatabase.close_all_connections()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 2
+    assert conn.execute("SELECT last_rowid, copied FROM migration_progress WHERE step = 'split_bodies'"
+                        ).fetchone() == (sorted(ids.values())[5], 6)
+    assert conn.execute('SELECT COUNT(*) FROM news_bodies').fetchone()[0] == 6
+    conn.close()
+
+    encoded.clear()
+    monkeypatch.setattr(database, 'encode_body',
+                        lambda text, compress: encoded.append(text) or encode_body(text, compress))
+    db = NewsDatabase(path)
+
+    # 继续时只处理尚未提交的行
+    assert len(encoded) == 2 * (NEWS_COUNT - 6)
+    rows, bodies, version = read_news(path)
+    assert version == SCHEMA_VERSION
+    assert rows == ids
+    assert len(bodies) == NEWS_COUNT
+    assert {news_id: decode_body(content) for news_id, content in bodies} == {
+        f'news-{i}': f'正文{i}' for i in range(NEWS_COUNT)
+    }
+    with db.get_connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM migration_progress').fetchone()[0] == 0
+
+
+def test_current_database_skips_schema_probes(tmp_path, monkeypatch):
+    path = str(tmp_path / 'news.db')
+    NewsDatabase(path)
+    NewsDatabase.close_all_connections()
+    NewsDatabase._initialized_paths.clear()
+
+    statements = []
+    connect_database = database.connect_database
+
+    def traced_connect(db_path, **kwargs):
+        conn = connect_database(db_path, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(database, 'connect_database', traced_connect)
+    NewsDatabase(path)
+
+    assert statements
+    assert not [sql for sql in statements if 'table_info' in sql], statements
+    # 结构版本已是最新时不检查表是否存在，也不执行迁移
+    assert not [sql for sql in statements if "name='news_items'" in sql or 'migration_progress' in sql], statements
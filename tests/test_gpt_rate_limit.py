@@ -0,0 +1,244 @@
+import httpx
+import pytest
+from openai import APIConnectionError, APIStatusError, AuthenticationError, BadRequestError, RateLimitError
+
+from utils.gpt import helper as helper_module
+from utils.gpt.config import GPTConfig
+from utils.gpt.helper import GPTHelper
+from utils.gpt.rate_limit import APIRateLimiter, backoff_delay, get_retry_after, parse_duration
+
+REQUEST = httpx.Request('POST', 'https://api.example.com/v1/chat/completions')
+
+
+def status_error(error_class, status_code, headers=None):
+    response = httpx.Response(status_code, request=REQUEST, headers=headers or {})
+    return error_class('error', response=response, body=None)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2', 2.0),
+    (' 0.5 ', 0.5),
+    ('0', 0.0),
+    ('1s', 1.0),
+    ('200ms', 0.2),
+    ('6m0s', 360.0),
+    ('1h2m3.5s', 3723.5),
+])
+def test_parse_duration_accepts_seconds_and_go_durations(value, expected):
+    assert parse_duration(value) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('value', [None, '', '-3', 'nan', 'inf', '-inf', '1e400', '1x', 's', '1s garbage',
+                                   'Wed, 21 Oct 2015 07:28:00 GMT'])
+def test_parse_duration_rejects_invalid_values(value):
+    assert parse_duration(value) is None
+
+
+@pytest.mark.parametrize('headers, expected', [
+    ({'retry-after-ms': '1500'}, 1.5),
+    ({'retry-after': '3'}, 3.0),
+    ({'retry-after-ms': '500', 'retry-after': '3'}, 0.5),
+    # retry-after-ms不合法时使用retry-after
+    ({'retry-after-ms': '-5', 'retry-after': '2'}, 2.0),
+    ({'retry-after-ms': 'nan', 'retry-after': '2'}, 2.0),
+])
+def test_get_retry_after_reads_headers(headers, expected):
+    assert get_retry_after(headers) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('headers', [
+    None,
+    {},
+    {'retry-after': '-3'},
+    {'retry-after-ms': '-5'},
+    {'retry-after': 'nan'},
+    {'retry-after-ms': 'nan'},
+    {'retry-after': 'inf'},
+    {'retry-after': 'Wed, 21 Oct 2015 07:28:00 GMT'},
+])
+def test_get_retry_after_rejects_invalid_headers(headers):
+    assert get_retry_after(headers) is None
+
+
+def test_backoff_delay_grows_exponentially_and_is_capped(monkeypatch):
+    monkeypatch.setattr('utils.gpt.rate_limit.random.uniform', lambda low, high: high)
+
+    assert [backoff_delay(attempt, 1, 10) for attempt in range(1, 6)] == [1, 2, 4, 8, 10]
+
+
+def test_backoff_delay_is_jittered_within_bounds():
+    delays = [backoff_delay(3, 1, 60) for _ in range(200)]
+
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+class FakeBucket:
+    burst = 10
+
+    def __init__(self):
+        self.paused = []
+
+    def pause(self, seconds):
+        self.paused.append(seconds)
+
+
+def make_limiter(with_buckets):
+    limiter = APIRateLimiter()
+    limiter.paused = []
+    limiter.pause = limiter.paused.append
+    if with_buckets:
+        limiter.requests = FakeBucket()
+        limiter.tokens = FakeBucket()
+    return limiter
+
+
+def test_update_from_headers_pauses_exhausted_bucket():
+    limiter = make_limiter(with_buckets=True)
+
+    limiter.update_from_headers({
+        'x-ratelimit-remaining-requests': '5',
+        'x-ratelimit-reset-requests': '1s',
+        'x-ratelimit-remaining-tokens': '0',
+        'x-ratelimit-reset-tokens': '6m0s',
+    })
+
+    assert limiter.requests.paused == []
+    assert limiter.tokens.paused == [360.0]
+    assert limiter.paused == []
+
+
+def test_update_from_headers_pauses_everything_without_local_bucket():
+    limiter = make_limiter(with_buckets=False)
+
+    limiter.update_from_headers({'x-ratelimit-remaining-requests': '0', 'x-ratelimit-reset-requests': '200ms'})
+
+    assert limiter.paused == [pytest.approx(0.2)]
+
+
+@pytest.mark.parametrize('headers', [
+    None,
+    {'x-ratelimit-remaining-requests': '0'},
+    {'x-ratelimit-remaining-requests': '0', 'x-ratelimit-reset-requests': '-1'},
+    {'x-ratelimit-remaining-requests': '0', 'x-ratelimit-reset-requests': 'nan'},
+    {'x-ratelimit-remaining-requests': 'many', 'x-ratelimit-reset-requests': '1s'},
+])
+def test_update_from_headers_ignores_incomplete_or_invalid_headers(headers):
+    limiter = make_limiter(with_buckets=True)
+
+    limiter.update_from_headers(headers)
+
+    assert limiter.requests.paused == []
+    assert limiter.paused == []
+
+
+def test_pause_never_shortens_an_existing_pause():
+    limiter = APIRateLimiter()
+
+    limiter.pause(30)
+    resume_at = limiter._resume_at
+    limiter.pause(1)
+
+    assert limiter._resume_at == resume_at
+
+
+@pytest.mark.parametrize('error', [
+    APIConnectionError(request=REQUEST),
+    status_error(RateLimitError, 429),
+    status_error(APIStatusError, 408),
+    status_error(APIStatusError, 409),
+    status_error(APIStatusError, 500),
+    status_error(APIStatusError, 503),
+])
+def test_transient_errors_are_retryable(error):
+    assert GPTHelper._is_retryable(error)
+
+
+@pytest.mark.parametrize('error', [
+    status_error(BadRequestError, 400),
+    status_error(AuthenticationError, 401),
+    status_error(APIStatusError, 404),
+    ValueError('API返回空内容'),
+])
+def test_permanent_errors_are_not_retryable(error):
+    assert not GPTHelper._is_retryable(error)
+
+
+class FakeRawResponse:
+    headers = {}
+
+    def parse(self):
+        return 'ok'
+
+
+class FakeCompletions:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.with_raw_response = self
+
+    def create(self, model, messages):
+        if self.errors:
+            raise self.errors.pop(0)
+        return FakeRawResponse()
+
+
+class FakeClient:
+    def __init__(self, errors):
+        self.chat = type('Chat', (), {})()
+        self.chat.completions = FakeCompletions(errors)
+
+
+def make_helper(errors, monkeypatch, **config):
+    helper = GPTHelper.__new__(GPTHelper)
+    helper.config = GPTConfig.__new__(GPTConfig)
+    helper.config.MODEL = 'test-model'
+    helper.config.MAX_RETRIES = 3
+    helper.config.RETRY_BACKOFF_BASE = 1
+    helper.config.RETRY_BACKOFF_MAX = 60
+    helper.config.RETRY_AFTER_MAX = 300
+    for name, value in config.items():
+        setattr(helper.config, name, value)
+    helper.client = FakeClient(errors)
+    helper.rate_limiter = APIRateLimiter()
+    helper.rate_limiter.paused = []
+    helper.rate_limiter.pause = helper.rate_limiter.paused.append
+    helper.sleeps = []
+    monkeypatch.setattr(helper_module.time, 'sleep', helper.sleeps.append)
+    return helper
+
+
+@pytest.mark.parametrize('headers', [{'retry-after': '-3'}, {'retry-after-ms': '-5'}, {'retry-after': 'nan'}])
+def test_invalid_retry_after_falls_back_to_backoff(headers, monkeypatch):
+    helper = make_helper([status_error(RateLimitError, 429, headers)], monkeypatch)
+
+    assert helper._create_completion([{'role': 'user', 'content': 'hi'}]) == 'ok'
+    assert helper.rate_limiter.paused == []
+    assert len(helper.sleeps) == 1
+    assert 0 <= helper.sleeps[0] <= 1
+
+
+def test_retry_after_is_clamped_before_pause_and_sleep(monkeypatch):
+    helper = make_helper([status_error(RateLimitError, 429, {'retry-after': '86400'})], monkeypatch,
+                         RETRY_AFTER_MAX=120)
+
+    helper._create_completion([{'role': 'user', 'content': 'hi'}])
+
+    assert helper.rate_limiter.paused == [120]
+    assert helper.sleeps == [120]
+
+
+def test_permanent_error_is_raised_without_retry(monkeypatch):
+    helper = make_helper([status_error(BadRequestError, 400)], monkeypatch)
+
+    with pytest.raises(BadRequestError):
+        helper._create_completion([{'role': 'user', 'content': 'hi'}])
+    assert helper.sleeps == []
+
+
+def test_retries_stop_after_max_retries(monkeypatch):
+    errors = [APIConnectionError(request=REQUEST) for _ in range(4)]
+    helper = make_helper(errors, monkeypatch, MAX_RETRIES=3)
+
+    with pytest.raises(APIConnectionError):
+        helper._create_completion([{'role': 'user', 'content': 'hi'}])
+    assert len(helper.sleeps) == 3
@@ -0,0 +1,53 @@
+import glob
+import os
+import pytest
+
+pytest.importorskip('bs4')
+pytest.importorskip('lxml')
+
+from sources.html_cleaner import extract_text_bs4, extract_text_lxml, normalize_text
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'feed_html')
+FIXTURES = sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html')))
+
+# html.parser与libxml2行为不同的写法，lxml引擎需要与BeautifulSoup输出一致
+EDGE_CASES = [
+    '<div>a</div></html>tail text',
+    '<p>a</p></body></html>\n<p>b</p>',
+    '<![CDATA[cdata text]]><p>z</p>',
+    '<![cdata[<b>raw</b>]] >x',
+    '&unknown; &unknown x',
+    '&copy 2020 &amp AT&T rocks',
+    '&#169; &#x41; &#150; &#x110000; &#0;',
+    'a\x00b',
+    '<template><p>tp</p></template>visible',
+    '</section>stray end tag first',
+    ' </div>text',
+    '<?xml version="1.0"?></span><p>after pi</p>',
+    'a < b, x > y, 1 <3, 5 &lt 6',
+    'trailing <',
+    '&# and &#x; are literal',
+    '<script>var a = "<p>";</script><style>p{}</style><!-- comment -->kept',
+    '<svg><style>s</style><text>t</text></svg>',
+    '<textarea>ta</textarea><title>ti</title><noscript>ns</noscript>',
+    '<img alt="a&copy;"><a href="?a=1&b=2">link</a>',
+]
+
+
+def assert_same_text(html_content: str):
+    assert normalize_text(extract_text_lxml(html_content)) == normalize_text(extract_text_bs4(html_content))
+
+
+@pytest.mark.parametrize('path', FIXTURES, ids=os.path.basename)
+def test_lxml_matches_bs4_on_feed_html(path):
+    with open(path, encoding='utf-8') as f:
+        assert_same_text(f.read())
+
+
+@pytest.mark.parametrize('html_content', EDGE_CASES)
+def test_lxml_matches_bs4_on_edge_cases(html_content):
+    assert_same_text(html_content)
+
+
+def test_fixtures_present():
+    assert FIXTURES
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from services.database import NewsDatabase
+
+NEWS_COUNT = 57
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch, capsys):
+    database = NewsDatabase(str(tmp_path / 'news.db'))
+    # published只保存日期，57条新闻只有3个不同的发布日期，分页边界落在大量相同的published上
+    database.save_news_batch([{
+        'id': f'news-{i:02d}',
+        'source_type': 'rss',
+        'source_name': '来源A' if i % 3 else '来源B',
+        'published': datetime(2026, 10, 16, 8, 0, 0) - timedelta(days=i % 3, minutes=i),
+        'title': f'标题{i}',
+        'content': '正文',
+        'link': f'https://example.com/{i}',
+    } for i in range(NEWS_COUNT)])
+    monkeypatch.setattr(main, 'NewsDatabase', lambda: database)
+    capsys.readouterr()
+    yield database
+    NewsDatabase.close_all_connections()
+
+
+def full_sort(db, source_name=None):
+    with db.get_connection() as conn:
+        sql = 'SELECT id FROM news_items'
+        params = []
+        if source_name:
+            sql += ' WHERE source_name = ?'
+            params.append(source_name)
+        return [row['id'] for row in conn.execute(sql + ' ORDER BY published DESC, id DESC', params)]
+
+
+@pytest.mark.parametrize('page_size', [1, 5, 19, 57, 500])
+def test_keyset_pages_match_full_sort(db, page_size):
+    ids = [news['id'] for news in db.iter_news(columns=['id'], page_size=page_size)]
+
+    assert ids == full_sort(db)
+    assert len(set(ids)) == NEWS_COUNT
+
+
+@pytest.mark.parametrize('limit', [1, 5, 13, 56, 100])
+def test_limit_is_respected_across_pages(db, limit):
+    ids = [news['id'] for news in db.iter_news(columns=['id'], limit=limit, page_size=5)]
+
+    assert ids == full_sort(db)[:limit]
+
+
+def test_source_and_date_filters(db):
+    ids = [news['id'] for news in db.iter_news(source_name='来源B', columns=['id'], page_size=4)]
+    assert ids == full_sort(db, '来源B')
+    assert len(ids) == 19
+
+    limited = list(db.iter_news(source_name='来源B', limit=7, page_size=3))
+    assert [news['id'] for news in limited] == ids[:7]
+    assert all(news['source_name'] == '来源B' for news in limited)
+
+    # 按抓取日期过滤：全部新闻都是今天抓取的
+    today = date.today()
+    assert len(list(db.iter_news(today, today, page_size=10))) == NEWS_COUNT
+    assert list(db.iter_news(today - timedelta(days=2), today - timedelta(days=1))) == []
+
+
+def query_args(output_format, **query):
+    args = SimpleNamespace(query_date=None, query_range=None, query_source=None, search=None,
+                           date=None, date_range=None, days=None, limit=None, format=output_format)
+    for name, value in query.items():
+        setattr(args, name, value)
+    return args
+
+
+def test_jsonl_output_keeps_stdout_to_data(db, capsys):
+    main.query_news(query_args('jsonl', query_source='来源B', limit=10))
+
+    captured = capsys.readouterr()
+    rows = [json.loads(line) for line in captured.out.splitlines()]
+    assert [row['id'] for row in rows] == full_sort(db, '来源B')[:10]
+    assert all(row['source_name'] == '来源B' for row in rows)
+    assert "来源 '来源B' 的新闻: 共 10 条" in captured.err
+
+
+def test_csv_output_keeps_stdout_to_data(db, capsys):
+    today = date.today().isoformat()
+    main.query_news(query_args('csv', query_range=(today, today)))
+
+    captured = capsys.readouterr()
+    rows = list(csv.DictReader(io.StringIO(captured.out)))
+    assert [row['id'] for row in rows] == full_sort(db)
+    assert set(rows[0]) >= {'id', 'source_name', 'published', 'title', 'link'}
+    assert f'共 {NEWS_COUNT} 条' in captured.err
+
+
+def test_text_output_goes_to_stdout(db, capsys):
+    main.query_news(query_args('text', query_source='来源A', limit=2))
+
+    captured = capsys.readouterr()
+    assert '共 2 条' in captured.out
+    assert captured.err == ''
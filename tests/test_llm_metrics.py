@@ -0,0 +1,171 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services.database import NewsDatabase
+from services.llm_metrics import LLMMetricsStore
+from utils.gpt.config import GPTConfig
+from utils.gpt.helper import UNKNOWN_SOURCE, GPTHelper
+from utils.gpt.metrics import LLMMetrics, percentile
+
+API_KEY = 'sk-test-0123456789-secret'
+
+
+@pytest.mark.parametrize('values, percent, expected', [
+    ([], 50, 0.0),
+    ([7], 95, 7),
+    ([3, 1, 2], 50, 2),
+    (list(range(1, 101)), 50, 50),
+    (list(range(1, 101)), 95, 95),
+    (list(range(100, 0, -1)), 95, 95),
+    ([1, 2, 3, 4], 0, 1),
+    ([1, 2, 3, 4], 100, 4),
+    ([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 95, 10),
+])
+def test_percentile_uses_nearest_rank(values, percent, expected):
+    assert percentile(values, percent) == expected
+
+
+class FakeRawResponse:
+    headers = {}
+
+    def __init__(self, content, prompt_tokens, completion_tokens):
+        self.response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+        )
+
+    def parse(self):
+        return self.response
+
+
+class FakeCompletions:
+    def __init__(self, raw_response):
+        self.raw_response = raw_response
+        self.with_raw_response = self
+
+    def create(self, model, messages):
+        return self.raw_response
+
+
+def make_helper(monkeypatch, **env):
+    monkeypatch.setenv('GPT_API_KEY', API_KEY)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return GPTHelper(GPTConfig())
+
+
+def test_client_setup_does_not_print_api_key(monkeypatch, capsys):
+    make_helper(monkeypatch)
+    assert capsys.readouterr().out == ''
+
+    make_helper(monkeypatch, GPT_DEBUG='1')
+    output = capsys.readouterr().out
+    assert '[DEBUG]' in output
+    assert API_KEY[:8] not in output and API_KEY[-4:] not in output
+
+
+def test_batch_call_tokens_are_split_by_source(monkeypatch, capsys):
+    helper = make_helper(monkeypatch)
+    content = json.dumps({str(i): f'总结{i}' for i in range(1, 5)}, ensure_ascii=False)
+    helper.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(FakeRawResponse(content, 400, 100))))
+
+    summaries = helper.summarize_batch([
+        {'id': 'news-1', 'title': '标题1', 'source_name': '来源A'},
+        {'id': 'news-2', 'title': '标题2', 'source_name': '来源A'},
+        {'id': 'news-3', 'title': '标题3', 'source_name': '来源B'},
+        {'id': 'news-4', 'title': '标题4'},
+    ])
+
+    assert summaries == {f'news-{i}': f'总结{i}' for i in range(1, 5)}
+    (call,) = helper.metrics.get_calls()
+    assert call['kind'] == 'batch'
+    assert call['items'] == 4
+    assert call['sources'] == {'来源A': 2, '来源B': 1, UNKNOWN_SOURCE: 1}
+
+    summary = helper.metrics.summary()
+    assert summary['calls'] == 1
+    assert (summary['prompt_tokens'], summary['completion_tokens']) == (400, 100)
+    assert summary['by_source'] == {
+        '来源A': {'items': 2, 'prompt_tokens': 200.0, 'completion_tokens': 50.0},
+        '来源B': {'items': 1, 'prompt_tokens': 100.0, 'completion_tokens': 25.0},
+        UNKNOWN_SOURCE: {'items': 1, 'prompt_tokens': 100.0, 'completion_tokens': 25.0},
+    }
+
+
+def test_failed_call_records_error_class():
+    metrics = LLMMetrics()
+
+    with pytest.raises(ValueError):
+        with metrics.track('summarize', 'test-model', '规则', {'来源A': 1}) as call:
+            call['retries'] = 2
+            call['retry_errors'] = ['RateLimitError', 'APIConnectionError']
+            raise ValueError('API返回空内容')
+
+    summary = metrics.summary()
+    assert summary['failed'] == 1
+    assert summary['retries'] == 2
+    assert summary['errors'] == {'ValueError': 1}
+    assert summary['retry_errors'] == {'RateLimitError': 1, 'APIConnectionError': 1}
+
+
+@pytest.fixture
+def store(tmp_path, capsys):
+    yield LLMMetricsStore(str(tmp_path / 'news.db'))
+    NewsDatabase.close_all_connections()
+
+
+def make_call(created_at, kind, sources, prompt_tokens, completion_tokens, latency, **extra):
+    call = {
+        'created_at': created_at,
+        'kind': kind,
+        'model': 'test-model',
+        'prompt_hash': 'abc123',
+        'sources': sources,
+        'items': sum(sources.values()),
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'latency': latency,
+        'retries': 0,
+        'retry_errors': [],
+        'truncated': 0,
+        'error_class': None,
+        'status_code': None,
+    }
+    call.update(extra)
+    return call
+
+
+def test_store_report_aggregates_recent_calls(store):
+    now = int(time.time())
+    store.save_run([
+        make_call(now, 'batch', {'来源A': 3, '来源B': 1}, 400, 100, 1.0, truncated=1),
+        make_call(now, 'summarize', {'来源B': 1}, 50, 10, 3.0, retries=2,
+                  retry_errors=['RateLimitError', 'RateLimitError']),
+        make_call(now, 'summarize', {'来源A': 1}, 0, 0, 2.0, error_class='RateLimitError', status_code=429),
+        # 超出统计范围的调用
+        make_call(now - 30 * 86400, 'batch', {'来源A': 2}, 1000, 1000, 9.0),
+    ])
+
+    report = store.get_report(days=7)
+
+    assert report['total'] == {'calls': 3, 'failed': 1, 'retries': 2, 'truncated': 1,
+                               'prompt_tokens': 450, 'completion_tokens': 110}
+    by_source = {row['source_name']: row for row in report['by_source']}
+    assert [row['source_name'] for row in report['by_source']] == ['来源A', '来源B']
+    assert by_source['来源A']['items'] == 4
+    assert by_source['来源A']['prompt_tokens'] == pytest.approx(300)
+    assert by_source['来源A']['completion_tokens'] == pytest.approx(75)
+    assert by_source['来源B']['items'] == 2
+    assert by_source['来源B']['prompt_tokens'] == pytest.approx(100 + 50)
+    assert by_source['来源B']['total_tokens'] == pytest.approx(125 + 60)
+    assert {(row['kind'], row['calls']) for row in report['by_prompt']} == {('batch', 1), ('summarize', 2)}
+    assert report['errors'] == {'RateLimitError': 1}
+    (day,) = report['daily_latency'].values()
+    assert day == {'calls': 3, 'p50_ms': 2000, 'p95_ms': 3000}
+
+
+def test_store_uses_per_thread_database_connection(store):
+    assert store.db.get_connection() is NewsDatabase(store.db_path).get_connection()
@@ -0,0 +1,185 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from managers.news_manager import NewsManager
+from services.database import NewsDatabase
+from sources.base import NewsSource
+
+
+class FakeSource(NewsSource):
+    """同步来源：逐个处理子任务并暂存状态，每个子任务前检查取消标志"""
+
+    def __init__(self, name: str, steps: int, step_seconds: float):
+        super().__init__(name, 'fake')
+        self.steps = steps
+        self.step_seconds = step_seconds
+        self.staged = []
+        self.committed = []
+        self.discarded = 0
+        self.finished = threading.Event()
+        self.completed_steps = 0
+
+    def get_news(self, start_date=None, end_date=None):
+        try:
+            news_list = []
+            for step in range(self.steps):
+                if self.is_cancelled():
+                    break
+                time.sleep(self.step_seconds)
+                self.staged.append(step)
+                self.completed_steps += 1
+                news_list.append(self.create_standard_news_item(
+                    f'{self.name}-{step}', f'标题{step}', '正文', datetime(2026, 10, 16), 'https://example.com'))
+            return news_list
+        finally:
+            self.finished.set()
+
+    def commit_state(self):
+        self.committed.extend(self.staged)
+        self.staged = []
+
+    def discard_state(self):
+        self.discarded += len(self.staged)
+        self.staged = []
+
+
+def test_abandoned_source_state_is_discarded_not_committed():
+    fast = FakeSource('fast', steps=1, step_seconds=0)
+    slow = FakeSource('slow', steps=50, step_seconds=0.05)
+    manager = NewsManager(max_concurrency=2, deadline=0.3)
+    manager.register_source(fast)
+    manager.register_source(slow)
+
+    news_list = manager.get_all_news()
+
+    assert [news['id'] for news in news_list] == ['fast-0']
+    assert manager.abandoned_sources == [slow]
+    assert slow.is_cancelled()
+
+    # 取消标志使后台线程在当前子任务结束后停止，而不是跑完全部子任务
+    assert slow.finished.wait(1)
+    assert slow.completed_steps < slow.steps
+
+    manager.commit_sources_state()
+    assert fast.committed == [0]
+    assert slow.committed == []
+    assert slow.discarded > 0
+
+
+def test_sources_are_reset_for_the_next_run():
+    source = FakeSource('source', steps=1, step_seconds=0)
+    source.cancel()
+    manager = NewsManager(deadline=5)
+    manager.register_source(source)
+
+    assert len(manager.get_all_news()) == 1
+    assert manager.abandoned_sources == []
+    manager.commit_sources_state()
+    assert source.committed == [0]
+
+
+class StreamingSource(NewsSource):
+    """按批次产出新闻的来源，每产出一批暂存一次状态，可以在指定批次之后抛出异常"""
+
+    def __init__(self, name, batches, fail_after=None, events=None):
+        super().__init__(name, 'fake')
+        self.batches = batches
+        self.fail_after = fail_after
+        self.events = events if events is not None else []
+        self.staged = []
+        self.committed = []
+        self.discarded = 0
+
+    def get_news(self, start_date=None, end_date=None):
+        return [news for batch in self.iter_news(start_date, end_date) for news in batch]
+
+    def iter_news(self, start_date=None, end_date=None):
+        for index, ids in enumerate(self.batches):
+            if index == self.fail_after:
+                raise RuntimeError(f'{self.name} 解析失败')
+            self.events.append(f'{self.name}:{index}')
+            self.staged.append(index)
+            yield [self.create_standard_news_item(
+                news_id, f'标题{news_id}', '正文', datetime(2026, 10, 16), f'https://example.com/{news_id}')
+                for news_id in ids]
+
+    def commit_state(self):
+        self.committed.extend(self.staged)
+        self.staged = []
+
+    def discard_state(self):
+        self.discarded += len(self.staged)
+        self.staged = []
+
+
+@pytest.fixture
+def stream_db(tmp_path, monkeypatch, capsys):
+    database = NewsDatabase(str(tmp_path / 'news.db'))
+    monkeypatch.setattr(main, 'NewsDatabase', lambda: database)
+    yield database
+    NewsDatabase.close_all_connections()
+
+
+def saved_ids(db):
+    return sorted(news['id'] for news in db.iter_news(columns=['id']))
+
+
+def make_stream_manager(*sources):
+    manager = NewsManager()
+    for source in sources:
+        manager.register_source(source)
+    return manager
+
+
+def test_stream_keeps_news_before_source_failure_but_discards_its_state(stream_db, monkeypatch):
+    events = []
+    save_news_batch = stream_db.save_news_batch
+    monkeypatch.setattr(stream_db, 'save_news_batch', lambda news_list: events.append(
+        'save:' + ','.join(news['id'] for news in news_list)) or save_news_batch(news_list))
+    first = StreamingSource('first', [['a1', 'a2'], ['a3', 'shared']], events=events)
+    failing = StreamingSource('failing', [['shared', 'b1'], ['b2']], fail_after=1, events=events)
+    last = StreamingSource('last', [['c1', 'a1']], events=events)
+    manager = make_stream_manager(first, failing, last)
+
+    args = SimpleNamespace(save_to_db=True, chunk_size=2, save_temp=False)
+    fetched = main.fetch_news_stream(args, manager, None, None, None)
+
+    # 各来源之间的重复新闻边产出边去除，失败来源之前产出的新闻照常保存
+    assert fetched == 6
+    assert saved_ids(stream_db) == ['a1', 'a2', 'a3', 'b1', 'c1', 'shared']
+    # 每个分块在读取后续来源之前就已写入
+    assert events == ['first:0', 'save:a1,a2', 'first:1', 'save:a3,shared', 'failing:0', 'last:0', 'save:b1,c1']
+    assert manager.abandoned_sources == [failing]
+    assert first.committed == [0, 1] and last.committed == [0]
+    assert failing.committed == [] and failing.discarded == 1
+
+
+def test_stream_commits_saved_chunks_and_no_state_when_saving_fails(stream_db, monkeypatch):
+    source = StreamingSource('source', [['n1', 'n2'], ['n3', 'n4'], ['n5']])
+    manager = make_stream_manager(source)
+    save_news_batch = stream_db.save_news_batch
+    chunks = []
+
+    def failing_save(news_list):
+        chunks.append([news['id'] for news in news_list])
+        if len(chunks) == 2:
+            raise sqlite3.OperationalError('database is locked')
+        return save_news_batch(news_list)
+
+    monkeypatch.setattr(stream_db, 'save_news_batch', failing_save)
+
+    args = SimpleNamespace(save_to_db=True, chunk_size=2, save_temp=False)
+    with pytest.raises(sqlite3.OperationalError):
+        main.fetch_news_stream(args, manager, None, None, None)
+
+    # 第一个分块已经提交，失败的分块及之后的新闻没有保存，新闻流在失败处停止读取
+    assert chunks == [['n1', 'n2'], ['n3', 'n4']]
+    assert saved_ids(stream_db) == ['n1', 'n2']
+    assert source.committed == []
+    assert source.staged == [0, 1]
@@ -0,0 +1,133 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from services.database import NewsDatabase, epoch_range
+
+
+@pytest.fixture
+def db(tmp_path, capsys):
+    database = NewsDatabase(str(tmp_path / 'news.db'))
+    published = datetime(2026, 10, 16, 8, 0, 0)
+    database.save_news_batch([{
+        'id': f'news-{i}',
+        'source_type': 'rss',
+        'source_name': '来源',
+        'published': published - timedelta(days=i),
+        'title': f'标题{i}',
+        'content': '正文',
+        'link': f'https://example.com/{i}',
+    } for i in range(5)])
+    capsys.readouterr()
+    yield database
+    NewsDatabase.close_all_connections()
+
+
+def traced_plans(db, prefix, call):
+    """执行call，返回其间以prefix开头的SQL语句（已代入参数）及其查询计划"""
+    conn = db.get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+
+    plans = []
+    for sql in statements:
+        if sql.lstrip().upper().startswith(prefix):
+            rows = conn.execute('EXPLAIN QUERY PLAN ' + sql).fetchall()
+            plans.append(' | '.join(row['detail'] for row in rows))
+    assert plans, f'未执行以{prefix}开头的语句'
+    return plans
+
+
+def assert_searches(plans, index, bounds):
+    """每个查询计划都按index的范围条件查找，且没有全表扫描news_items"""
+    for plan in plans:
+        assert f'USING INDEX {index} ({bounds})' in plan or f'USING COVERING INDEX {index} ({bounds})' in plan, plan
+        assert 'SCAN news_items' not in plan, plan
+
+
+FETCH_BOUNDS = 'fetch_timestamp>? AND fetch_timestamp<?'
+PUBLISHED_BOUNDS = 'published_ts>? AND published_ts<?'
+PUBLISHED_RANGE = epoch_range(datetime(2026, 10, 10), datetime(2026, 10, 16, 23, 59, 59))
+
+
+def test_summary_queue_uses_pending_index(db):
+    plans = traced_plans(db, 'SELECT', lambda: db.get_summary_queue())
+    assert all('USING INDEX idx_summary_pending' in plan for plan in plans), plans
+
+    plans = traced_plans(db, 'SELECT', lambda: db.get_summary_queue(published_range=(0, 2 ** 31)))
+    assert all('USING INDEX idx_summary_pending' in plan for plan in plans), plans
+
+
+def test_cleanup_uses_fetch_timestamp_index(db):
+    plans = traced_plans(db, 'DELETE', lambda: db.cleanup_old_data(days_to_keep=30))
+    assert all('USING COVERING INDEX idx_fetch_timestamp' in plan for plan in plans), plans
+
+
+def test_iter_news_pages_use_published_id_index(db):
+    plans = traced_plans(db, 'SELECT', lambda: list(db.iter_news(page_size=2)))
+    # 5条新闻分3页，后两页带(published, id)键集条件
+    assert len(plans) == 3
+    assert all('USING INDEX idx_published_id' in plan for plan in plans), plans
+    assert all('TEMP B-TREE' not in plan for plan in plans), plans
+
+
+def test_news_by_date_uses_fetch_timestamp_index(db):
+    today = date.today()
+
+    assert_searches(traced_plans(db, 'SELECT', lambda: db.get_news_by_date(today)),
+                    'idx_fetch_timestamp', FETCH_BOUNDS)
+    assert_searches(traced_plans(db, 'SELECT', lambda: db.get_news_by_date_range(today - timedelta(days=7), today)),
+                    'idx_fetch_timestamp', FETCH_BOUNDS)
+
+
+def test_news_by_source_uses_source_fetch_index(db):
+    today = date.today()
+
+    assert_searches(traced_plans(db, 'SELECT', lambda: db.get_news_by_source('来源')),
+                    'idx_source_fetch', 'source_name=?')
+    assert_searches(traced_plans(db, 'SELECT', lambda: db.get_news_by_source('来源', today, today)),
+                    'idx_source_fetch', 'source_name=? AND ' + FETCH_BOUNDS)
+
+
+def test_search_uses_fts_index(db):
+    today = date.today()
+
+    for call in (lambda: db.search_news('标题1'), lambda: db.search_news('标题1', today, today)):
+        plans = traced_plans(db, 'SELECT', call)
+        assert all('news_fts VIRTUAL TABLE INDEX' in plan for plan in plans), plans
+        # 命中的行按rowid回表，不扫描news_items
+        assert all('SEARCH n USING INTEGER PRIMARY KEY (rowid=?)' in plan for plan in plans), plans
+
+
+def test_like_search_with_range_uses_fetch_timestamp_index(db):
+    today = date.today()
+
+    # 2个字符的关键词无法使用trigram索引，回退到LIKE
+    plans = traced_plans(db, 'SELECT', lambda: db.search_news('标题', today, today))
+    assert all(f'SEARCH n USING INDEX idx_fetch_timestamp ({FETCH_BOUNDS})' in plan for plan in plans), plans
+    assert all('news_fts' not in plan for plan in plans), plans
+
+
+def test_digest_queries_use_published_ts_index(db):
+    # generate_html和run命令按发布时间范围读取已总结的新闻、统计新闻数量
+    assert_searches(traced_plans(db, 'SELECT', lambda: db.get_summarized_news(PUBLISHED_RANGE)),
+                    'idx_published_ts', PUBLISHED_BOUNDS)
+    assert_searches(traced_plans(db, 'SELECT', lambda: db.count_news_by_published(PUBLISHED_RANGE)),
+                    'idx_published_ts', PUBLISHED_BOUNDS)
+    # 未指定时间范围时读取今天抓取的新闻
+    assert_searches(traced_plans(db, 'SELECT', lambda: db.get_summarized_news()),
+                    'idx_fetch_timestamp', FETCH_BOUNDS)
+
+
+def test_statistics_date_range_probes_use_primary_key(db):
+    plans = traced_plans(db, 'SELECT', lambda: db.get_statistics())
+
+    assert all('news_items' not in plan for plan in plans), plans
+    probes = [plan for plan in plans if 'SCALAR SUBQUERY' in plan]
+    assert len(probes) == 1, plans
+    # MIN/MAX各自只在主键索引上查找一端
+    assert probes[0].count('SEARCH news_stats_daily USING COVERING INDEX sqlite_autoindex_news_stats_daily_1') == 2
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import pytest
+
+from services.database import NewsDatabase
+
+
+@pytest.fixture
+def db(tmp_path, capsys):
+    yield NewsDatabase(str(tmp_path / 'news.db'))
+    NewsDatabase.close_all_connections()
+
+
+def make_news(news_id, title):
+    return {
+        'id': news_id,
+        'source_type': 'rss',
+        'source_name': '来源',
+        'published': datetime(2026, 10, 16, 8, 0, 0),
+        'title': title,
+        'content': f'{title}的正文',
+        'link': f'https://example.com/{news_id}',
+    }
+
+
+def test_batch_counts_inserted_duplicate_and_rejected_rows(db):
+    db.save_news_batch([make_news('news-1', '已有新闻')])
+
+    missing_title = make_news('news-3', '缺少标题')
+    del missing_title['title']
+    saved = db.save_news_batch([
+        make_news('news-2', '新新闻'),
+        make_news('news-1', '重复新闻'),
+        missing_title,
+    ])
+
+    assert saved == 1
+    assert db.last_batch_stats == {'inserted': 1, 'duplicates': 1, 'rejected': 1}
+    news = {item['id']: item for item in db.iter_news(with_content=True)}
+    assert set(news) == {'news-1', 'news-2'}
+    # 重复的新闻不会覆盖已有的数据
+    assert news['news-1']['title'] == '已有新闻'
+    assert news['news-1']['content'] == '已有新闻的正文'
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.database import NewsDatabase
+
+
+@pytest.fixture
+def db(tmp_path, capsys):
+    yield NewsDatabase(str(tmp_path / 'news.db'))
+    NewsDatabase.close_all_connections()
+
+
+def make_news(i, source_name):
+    return {
+        'id': f'news-{i}',
+        'source_type': 'rss',
+        'source_name': source_name,
+        'published': datetime(2026, 10, 16, 8, 0, 0) - timedelta(hours=i),
+        'title': f'标题{i}',
+        'content': '正文',
+        'link': f'https://example.com/{i}',
+    }
+
+
+def recomputed_statistics(db):
+    """直接扫描news_items计算与get_statistics相同结构的统计"""
+    with db.get_connection() as conn:
+        source_stats = dict(conn.execute('SELECT source_name, COUNT(*) FROM news_items GROUP BY source_name'))
+        daily = dict(conn.execute('SELECT date(fetch_timestamp), COUNT(*) FROM news_items GROUP BY 1'))
+    recent = sorted(daily, reverse=True)[:10]
+    return {
+        'total_news': sum(source_stats.values()),
+        'source_stats': source_stats,
+        'recent_date_stats': {day: daily[day] for day in recent},
+        'date_range': {'earliest': min(daily, default=None), 'latest': max(daily, default=None)},
+    }
+
+
+def assert_statistics_consistent(db):
+    statistics = db.get_statistics()
+    assert statistics == recomputed_statistics(db)
+    return statistics
+
+
+def test_statistics_follow_every_write_path(db):
+    db.save_news_batch([make_news(i, f'来源{i % 3}') for i in range(30)])
+    assert_statistics_consistent(db)
+
+    # 重复的新闻由ON CONFLICT跳过，不计入统计
+    db.save_news_batch([make_news(i, '其他来源') for i in range(25, 35)])
+    assert assert_statistics_consistent(db)['total_news'] == 35
+
+    with db.get_connection() as conn:
+        # 来源改名
+        conn.execute("UPDATE news_items SET source_name = '来源X' WHERE source_name = '来源1'")
+        # 修改抓取时间，分布到多个日期（部分超过保留期）
+        for i in range(35):
+            fetch_timestamp = (datetime.now() - timedelta(days=i * 5)).strftime('%Y-%m-%d %H:%M:%S')
+            conn.execute('UPDATE news_items SET fetch_timestamp = ? WHERE id = ?', (fetch_timestamp, f'news-{i}'))
+        # 只修改时间不改变日期时触发器不更新统计
+        conn.execute("UPDATE news_items SET fetch_timestamp = date(fetch_timestamp) || ' 00:00:01' WHERE id = 'news-0'")
+    statistics = assert_statistics_consistent(db)
+    assert '来源1' not in statistics['source_stats']
+
+    deleted = db.cleanup_old_data(days_to_keep=60)
+    assert deleted > 0
+    assert assert_statistics_consistent(db)['total_news'] == 35 - deleted
+
+    db.clear_all_data()
+    assert assert_statistics_consistent(db) == {
+        'total_news': 0,
+        'source_stats': {},
+        'recent_date_stats': {},
+        'date_range': {'earliest': None, 'latest': None},
+    }
+
+
+def test_rebuild_statistics_detects_corrupted_counts(db, capsys):
+    db.save_news_batch([make_news(i, f'来源{i % 3}') for i in range(10)])
+
+    assert db.rebuild_statistics() == {'daily_mismatches': 0, 'source_mismatches': 0}
+
+    with db.get_connection() as conn:
+        conn.execute("UPDATE news_stats_source SET count = count + 5 WHERE source_name = '来源0'")
+        conn.execute('DELETE FROM news_stats_daily')
+    assert db.get_statistics() != recomputed_statistics(db)
+
+    assert db.rebuild_statistics() == {'daily_mismatches': 1, 'source_mismatches': 1}
+    assert_statistics_consistent(db)
+    assert db.rebuild_statistics() == {'daily_mismatches': 0, 'source_mismatches': 0}
@@ -0,0 +1,143 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from services import summary_cache
+from services.ai import AISummarizer
+from services.database import NewsDatabase
+from services.summary_cache import SummaryCache
+from utils.gpt.metrics import LLMMetrics
+
+RULES = ['规则一', '规则二']
+
+
+@pytest.fixture
+def db_path(tmp_path, capsys):
+    yield str(tmp_path / 'news.db')
+    NewsDatabase.close_all_connections()
+
+
+class FakeGPT:
+    def __init__(self, model='test-model', rules=RULES):
+        self.config = SimpleNamespace(MODEL=model, SYSTEM_RULES=list(rules), MAX_CHARS=30,
+                                      BATCH_SIZE=1, BATCH_TOKEN_BUDGET=2000)
+        self.metrics = LLMMetrics()
+        self.calls = []
+
+    def estimate_tokens(self, title, subtitle=''):
+        return len(title) + len(subtitle)
+
+    def summarize_text(self, title, subtitle='', source=None):
+        self.calls.append((title, subtitle))
+        return f'{self.config.MODEL}:{title}的总结'
+
+
+def make_summarizer(cache, gpt=None):
+    summarizer = AISummarizer.__new__(AISummarizer)
+    summarizer.gpt = gpt or FakeGPT()
+    summarizer.cache = cache
+    summarizer.max_in_flight = 1
+    summarizer.last_run_stats = {}
+    return summarizer
+
+
+def make_news(news_id, title, subtitle='', source_name='来源'):
+    return {'id': news_id, 'title': title, 'subtitle': subtitle, 'source_name': source_name}
+
+
+def test_cache_key_is_stable_and_covers_every_input():
+    key = SummaryCache.make_key('test-model', RULES, 30, '标题', '副标题')
+
+    assert key == SummaryCache.make_key('test-model', list(RULES), 30, ' 标题 ', '副标题\n')
+    assert SummaryCache.make_key('test-model', RULES, 30, '标题', '') == SummaryCache.make_key(
+        'test-model', RULES, 30, '标题', None)
+    assert len({
+        key,
+        SummaryCache.make_key('other-model', RULES, 30, '标题', '副标题'),
+        SummaryCache.make_key('test-model', RULES + ['规则三'], 30, '标题', '副标题'),
+        SummaryCache.make_key('test-model', RULES, 40, '标题', '副标题'),
+        SummaryCache.make_key('test-model', RULES, 30, '另一个标题', '副标题'),
+        SummaryCache.make_key('test-model', RULES, 30, '标题', '另一个副标题'),
+    }) == 6
+
+
+def test_cached_summary_is_reused_until_model_or_rules_change(db_path):
+    cache = SummaryCache(db_path)
+    gpt = FakeGPT()
+    make_summarizer(cache, gpt).summarize_news([make_news('news-1', '标题')])
+    assert gpt.calls == [('标题', '')]
+
+    gpt.calls.clear()
+    news = make_news('news-2', '标题')
+    make_summarizer(cache, gpt).summarize_news([news])
+    assert gpt.calls == []
+    assert news['summary'] == 'test-model:标题的总结'
+
+    for changed in (FakeGPT(model='other-model'), FakeGPT(rules=RULES + ['规则三'])):
+        make_summarizer(cache, changed).summarize_news([make_news('news-3', '标题')])
+        assert changed.calls == [('标题', '')]
+
+
+def test_identical_inputs_in_one_run_call_the_api_once(db_path):
+    gpt = FakeGPT()
+    news_list = [
+        make_news('news-1', '同一条新闻', '副标题', '来源A'),
+        make_news('news-2', '另一条新闻'),
+        make_news('news-3', '同一条新闻', '副标题', '来源B'),
+        make_news('news-4', '同一条新闻', '副标题', '来源C'),
+    ]
+
+    make_summarizer(SummaryCache(db_path), gpt).summarize_news(news_list)
+
+    assert gpt.calls == [('同一条新闻', '副标题'), ('另一条新闻', '')]
+    assert [news['summary'] for news in news_list] == [
+        'test-model:同一条新闻的总结', 'test-model:另一条新闻的总结',
+        'test-model:同一条新闻的总结', 'test-model:同一条新闻的总结',
+    ]
+
+
+def test_evict_removes_expired_then_least_recently_used(db_path, monkeypatch):
+    now = [1_000_000]
+    monkeypatch.setattr(summary_cache.time, 'time', lambda: now[0])
+    cache = SummaryCache(db_path, ttl_days=1, max_entries=2)
+
+    cache.put_many([('expired', '总结0')])
+    for i, key in enumerate(['old', 'recent', 'newest'], start=1):
+        now[0] = 1_000_000 + 86400 + i
+        cache.put_many([(key, f'总结{i}')])
+    # 命中会更新最近使用时间，old变为最近使用
+    now[0] += 10
+    assert cache.get_many(['old']) == {'old': '总结1'}
+
+    assert cache.evict() == 2
+    assert cache.get_many(['expired', 'old', 'recent', 'newest']) == {'old': '总结1', 'newest': '总结3'}
+
+
+def test_expired_entries_are_not_returned_before_eviction(db_path, monkeypatch):
+    now = [1_000_000]
+    monkeypatch.setattr(summary_cache.time, 'time', lambda: now[0])
+    cache = SummaryCache(db_path, ttl_days=1)
+    cache.put_many([('key', '总结')])
+
+    now[0] += 86400 + 1
+
+    assert cache.get_many(['key']) == {}
+    assert cache.get_stats() == {'hits': 0, 'misses': 1, 'hit_rate': 0.0}
+
+
+def test_cache_uses_per_thread_database_connection(db_path):
+    cache = SummaryCache(db_path)
+    cache.put_many([('key', '总结')])
+
+    assert cache.db.get_connection() is NewsDatabase(db_path).get_connection()
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(
+        (cache.get_many(['key']), cache.db.get_connection())
+    ))
+    worker.start()
+    worker.join()
+
+    assert results[0][0] == {'key': '总结'}
+    assert results[0][1] is not cache.db.get_connection()
@@ -0,0 +1,98 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services.database import NewsDatabase
+
+
+@pytest.fixture
+def db(tmp_path, capsys):
+    database = NewsDatabase(str(tmp_path / 'news.db'))
+    published = datetime(2026, 10, 16, 8, 0, 0)
+    database.save_news_batch([{
+        'id': f'news-{i}',
+        'source_type': 'rss',
+        'source_name': '来源',
+        'published': published - timedelta(hours=i),
+        'title': f'标题{i}',
+        'content': '正文',
+        'link': f'https://example.com/{i}',
+    } for i in range(30)])
+    capsys.readouterr()
+    yield database
+    NewsDatabase.close_all_connections()
+
+
+def now_ts():
+    return int(datetime.now(timezone.utc).timestamp())
+
+
+def queue_ids(db):
+    return {news['id'] for news in db.get_summary_queue(columns=['id'])}
+
+
+def news_row(db, news_id):
+    with db.get_connection() as conn:
+        return dict(conn.execute(
+            'SELECT summary_status, summary_attempts, summary_error, summary_next_attempt FROM news_items WHERE id = ?',
+            (news_id,)
+        ).fetchone())
+
+
+def test_queue_returns_due_pending_and_expired_failures(db):
+    db.mark_summaries_done([('news-0', '总结')])
+    db.mark_summaries_failed([('news-1', '超时'), ('news-2', '超时')], max_attempts=5, retry_base_seconds=300)
+    with db.get_connection() as conn:
+        # news-2的退避时间已过
+        conn.execute('UPDATE news_items SET summary_next_attempt = ? WHERE id = ?', (now_ts() - 1, 'news-2'))
+
+    ids = queue_ids(db)
+
+    assert 'news-0' not in ids
+    assert 'news-1' not in ids
+    assert 'news-2' in ids
+    assert {f'news-{i}' for i in range(3, 30)} <= ids
+
+
+def test_backoff_doubles_until_capped(db):
+    delays = []
+    for _ in range(6):
+        before = now_ts()
+        db.mark_summaries_failed([('news-0', '超时')], max_attempts=10, retry_base_seconds=10, retry_max_seconds=50)
+        after = now_ts()
+        next_attempt = news_row(db, 'news-0')['summary_next_attempt']
+        # 根据写入前后的时间确定实际等待秒数的范围
+        delays.append((next_attempt - after, next_attempt - before))
+
+    expected = [10, 20, 40, 50, 50, 50]
+    assert all(low <= delay <= high for (low, high), delay in zip(delays, expected)), delays
+    assert news_row(db, 'news-0')['summary_attempts'] == 6
+
+
+def test_news_is_failed_after_max_attempts(db):
+    for attempt in range(1, 3):
+        result = db.mark_summaries_failed([('news-0', f'错误{attempt}')], max_attempts=3, retry_base_seconds=0)
+        assert result == {'retrying': 1, 'failed': 0}
+        assert 'news-0' in queue_ids(db)
+
+    result = db.mark_summaries_failed([('news-0', '错误3')], max_attempts=3, retry_base_seconds=0)
+
+    assert result == {'retrying': 0, 'failed': 1}
+    row = news_row(db, 'news-0')
+    assert row['summary_status'] == 'failed'
+    assert row['summary_attempts'] == 3
+    assert row['summary_error'] == '错误3'
+    assert 'news-0' not in queue_ids(db)
+
+
+def test_mark_failed_stays_within_variable_limit(db):
+    # SQLite 3.32之前的默认上限为999个参数
+    db.get_connection().setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    failures = [(f'news-{i}', '超时') for i in range(1200)]
+
+    db.mark_summaries_failed(failures, max_attempts=2, retry_base_seconds=0)
+    result = db.mark_summaries_failed(failures, max_attempts=2, retry_base_seconds=0)
+
+    # 只有30条新闻存在，其余ID不会被更新
+    assert result == {'retrying': 1200 - 30, 'failed': 30}